@@ -4,9 +4,11 @@
 This package contains all binary table based data source implementation.
 """
 
+from .arrow_dataset import ArrowDataset
 from .excel import Excel
 from .feather import Feather
 from .hdf5 import HDF5
+from .npy import NPY
 from .odf import ODF
 from .orc import ORC
 from .parquet import Parquet
@@ -15,9 +17,11 @@ from .spss import SPSS
 from .stata import Stata
 
 __all__ = [
+    'ArrowDataset',
     'Excel',
     'Feather',
     'HDF5',
+    'NPY',
     'ODF',
     'ORC',
     'Parquet',
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""Data Source base class for columnar Apache Arrow file formats.
+
+The ArrowDataset source reads Parquet, Feather and ORC files through
+pyarrow datasets. Only the requested columns are read, filter expressions
+are pushed down to the file reader (e.g. to skip parquet row groups) and
+the data can be streamed as record batches. Random samples of parquet
+data only read the row groups containing sampled rows.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+from dq0.sdk.data import sampling
+from dq0.sdk.data.metadata.structure.utils.utils import Utils as MetaUtils
+from dq0.sdk.data.source import Source
+
+import numpy as np
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+
+FILTER_OPERATORS = ['=', '==', '!=', '<', '<=', '>', '>=', 'in', 'not in']
+OUTPUT_TYPES = ['pandas', 'arrow', 'numpy']
+# keyword arguments of the former pd.read_parquet, pd.read_feather and pd.read_orc based read
+PANDAS_ENGINES = [None, 'auto', 'pyarrow']
+UNSUPPORTED_READ_ARGS = ['storage_options', 'use_nullable_dtypes']
+
+
+def filters_to_expression(filters):
+    """Converts filters into a pyarrow dataset expression.
+
+    Filters are given in disjunctive normal form like in pandas.read_parquet:
+    a list of (column, operator, value) tuples is combined by AND, a list
+    of such lists is combined by OR.
+
+    Args:
+        filters: list of tuples or list of lists of tuples.
+            Allowed operators are =, ==, !=, <, <=, >, >=, in and not in.
+
+    Returns:
+        pyarrow.dataset.Expression or None if no filters are given.
+    """
+    if filters is None or len(filters) == 0:
+        return None
+
+    if isinstance(filters[0], tuple):
+        filters = [filters]
+
+    expression = None
+    for conjunction in filters:
+        conjunction_expression = None
+        for column, op, value in conjunction:
+            term = _filter_to_expression(column, op, value)
+            conjunction_expression = term if conjunction_expression is None else conjunction_expression & term
+        expression = conjunction_expression if expression is None else expression | conjunction_expression
+    return expression
+
+
+def _filter_to_expression(column, op, value):
+    if op not in FILTER_OPERATORS:
+        raise ValueError(f"filter operator {op} not in allowed operators {FILTER_OPERATORS}")
+    field = ds.field(column)
+    if op in ['=', '==']:
+        return field == value
+    elif op == '!=':
+        return field != value
+    elif op == '<':
+        return field < value
+    elif op == '<=':
+        return field <= value
+    elif op == '>':
+        return field > value
+    elif op == '>=':
+        return field >= value
+    elif op == 'in':
+        return field.isin(value)
+    else:
+        return ~field.isin(value)
+
+
+class ArrowDataset(Source):
+    """Data Source base class for columnar Apache Arrow file formats.
+
+    Subclasses define the pyarrow dataset format to use.
+
+    Args:
+        path (:obj:`str`): Absolute path to the file or directory of files.
+        columns (:obj:`list`, optional): Columns to read by default.
+        filters (:obj:`list`, optional): Filters to apply by default. See `filters_to_expression`.
+        meta_table (optional): Table node of the dataset metadata.
+            If given, only its feature and target columns are read by default.
+
+    Attributes:
+        dataset_format (:obj:`str`): The pyarrow dataset format name.
+        columns (:obj:`list`): Columns to read by default. None for all columns.
+        filters (:obj:`list`): Filters to apply by default.
+    """
+
+    dataset_format = None
+
+    def __init__(self, path, columns=None, filters=None, meta_table=None):
+        super().__init__(path)
+        self.columns = columns
+        self.filters = filters
+        if meta_table is not None:
+            self.feature_cols, self.target_cols = MetaUtils.get_feature_target_cols(meta_table=meta_table)
+            self.col_types = MetaUtils.get_col_types(meta_table=meta_table)
+            if self.columns is None and len(self.feature_cols + self.target_cols) != 0:
+                self.columns = self.feature_cols + [c for c in self.target_cols if c not in self.feature_cols]
+
+    def read(self, columns=None, filters=None, output='pandas', **kwargs):
+        """Read the data source
+
+        Args:
+            columns (:obj:`list`, optional): Columns to read. Defaults to the columns attribute.
+            filters (:obj:`list`, optional): Filters to apply. Defaults to the filters attribute.
+            output (:obj:`str`, optional): 'pandas' for a dataframe, 'arrow' for a zero-copy
+                pyarrow.Table or 'numpy' for a dict of column arrays. Defaults to 'pandas'.
+            kwargs: keyword arguments passed to pyarrow.Table.to_pandas.
+                For compatibility with the former pandas based read, engine
+                'auto' or 'pyarrow' is ignored and use_threads is passed
+                to the dataset scan.
+
+        Returns:
+            data in the requested output type
+        """
+        self._check_output(output)
+        scan_args = self._get_scan_args(columns, filters)
+        scan_args.update(self._pop_pandas_read_args(kwargs))
+        table = self.get_dataset().to_table(**scan_args)
+        return self._convert(table, output, **kwargs)
+
+    def iter_batches(self, batch_rows=65536, columns=None, filters=None, output='pandas', **kwargs):
+        """Read the data source record batch by record batch
+
+        Args:
+            batch_rows (int): maximum number of rows per batch.
+            columns (:obj:`list`, optional): Columns to read. Defaults to the columns attribute.
+            filters (:obj:`list`, optional): Filters to apply. Defaults to the filters attribute.
+            output (:obj:`str`, optional): 'pandas', 'arrow' or 'numpy'. See `read`.
+            kwargs: keyword arguments passed to pyarrow.RecordBatch.to_pandas.
+
+        Yields:
+            batches of at most batch_rows rows in the requested output type
+        """
+        if not isinstance(batch_rows, int) or batch_rows < 1:
+            raise ValueError(f"batch_rows must be a positive integer, got {batch_rows}")
+        self._check_output(output)
+
+        scan_args = self._get_scan_args(columns, filters)
+        for batch in self.get_dataset().to_batches(batch_size=batch_rows, **scan_args):
+            if batch.num_rows == 0:
+                continue
+            yield self._convert(batch, output, **kwargs)
+
+    def sample(self, n, method='head', seed=None, stratify_by=None, columns=None, filters=None, **kwargs):
+        """Draws a sample of n rows
+
+        'head' stops scanning after n rows. 'reservoir' on unfiltered parquet
+        data draws the row numbers from the row group metadata and reads
+        only the row groups containing sampled rows. All other samples are
+        drawn while streaming the record batches. See `Source.sample`.
+
+        Args:
+            n (int): sample size.
+            method (:obj:`str`, optional): 'head', 'reservoir' or 'stratified'. Defaults to 'head'.
+            seed (int, optional): random seed.
+            stratify_by (:obj:`str`, optional): column to stratify by.
+                Defaults to the first target column.
+            columns (:obj:`list`, optional): Columns to read. Defaults to the columns attribute.
+            filters (:obj:`list`, optional): Filters to apply. Defaults to the filters attribute.
+            kwargs: keyword arguments passed to pyarrow.Table.to_pandas.
+
+        Returns:
+            sample as pandas dataframe
+        """
+        sampling.check_sample_args(n, method)
+        scan_args = self._get_scan_args(columns, filters)
+        if method == 'head':
+            return self.get_dataset().head(int(n), **scan_args).to_pandas(**kwargs)
+        if method == 'reservoir' and self.dataset_format == 'parquet' and scan_args['filter'] is None:
+            return self._sample_row_groups(n, seed, scan_args['columns']).to_pandas(**kwargs)
+        return super().sample(n, method=method, seed=seed, stratify_by=stratify_by, columns=columns, filters=filters, **kwargs)
+
+    def _sample_row_groups(self, n, seed, columns):
+        """Uniform random sample of n rows reading only the row groups containing sampled rows."""
+        dataset = self.get_dataset()
+        row_groups = [row_group for fragment in dataset.get_fragments() for row_group in fragment.split_by_row_group()]
+        offsets = np.cumsum([0] + [row_group.row_groups[0].num_rows for row_group in row_groups])
+        indices = sampling.sample_indices(int(offsets[-1]), n, method='reservoir', seed=seed)
+        if len(indices) == 0:
+            return dataset.head(0, columns=columns)
+        group_ids = np.searchsorted(offsets, indices, side='right') - 1
+        tables = []
+        for group_id in np.unique(group_ids):
+            table = row_groups[group_id].to_table(schema=dataset.schema, columns=columns)
+            tables.append(table.take(pa.array(indices[group_ids == group_id] - offsets[group_id])))
+        return pa.concat_tables(tables)
+
+    def get_dataset(self):
+        """Returns the pyarrow dataset of this source."""
+        return ds.dataset(self.path, format=self.dataset_format)
+
+    def _get_scan_args(self, columns, filters):
+        columns = self.columns if columns is None else columns
+        filters = self.filters if filters is None else filters
+        return {'columns': columns, 'filter': filters_to_expression(filters)}
+
+    @staticmethod
+    def _pop_pandas_read_args(kwargs):
+        """Removes the keyword arguments of the former pandas readers from kwargs.
+
+        Returns:
+            dict of additional dataset scan arguments
+        """
+        engine = kwargs.pop('engine', None)
+        if engine not in PANDAS_ENGINES:
+            raise ValueError(f"engine {engine} is not supported anymore, data is read with pyarrow datasets")
+        unsupported = [k for k in UNSUPPORTED_READ_ARGS if k in kwargs]
+        if unsupported:
+            raise ValueError(f"read arguments {unsupported} of the pandas readers are not supported anymore")
+        if 'use_threads' in kwargs:
+            return {'use_threads': kwargs.pop('use_threads')}
+        return {}
+
+    @staticmethod
+    def _check_output(output):
+        if output not in OUTPUT_TYPES:
+            raise ValueError(f"output {output} not in available output types {OUTPUT_TYPES}")
+
+    @staticmethod
+    def _convert(data, output, **kwargs):
+        """Converts a pyarrow Table or RecordBatch to the requested output type.
+
+        For 'numpy' each column is returned as a separate array which is a
+        zero-copy view on the arrow memory where possible (single chunk of a
+        primitive type without nulls).
+        """
+        if output == 'arrow':
+            return data
+        if output == 'pandas':
+            return data.to_pandas(**kwargs)
+        arrays = {}
+        for name, column in zip(data.schema.names, data.columns):
+            if isinstance(column, pa.ChunkedArray):
+                if column.num_chunks != 1:
+                    arrays[name] = column.to_numpy()
+                    continue
+                column = column.chunk(0)
+            arrays[name] = column.to_numpy(zero_copy_only=False)
+        return arrays
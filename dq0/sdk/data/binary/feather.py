@@ -1,37 +1,31 @@
 # -*- coding: utf-8 -*-
 """Data Source for Apache Arrow Feather files.
 
-This source class provides access to feather data as pandas dataframes.
+This source class provides access to feather data as pandas dataframes,
+pyarrow tables or numpy arrays based on pyarrow datasets.
 
 Copyright 2020, Gradient Zero
 All rights reserved
 """
 
-from dq0.sdk.data.source import Source
+from dq0.sdk.data.binary.arrow_dataset import ArrowDataset
 
-import pandas as pd
 
-
-class Feather(Source):
+class Feather(ArrowDataset):
     """Data Source for Apache Arrow Feather data.
 
-    Provides function to read in feather data.
+    Provides function to read in feather data with column pruning, filter
+    pushdown and record batch streaming.
 
     Args:
-        path (:obj:`str`): Absolute path to the feather file.
+        path (:obj:`str`): Absolute path to the feather file or directory of files.
+        columns (:obj:`list`, optional): Columns to read by default.
+        filters (:obj:`list`, optional): Filters to apply by default.
+        meta_table (optional): Table node of the dataset metadata.
     """
 
-    def __init__(self, path):
-        super().__init__(path)
-        self.type = 'feather'
-
-    def read(self, **kwargs):
-        """Read feather data source
+    dataset_format = 'feather'
 
-        Args:
-            kwargs: keyword arguments.
-
-        Returns:
-            feather data as pandas dataframe
-        """
-        return pd.read_feather(self.path, **kwargs)
+    def __init__(self, path, columns=None, filters=None, meta_table=None):
+        super().__init__(path, columns=columns, filters=filters, meta_table=meta_table)
+        self.type = 'feather'
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""Data Source for memory-mapped NumPy feature matrices.
+
+This source class provides zero-copy access to numeric feature and target
+arrays stored as .npy files. The arrays are memory-mapped read-only, so
+several processes on one node share the same page-cached copy of the data
+instead of each holding its own.
+
+A NPY source directory contains:
+    X.npy: 2-dim feature matrix
+    y.npy: target vector (optional)
+    columns.json: names of the feature and target columns
+
+Use `NPY.convert` to create it once from any other data source. NPY sources
+are created from their directory path, they are not described by dataset
+metadata and not available in the data source factory.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import io
+import json
+import os
+import struct
+
+from dq0.sdk.data import sampling, statistics
+from dq0.sdk.data.source import Source
+
+import numpy as np
+
+import pandas as pd
+
+
+FEATURES_FILENAME = 'X.npy'
+TARGET_FILENAME = 'y.npy'
+COLUMNS_FILENAME = 'columns.json'
+
+
+class NPY(Source):
+    """Data Source for memory-mapped NumPy data.
+
+    Args:
+        path (:obj:`str`): Absolute path to the NPY source directory.
+
+    Attributes:
+        feature_cols (:obj:`list`): names of the columns of X.
+        target_cols (:obj:`list`): names of the columns of y.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.type = 'npy'
+        self.feature_cols = []
+        self.target_cols = []
+        columns_path = os.path.join(path, COLUMNS_FILENAME)
+        if os.path.isfile(columns_path):
+            with open(columns_path) as f:
+                columns = json.load(f)
+            self.feature_cols = columns['feature_cols']
+            self.target_cols = columns['target_cols']
+
+    def read(self, mmap_mode='r'):
+        """Read the feature and target arrays.
+
+        Args:
+            mmap_mode (:obj:`str`, optional): numpy.load memory-map mode.
+                Defaults to 'r' for read-only views. None loads the arrays into memory.
+
+        Returns:
+            tuple (X, y) of numpy arrays. y is None if no target was stored.
+        """
+        X = np.load(os.path.join(self.path, FEATURES_FILENAME), mmap_mode=mmap_mode)
+        y = None
+        target_path = os.path.join(self.path, TARGET_FILENAME)
+        if os.path.isfile(target_path):
+            y = np.load(target_path, mmap_mode=mmap_mode)
+        return X, y
+
+    def sample(self, n, method='head', seed=None, stratify_by=None, mmap_mode='r'):
+        """Draws a sample of n rows
+
+        Only the sampled rows are copied from the memory-mapped arrays.
+
+        Args:
+            n (int): sample size.
+            method (:obj:`str`, optional): 'head', 'reservoir' or 'stratified'. See `Source.sample`.
+                'stratified' stratifies by the target vector y.
+            seed (int, optional): random seed.
+            stratify_by: not supported, the sample is stratified by y.
+            mmap_mode (:obj:`str`, optional): numpy.load memory-map mode. See `read`.
+
+        Returns:
+            tuple (X, y) of numpy arrays. y is None if no target was stored.
+        """
+        if stratify_by is not None:
+            raise ValueError('NPY sources can only be stratified by the target vector y')
+        X, y = self.read(mmap_mode=mmap_mode)
+        if method == 'stratified' and (y is None or y.ndim != 1):
+            raise ValueError('stratified sampling needs a single target column')
+        indices = sampling.sample_indices(len(X), n, method=method, seed=seed, labels=y if method == 'stratified' else None)
+        return np.asarray(X[indices]), None if y is None else np.asarray(y[indices])
+
+    def compute_statistics(self, columns=None, max_workers=1, top_k=10, batch_rows=100000):
+        """Computes the column statistics of X and y in one pass
+
+        Args:
+            columns (:obj:`list`, optional): columns to compute statistics for. Defaults to all columns.
+            max_workers (int, optional): number of batches processed concurrently. Defaults to 1.
+            top_k (int, optional): number of most frequent values to report. Defaults to 10.
+            batch_rows (int, optional): rows per batch.
+
+        Returns:
+            `dq0.sdk.data.statistics.DatasetStatistics` of the source
+        """
+        return statistics.compute_statistics(self._iter_frames(batch_rows), columns=columns, max_workers=max_workers, top_k=top_k)
+
+    def _iter_frames(self, batch_rows):
+        X, y = self.read()
+        feature_cols = self.feature_cols if len(self.feature_cols) == X.shape[1] else list(range(X.shape[1]))
+        for start in range(0, len(X), batch_rows):
+            df = pd.DataFrame(X[start:start + batch_rows], columns=feature_cols)
+            if y is not None:
+                target = y[start:start + batch_rows].reshape(len(df), -1)
+                for i, target_col in enumerate(self.target_cols[:target.shape[1]]):
+                    df[target_col] = target[:, i]
+            yield df
+
+    @staticmethod
+    def convert(source, path, feature_cols=None, target_cols=None, dtype=np.float64, target_dtype=None, batch_rows=100000):
+        """Converts a data source once into a NPY source directory.
+
+        Sources providing `iter_batches` are streamed batch by batch, so the
+        conversion needs memory for one batch only.
+
+        Args:
+            source (:obj:`dq0.sdk.data.Source`): the source to convert.
+            path (:obj:`str`): the NPY source directory to create.
+            feature_cols (:obj:`list`, optional): feature columns.
+                Defaults to the feature_cols attribute of the source.
+            target_cols (:obj:`list`, optional): target columns.
+                Defaults to the target_cols attribute of the source.
+            dtype (optional): dtype of the feature matrix. Defaults to float64.
+            target_dtype (optional): dtype of the target. Defaults to the dtype of the first batch.
+            batch_rows (int, optional): rows per batch for streaming sources.
+
+        Returns:
+            the new NPY data source
+
+        Raises:
+            ValueError: if the source provides no feature columns, non-numeric data or
+                targets that cannot be stored in the target dtype.
+        """
+        feature_cols = getattr(source, 'feature_cols', None) if feature_cols is None else feature_cols
+        target_cols = getattr(source, 'target_cols', None) if target_cols is None else target_cols
+        if feature_cols is None or len(feature_cols) == 0:
+            raise ValueError("no feature columns given. Please set them or provide them in the metadata")
+        target_cols = [] if target_cols is None else target_cols
+
+        if hasattr(source, 'iter_batches'):
+            batches = source.iter_batches(batch_rows=batch_rows)
+        else:
+            batches = [source.read()]
+
+        writer = NPYWriter(path, feature_cols=feature_cols, target_cols=target_cols, dtype=dtype, target_dtype=target_dtype)
+        try:
+            for batch in batches:
+                writer.write(batch)
+            return writer.close()
+        finally:
+            writer.cleanup()
+
+
+class NPYWriter:
+    """Writes a NPY source directory batch by batch.
+
+    Only the current batch is held in memory, the total number of rows does
+    not need to be known in advance.
+
+    Args:
+        path (:obj:`str`): the NPY source directory to create.
+        feature_cols (:obj:`list`): feature columns.
+        target_cols (:obj:`list`, optional): target columns.
+        dtype (optional): dtype of the feature matrix. Defaults to float64.
+        target_dtype (optional): dtype of the target. Defaults to the dtype of the first batch,
+            later batches must be safely castable to it.
+    """
+
+    def __init__(self, path, feature_cols, target_cols=None, dtype=np.float64, target_dtype=None):
+        self.path = path
+        self.feature_cols = list(feature_cols)
+        self.target_cols = [] if target_cols is None else list(target_cols)
+        os.makedirs(path, exist_ok=True)
+        self.X_writer = _NpyWriter(os.path.join(path, FEATURES_FILENAME), n_cols=len(self.feature_cols), dtype=dtype)
+        self.target_dtype = target_dtype
+        self.y_writer = None
+
+    def write(self, batch):
+        """Appends the rows of a dataframe.
+
+        Raises:
+            ValueError: if the batch is no dataframe, has non-numeric feature or target columns or
+                targets that cannot be safely cast to the target dtype, e.g. floats after integers.
+        """
+        if not isinstance(batch, pd.DataFrame):
+            raise ValueError(f"source returned data of type {type(batch)} instead of pandas.DataFrame")
+        self.X_writer.write(_to_numeric(batch[self.feature_cols], dtype=self.X_writer.dtype))
+        if len(self.target_cols) > 0:
+            y = _to_numeric(batch[self.target_cols])
+            if self.y_writer is None:
+                n_cols = None if len(self.target_cols) == 1 else len(self.target_cols)
+                target_dtype = y.dtype if self.target_dtype is None else self.target_dtype
+                self.y_writer = _NpyWriter(os.path.join(self.path, TARGET_FILENAME), n_cols=n_cols, dtype=target_dtype)
+            self.y_writer.write(y.reshape(-1) if len(self.target_cols) == 1 else y)
+
+    def close(self):
+        """Writes the .npy headers and the column names.
+
+        Returns:
+            the new NPY data source
+        """
+        self.X_writer.close()
+        if self.y_writer is not None:
+            self.y_writer.close()
+        with open(os.path.join(self.path, COLUMNS_FILENAME), 'w') as f:
+            json.dump({'feature_cols': self.feature_cols, 'target_cols': self.target_cols}, f)
+        return NPY(self.path)
+
+    def cleanup(self):
+        """Removes the temporary files."""
+        self.X_writer.cleanup()
+        if self.y_writer is not None:
+            self.y_writer.cleanup()
+
+
+def _to_numeric(df, dtype=None):
+    non_numeric_cols = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+    if len(non_numeric_cols) > 0:
+        raise ValueError(f"only numeric columns can be converted, got non-numeric columns {non_numeric_cols}")
+    if dtype is None:
+        values = df.to_numpy()
+        # nullable extension dtypes are returned as object arrays
+        return values if values.dtype != object else df.to_numpy(dtype=np.float64, na_value=np.nan)
+    return df.to_numpy(dtype=dtype, na_value=np.nan)
+
+
+class _NpyWriter:
+    """Writes rows of unknown total count into a .npy file.
+
+    The .npy header depends on the final shape. Space for the header of the
+    largest possible row count is reserved at the start of a temporary file,
+    the rows are appended behind it and on close the header is overwritten
+    in place and the file is renamed, so the data is written only once.
+    """
+
+    def __init__(self, filename, n_cols, dtype):
+        self.filename = filename
+        self.tmp_filename = filename + '.tmp'
+        self.n_cols = n_cols
+        self.dtype = np.dtype(dtype)
+        self.n_rows = 0
+        self.header_size = len(self._get_header(np.iinfo(np.int64).max))
+        self.file = open(self.tmp_filename, 'wb')
+        self.file.write(b' ' * self.header_size)
+
+    def write(self, values):
+        values = np.asarray(values)
+        if not np.can_cast(values.dtype, self.dtype, 'safe'):
+            raise ValueError(f"cannot store {values.dtype} values in {self.filename} of dtype {self.dtype} without loss. "
+                             "Please set the dtype explicitly")
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self.file.write(values.tobytes())
+        self.n_rows += values.shape[0]
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(self._get_header(self.n_rows, size=self.header_size))
+        self.file.close()
+        os.replace(self.tmp_filename, self.filename)
+
+    def _get_header(self, n_rows, size=None):
+        """Returns the .npy version 1.0 header, padded with spaces to size bytes."""
+        shape = (n_rows,) if self.n_cols is None else (n_rows, self.n_cols)
+        header = {'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False, 'shape': shape}
+        buffer = io.BytesIO()
+        np.lib.format.write_array_header_1_0(buffer, header)
+        header = buffer.getvalue()
+        if size is None:
+            return header
+        # magic string, version and header length take the first 10 bytes, the header ends with a newline
+        header_str = header[10:-1].ljust(size - 11) + b'\n'
+        return header[:8] + struct.pack('<H', len(header_str)) + header_str
+
+    def cleanup(self):
+        if not self.file.closed:
+            self.file.close()
+        if os.path.isfile(self.tmp_filename):
+            os.remove(self.tmp_filename)
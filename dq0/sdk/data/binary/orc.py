@@ -1,38 +1,31 @@
 # -*- coding: utf-8 -*-
 """Data Source for Apache ORC files.
 
-This source class provides access to orc data as pandas dataframes.
+This source class provides access to orc data as pandas dataframes,
+pyarrow tables or numpy arrays based on pyarrow datasets.
 
 Copyright 2020, Gradient Zero
 All rights reserved
 """
 
-from dq0.sdk.data.source import Source
+from dq0.sdk.data.binary.arrow_dataset import ArrowDataset
 
-import pandas as pd
 
-
-class ORC(Source):
+class ORC(ArrowDataset):
     """Data Source for Apache ORC data.
 
-    Provides function to read in orc data.
+    Provides function to read in orc data with column pruning, filter
+    pushdown and record batch streaming.
 
     Args:
-        path (:obj:`str`): Absolute path to the orc file.
+        path (:obj:`str`): Absolute path to the orc file or directory of files.
+        columns (:obj:`list`, optional): Columns to read by default.
+        filters (:obj:`list`, optional): Filters to apply by default.
+        meta_table (optional): Table node of the dataset metadata.
     """
 
-    def __init__(self, path):
-        super().__init__(path)
-        self.type = 'orc'
-
-    def read(self, **kwargs):
-        """Read orc data source
+    dataset_format = 'orc'
 
-        Args:
-            kwargs: keyword arguments.
-                May contain columns to define columsn to read.
-
-        Returns:
-            orc data as pandas dataframe
-        """
-        return pd.read_orc(self.path, **kwargs)
+    def __init__(self, path, columns=None, filters=None, meta_table=None):
+        super().__init__(path, columns=columns, filters=filters, meta_table=meta_table)
+        self.type = 'orc'
@@ -1,39 +1,31 @@
 # -*- coding: utf-8 -*-
 """Data Source for Apache Parquet files.
 
-This source class provides access to parquet data as pandas dataframes.
+This source class provides access to parquet data as pandas dataframes,
+pyarrow tables or numpy arrays based on pyarrow datasets.
 
 Copyright 2020, Gradient Zero
 All rights reserved
 """
 
-from dq0.sdk.data.source import Source
+from dq0.sdk.data.binary.arrow_dataset import ArrowDataset
 
-import pandas as pd
 
-
-class Parquet(Source):
+class Parquet(ArrowDataset):
     """Data Source for Apache Parquet data.
 
-    Provides function to read in parquet data.
+    Provides function to read in parquet data with column pruning, filter
+    pushdown and record batch streaming.
 
     Args:
-        path (:obj:`str`): Absolute path to the parquet file.
+        path (:obj:`str`): Absolute path to the parquet file or directory of files.
+        columns (:obj:`list`, optional): Columns to read by default.
+        filters (:obj:`list`, optional): Filters to apply by default.
+        meta_table (optional): Table node of the dataset metadata.
     """
 
-    def __init__(self, path):
-        super().__init__(path)
-        self.type = 'parquet'
-
-    def read(self, **kwargs):
-        """Read parquet data source
+    dataset_format = 'parquet'
 
-        Args:
-            kwargs: keyword arguments.
-                May contain 'engine' to define whether to use pyarrow or fastparquet.
-                May contain columns to define columsn to read.
-
-        Returns:
-            parquet data as pandas dataframe
-        """
-        return pd.read_parquet(self.path, **kwargs)
+    def __init__(self, path, columns=None, filters=None, meta_table=None):
+        super().__init__(path, columns=columns, filters=filters, meta_table=meta_table)
+        self.type = 'parquet'
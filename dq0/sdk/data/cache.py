@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Local on-disk cache for data source reads.
+
+The ReadCache stores the dataframes returned by `Source.read` as Arrow IPC
+(feather) files. Reading a cached frame memory maps the file instead of
+parsing the raw source again.
+
+The cache key combines the source type and path, the modification time and
+size of the source file(s), the source settings (e.g. the CSV connector
+settings taken from the metadata) and the read kwargs. Changing the file or
+any of these settings therefore results in a cache miss. Entries are evicted
+least recently used first once the cache exceeds its maximum size.
+
+Example:
+    ```python
+    data_source = CSV(meta_database)
+    data_source.enable_cache(ReadCache(max_size_bytes=2**30))
+    df = data_source.read()  # parses the CSV file and stores the result
+    df = data_source.read()  # loads the stored result
+    ```
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.dq0', 'cache')
+DEFAULT_MAX_SIZE_BYTES = 10 * 1024 ** 3
+
+# source attributes that do not influence the data read
+IGNORED_SOURCE_ATTRIBUTES = ['uuid', 'name', 'description', 'data', 'cache', 'read_allowed', 'meta_allowed',
+                             'types_allowed', 'stats_allowed', 'sample_allowed', 'sample_path']
+
+CACHE_FILE_EXTENSION = '.feather'
+
+
+class ReadCache:
+    """LRU on-disk cache for dataframes read from file based data sources.
+
+    Args:
+        cache_dir (:obj:`str`, optional): Directory to store the cached frames in.
+            Defaults to ~/.dq0/cache.
+        max_size_bytes (int, optional): Maximum total size of the cache directory.
+            Defaults to 10 GiB.
+    """
+
+    def __init__(self, cache_dir=None, max_size_bytes=DEFAULT_MAX_SIZE_BYTES):
+        self.cache_dir = DEFAULT_CACHE_DIR if cache_dir is None else cache_dir
+        self.max_size_bytes = max_size_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, source, read_kwargs):
+        """Returns the cache key for reading the given source with the given kwargs
+        or None if the source can not be cached (e.g. it is not a local file).
+
+        Args:
+            source (:obj:`dq0.sdk.data.Source`): the data source.
+            read_kwargs (dict): keyword arguments of the read call.
+
+        Returns:
+            cache key as str
+        """
+        file_stats = _get_file_stats(source.path)
+        if file_stats is None:
+            return None
+        settings = {}
+        for k, v in vars(source).items():
+            if k in IGNORED_SOURCE_ATTRIBUTES:
+                continue
+            try:
+                settings[k] = _to_key_value(v)
+            except TypeError:
+                logger.debug(f"Source attribute {k} is not part of the cache key")
+        try:
+            read_kwargs = _to_key_value(read_kwargs)
+        except TypeError as e:
+            logger.debug(f"Read kwargs can not be cached: {e}")
+            return None
+        key_content = json.dumps({
+            'type': source.type,
+            'class': type(source).__name__,
+            'path': os.path.abspath(source.path),
+            'file_stats': file_stats,
+            'settings': settings,
+            'read_kwargs': read_kwargs,
+        }, sort_keys=True)
+        return '{}_{}'.format(_get_path_hash(source.path), hashlib.sha256(key_content.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        """Returns the cached dataframe for the given key or None on a cache miss.
+
+        Args:
+            key (:obj:`str`): the cache key.
+
+        Returns:
+            cached pandas dataframe or None
+        """
+        filename = self._get_filename(key)
+        if not os.path.isfile(filename):
+            return None
+        try:
+            table = feather.read_table(filename, memory_map=True)
+            df = table.to_pandas()
+        except Exception as e:
+            logger.warning(f"Could not load cached data {filename}, removing it: {e}")
+            _remove_file(filename)
+            return None
+        os.utime(filename)  # mark as recently used
+        return df
+
+    def put(self, key, df):
+        """Stores the given dataframe under the given key.
+
+        Dataframes that can not be stored as Arrow IPC file (e.g. with
+        MultiIndex columns) are not cached.
+
+        Args:
+            key (:obj:`str`): the cache key.
+            df (:obj:`pandas.DataFrame`): the dataframe to cache.
+        """
+        if not isinstance(df, pd.DataFrame):
+            return
+        filename = self._get_filename(key)
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        try:
+            table = pa.Table.from_pandas(df)
+            feather.write_feather(table, tmp_filename, compression='uncompressed')
+            os.replace(tmp_filename, filename)
+        except Exception as e:
+            logger.debug(f"Could not cache data: {e}")
+            _remove_file(tmp_filename)
+            return
+        self.evict()
+
+    def invalidate(self, source=None):
+        """Removes the cached entries of the given source or all entries if
+        no source is given.
+
+        Args:
+            source (:obj:`dq0.sdk.data.Source`, optional): the data source.
+        """
+        prefix = '' if source is None else _get_path_hash(source.path)
+        for filename, _, _ in self._get_entries():
+            if os.path.basename(filename).startswith(prefix):
+                _remove_file(filename)
+
+    def clear(self):
+        """Removes all cached entries."""
+        self.invalidate()
+
+    def size(self):
+        """Returns the total size of all cached entries in bytes."""
+        return sum(size for _, size, _ in self._get_entries())
+
+    def evict(self):
+        """Removes the least recently used entries until the cache size is
+        below its maximum size."""
+        entries = sorted(self._get_entries(), key=lambda entry: entry[2])
+        total_size = sum(size for _, size, _ in entries)
+        while total_size > self.max_size_bytes and len(entries) > 0:
+            filename, size, _ = entries.pop(0)
+            _remove_file(filename)
+            total_size -= size
+
+    def _get_filename(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_FILE_EXTENSION)
+
+    def _get_entries(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(CACHE_FILE_EXTENSION):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+
+def _get_path_hash(path):
+    return hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+
+
+def _get_file_stats(path):
+    """Returns (mtime, size) of a file or of all files in a directory or
+    None if the path is not a local file or directory."""
+    if not isinstance(path, str) or not os.path.exists(path):
+        return None
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size]
+    stats = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            stats.append([os.path.relpath(os.path.join(root, name), path), stat.st_mtime_ns, stat.st_size])
+    return sorted(stats)
+
+
+def _to_key_value(value):
+    """Converts a value to a json serializable representation for the cache key.
+
+    Raises:
+        TypeError: if the value has no stable representation.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _to_key_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        values = [_to_key_value(v) for v in value]
+        return sorted(values, key=repr) if isinstance(value, set) else values
+    if hasattr(value, 'tolist'):  # numpy arrays and scalars
+        return _to_key_value(value.tolist())
+    raise TypeError(f"{type(value)} can not be part of a cache key")
+
+
+def _remove_file(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
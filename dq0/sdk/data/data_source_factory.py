@@ -3,51 +3,65 @@
 
 Helper function to create data source instance based on a given type.
 
+Data source classes are registered by dotted path ('module:Class') and
+imported on first use, so creating a CSV source does not import sqlalchemy,
+pyarrow or any database driver.
+
+Third-party packages can provide further data sources through the
+'dq0.sdk.data_sources' entry point group, the entry point name being the
+connector type_name:
+
+    entry_points={'dq0.sdk.data_sources': ['mydb = mypackage.mydb:MyDB']}
+
 Copyright 2020, Gradient Zero
 All rights reserved
 """
-from dq0.sdk.data import binary, image, sql, text
 
+import importlib
+import threading
+
+ENTRY_POINT_GROUP = 'dq0.sdk.data_sources'
 
 data_source_classes = {
-    'excel': binary.excel.Excel,
-    'feather': binary.feather.Feather,
-    'hdf5': binary.hdf5.HDF5,
-    'odf': binary.odf.ODF,
-    'orc': binary.orc.ORC,
-    'parquet': binary.parquet.Parquet,
-    'sas': binary.sas.SAS,
-    'spss': binary.spss.SPSS,
-    'stata': binary.stata.Stata,
-    'image': image.Image,
-    'bigquery': sql.big_query.BigQuery,
-    'drill': sql.drill.Drill,
-    'mssql': sql.mssql.MSSQL,
-    'mysql': sql.mysql.MySQL,
-    'oracle': sql.oracle.Oracle,
-    'postgresql': sql.postgresql.PostgreSQL,
-    'redshift': sql.redshift.Redshift,
-    'saphana': sql.sap_hana.SAPHana,
-    'snowflake': sql.snowflake.Snowflake,
-    'sqlite': sql.sqlite.SQLite,
-    'csv': text.csv.CSV,
-    'json': text.json.JSON
+    'excel': 'dq0.sdk.data.binary.excel:Excel',
+    'feather': 'dq0.sdk.data.binary.feather:Feather',
+    'hdf5': 'dq0.sdk.data.binary.hdf5:HDF5',
+    'odf': 'dq0.sdk.data.binary.odf:ODF',
+    'orc': 'dq0.sdk.data.binary.orc:ORC',
+    'parquet': 'dq0.sdk.data.binary.parquet:Parquet',
+    'sas': 'dq0.sdk.data.binary.sas:SAS',
+    'spss': 'dq0.sdk.data.binary.spss:SPSS',
+    'stata': 'dq0.sdk.data.binary.stata:Stata',
+    'image': 'dq0.sdk.data.image.image:Image',
+    'bigquery': 'dq0.sdk.data.sql.big_query:BigQuery',
+    'drill': 'dq0.sdk.data.sql.drill:Drill',
+    'mssql': 'dq0.sdk.data.sql.mssql:MSSQL',
+    'mysql': 'dq0.sdk.data.sql.mysql:MySQL',
+    'oracle': 'dq0.sdk.data.sql.oracle:Oracle',
+    'postgresql': 'dq0.sdk.data.sql.postgresql:PostgreSQL',
+    'redshift': 'dq0.sdk.data.sql.redshift:Redshift',
+    'saphana': 'dq0.sdk.data.sql.sap_hana:SAPHana',
+    'snowflake': 'dq0.sdk.data.sql.snowflake:Snowflake',
+    'sqlite': 'dq0.sdk.data.sql.sqlite:SQLite',
+    'csv': 'dq0.sdk.data.text.csv:CSV',
+    'json': 'dq0.sdk.data.text.json:JSON'
 }
 
+_lock = threading.Lock()
+_entry_points_loaded = False
 
-def create_from_meta(meta_database):
-    """Returns a matching data source instance based on the given type
-    or None if no data source class for this type was found.
+
+def normalize_type_name(type_name):
+    """Returns the registry key of a connector type name.
+
+    Lower case without spaces, dashes and underscores, e.g. 'SAP_Hana' -> 'saphana'.
 
     Args:
-        type: the type of the data source class to create.
-        *args: positional arguments for the specific data source constructor.
+        type_name (:obj:`str`): the connector type name.
 
     Returns:
-        initialized data source class.
+        normalized type name
     """
-    type_name = meta_database.connector.type_name
-
     if not isinstance(type_name, str) or type_name == '':
         raise ValueError('type must be string!')
 
@@ -55,10 +69,112 @@ def create_from_meta(meta_database):
     type_name = type_name.replace(' ', '')
     type_name = type_name.replace('-', '')
     type_name = type_name.replace('_', '')
+    return type_name
 
-    if type_name not in data_source_classes.keys():
-        raise ValueError(f"type_name {type_name} not found in available types {data_source_classes.keys()}")
 
-    data_class = data_source_classes[type_name]
+def register(type_name, data_class):
+    """Registers a data source class for a connector type.
+
+    Replaces the class registered before for the same type.
+
+    Args:
+        type_name (:obj:`str`): the connector type name.
+        data_class: the data source class or its dotted path 'module:Class'.
+    """
+    if not isinstance(data_class, (str, type)):
+        raise ValueError(f"data_class must be a class or a dotted path 'module:Class', got {data_class}")
+    with _lock:
+        data_source_classes[normalize_type_name(type_name)] = data_class
+
+
+def available_types():
+    """Returns the sorted type names of all registered data sources,
+    including the ones provided through entry points."""
+    _load_entry_points()
+    return sorted(data_source_classes.keys())
+
+
+def get_class(type_name):
+    """Returns the data source class for the given type.
+
+    Imports the module of the class on first use.
+
+    Args:
+        type_name (:obj:`str`): the connector type name.
+
+    Returns:
+        data source class.
+    """
+    type_name = normalize_type_name(type_name)
+    if type_name not in data_source_classes:
+        _load_entry_points()
+    if type_name not in data_source_classes:
+        raise ValueError(f"type_name {type_name} not found in available types {sorted(data_source_classes.keys())}")
+
+    registered = data_source_classes[type_name]
+    if isinstance(registered, type):
+        return registered
+    data_class = _resolve(registered)
+    with _lock:
+        # cache the imported class unless it was re-registered meanwhile
+        if data_source_classes.get(type_name) is registered:
+            data_source_classes[type_name] = data_class
+    return data_class
+
+
+def create_from_meta(meta_database):
+    """Returns a matching data source instance based on the given type
+    or None if no data source class for this type was found.
+
+    Args:
+        meta_database: the database node of the dataset metadata.
+            Its connector type_name selects the data source class.
+
+    Returns:
+        initialized data source class.
+    """
+    data_class = get_class(meta_database.connector.type_name)
 
     return data_class(meta_database)
+
+
+def _resolve(data_class):
+    if hasattr(data_class, 'load'):
+        # entry point
+        return data_class.load()
+    module_name, _, class_name = data_class.partition(':')
+    if class_name == '':
+        module_name, _, class_name = module_name.rpartition('.')
+    try:
+        return getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as e:
+        raise ImportError(f"could not import data source class {data_class}: {e}") from e
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    with _lock:
+        if _entry_points_loaded:
+            return
+        for entry_point in _iter_entry_points():
+            # built-in and explicitly registered types take precedence
+            data_source_classes.setdefault(normalize_type_name(entry_point.name), entry_point)
+        _entry_points_loaded = True
+
+
+def _iter_entry_points():
+    try:
+        from importlib import metadata
+    except ImportError:
+        # python < 3.8
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            import pkg_resources
+            return pkg_resources.iter_entry_points(ENTRY_POINT_GROUP)
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return entry_points.select(group=ENTRY_POINT_GROUP)
+    return entry_points.get(ENTRY_POINT_GROUP, [])
@@ -3,29 +3,52 @@
 
 This is a data source implementation for image data sets.
 
+The image folder is indexed once. Either it contains the images directly or
+one subfolder per label containing the images of that label. The images are
+decoded, resized and normalized lazily in worker threads and handed out as
+fixed-size numpy batches (or as a tf.data.Dataset), so the whole dataset
+never has to be decoded in memory at once.
+
 Copyright 2020, Gradient Zero
 All rights reserved
 """
 
+import collections
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 
+from dq0.sdk.data import sampling
 from dq0.sdk.data.source import Source
 
+import numpy as np
+
 logger = logging.getLogger()
 
+IMAGE_EXTENSIONS = ('.bmp', '.gif', '.jpeg', '.jpg', '.png', '.tif', '.tiff')
+
 
 class Image(Source):
     """Data Source for image dataset.
 
     Attributes:
         folderpath (:obj:`string`): path or url to folder containing the images to load.
-
+        image_size (tuple): (width, height) to resize the images to. None keeps the original size.
+        color_mode (:obj:`string`): PIL image mode to convert the images to, e.g. 'RGB' or 'L'.
+        filepaths (list): indexed image file paths. Set by `index`.
+        labels (:obj:`numpy.ndarray`): label index of every indexed image. None if the folder has no label subfolders.
+        class_names (list): label names, i.e. the names of the label subfolders.
     """
 
-    def __init__(self, folderpath):
+    def __init__(self, folderpath, image_size=None, color_mode='RGB'):
         super().__init__()
         self.type = 'image'
         self.folderpath = folderpath
+        self.image_size = image_size
+        self.color_mode = color_mode
+        self.filepaths = None
+        self.labels = None
+        self.class_names = []
 
     def read(self):
         """Read the image data.
@@ -35,6 +58,176 @@ class Image(Source):
         """
         return self.folderpath
 
+    def index(self, refresh=False):
+        """Indexes the image files of the folder.
+
+        Images in subfolders are labeled with the subfolder name. The index is
+        built once and reused unless refresh is set.
+
+        Args:
+            refresh (bool, optional): True to index the folder again.
+
+        Returns:
+            list of indexed image file paths
+        """
+        if self.filepaths is not None and not refresh:
+            return self.filepaths
+
+        filepaths = [os.path.join(self.folderpath, f) for f in sorted(os.listdir(self.folderpath))
+                     if f.lower().endswith(IMAGE_EXTENSIONS)]
+        class_names = sorted(d for d in os.listdir(self.folderpath) if os.path.isdir(os.path.join(self.folderpath, d)))
+        labels = None
+        if len(filepaths) == 0 and len(class_names) > 0:
+            labels = []
+            for label, class_name in enumerate(class_names):
+                class_folder = os.path.join(self.folderpath, class_name)
+                class_files = [os.path.join(class_folder, f) for f in sorted(os.listdir(class_folder))
+                               if f.lower().endswith(IMAGE_EXTENSIONS)]
+                filepaths.extend(class_files)
+                labels.extend([label] * len(class_files))
+            labels = np.array(labels, dtype=np.int64)
+        else:
+            class_names = []
+
+        self.filepaths = filepaths
+        self.labels = labels
+        self.class_names = class_names
+        return self.filepaths
+
+    def __len__(self):
+        return len(self.index())
+
+    def load_image(self, filepath, normalize=True):
+        """Decodes, converts and resizes a single image.
+
+        Args:
+            filepath (:obj:`string`): path to the image file.
+            normalize (bool, optional): True to scale the pixel values to [0, 1].
+
+        Returns:
+            image as numpy array of shape (height, width[, channels])
+        """
+        from PIL import Image as PILImage
+
+        with PILImage.open(filepath) as img:
+            if img.mode != self.color_mode:
+                img = img.convert(self.color_mode)
+            if self.image_size is not None and img.size != tuple(self.image_size):
+                img = img.resize(tuple(self.image_size))
+            data = np.asarray(img)
+        if normalize:
+            return data.astype(np.float32) / 255.
+        return data
+
+    def iter_batches(self, batch_size=32, shuffle=False, seed=None, normalize=True, num_workers=4, prefetch=2, drop_remainder=False):
+        """Yields batches of decoded images.
+
+        Images are decoded by num_workers threads; up to prefetch batches are
+        decoded ahead of the consumer.
+
+        Args:
+            batch_size (int, optional): number of images per batch.
+            shuffle (bool, optional): True to shuffle the image order.
+            seed (int, optional): seed for shuffling.
+            normalize (bool, optional): True to scale the pixel values to [0, 1].
+            num_workers (int, optional): number of decoding threads.
+            prefetch (int, optional): number of batches to decode ahead.
+            drop_remainder (bool, optional): True to drop a last batch smaller than batch_size.
+
+        Yields:
+            tuple (X, y) of numpy arrays. y is None if the folder has no label subfolders.
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+        if self.image_size is None:
+            logger.warning('image_size is not set, all images must have the same size to be batched')
+
+        order = np.arange(len(self.index()))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        n_batches = len(order) // batch_size if drop_remainder else int(np.ceil(len(order) / batch_size))
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            pending = collections.deque()
+            for i in range(n_batches):
+                indices = order[i * batch_size:(i + 1) * batch_size]
+                pending.append((indices, [executor.submit(self.load_image, self.filepaths[j], normalize) for j in indices]))
+                if len(pending) > prefetch:
+                    yield self._collect_batch(*pending.popleft())
+            while len(pending) > 0:
+                yield self._collect_batch(*pending.popleft())
+
+    def sample(self, n, method='head', seed=None, stratify_by=None, normalize=True, num_workers=4):
+        """Decodes a sample of n images
+
+        Args:
+            n (int): sample size.
+            method (:obj:`str`, optional): 'head', 'reservoir' or 'stratified'. See `Source.sample`.
+                'stratified' stratifies by the labels.
+            seed (int, optional): random seed.
+            stratify_by: not supported, the sample is stratified by the labels.
+            normalize (bool, optional): True to scale the pixel values to [0, 1].
+            num_workers (int, optional): number of decoding threads.
+
+        Returns:
+            tuple (X, y) of numpy arrays. y is None if the folder has no label subfolders.
+        """
+        if stratify_by is not None:
+            raise ValueError('Image sources can only be stratified by their labels')
+        self.index()
+        if method == 'stratified' and self.labels is None:
+            raise ValueError('stratified sampling needs images in label subfolders')
+        indices = sampling.sample_indices(len(self.filepaths), n, method=method, seed=seed,
+                                          labels=self.labels if method == 'stratified' else None)
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = [executor.submit(self.load_image, self.filepaths[i], normalize) for i in indices]
+        return self._collect_batch(indices, futures)
+
+    def compute_statistics(self, columns=None, max_workers=1, top_k=10, **kwargs):
+        """Column statistics are not available for image sources.
+
+        Raises:
+            ValueError: always, images have no tabular columns.
+        """
+        raise ValueError('Image sources have no tabular columns to compute statistics for')
+
+    def to_tf_dataset(self, batch_size=32, shuffle=False, seed=None, normalize=True, num_workers=4, prefetch=2, drop_remainder=False):
+        """Returns a batched and prefetched tf.data.Dataset of the images.
+
+        Args:
+            see `iter_batches`. The image_size attribute must be set.
+
+        Returns:
+            tf.data.Dataset yielding (X, y) batches or X batches if the folder has no label subfolders.
+        """
+        import tensorflow as tf
+
+        if self.image_size is None:
+            raise ValueError('image_size must be set to create a tf.data.Dataset')
+        self.index()
+        if len(self.filepaths) == 0:
+            raise ValueError(f"no images found in {self.folderpath}")
+        # shape and dtype depend on the color mode, e.g. 'P' has no channel axis and 'I' is int32
+        image = self.load_image(self.filepaths[0], normalize=normalize)
+        x_spec = tf.TensorSpec(shape=(None,) + image.shape, dtype=tf.as_dtype(image.dtype))
+
+        def generator():
+            for X, y in self.iter_batches(batch_size=batch_size, shuffle=shuffle, seed=seed, normalize=normalize,
+                                          num_workers=num_workers, prefetch=prefetch, drop_remainder=drop_remainder):
+                yield X if y is None else (X, y)
+
+        if self.labels is None:
+            output_signature = x_spec
+        else:
+            output_signature = (x_spec, tf.TensorSpec(shape=(None,), dtype=tf.int64))
+        dataset = tf.data.Dataset.from_generator(generator, output_signature=output_signature)
+        return dataset.prefetch(tf.data.experimental.AUTOTUNE)
+
+    def _collect_batch(self, indices, futures):
+        X = np.stack([future.result() for future in futures])
+        y = self.labels[indices] if self.labels is not None else None
+        return X, y
+
     def to_json(self):
         """Returns a json representation of this data sources information.
 
@@ -0,0 +1,141 @@
+import math
+import os
+
+
+class Inference:
+    DEFAULT_PRIVACY_LEVEL = 2
+    DEFAULT_MAX_ALLOWED_VALUES = 100
+
+    @staticmethod
+    def dataset_yaml_simple(statistics, name, connector=None, database_name=None, target_cols=None, feature_cols=None, privacy_level=DEFAULT_PRIVACY_LEVEL,
+                            privacy_column=None, bounds_quantiles=None, max_allowed_values=DEFAULT_MAX_ALLOWED_VALUES):
+        if not isinstance(name, str) or len(name) == 0:
+            raise Exception("name is not a non-empty str")
+        target_cols = [] if target_cols is None else target_cols
+        unknown_cols = [col for col in target_cols + (feature_cols if feature_cols is not None else []) if col not in statistics.columns]
+        if len(unknown_cols) != 0:
+            raise Exception(f"columns {unknown_cols} not found in the data")
+        if privacy_column is not None and privacy_column not in statistics.columns:
+            raise Exception(f"privacy_column {privacy_column} not found in the data")
+
+        database_attributes = {'data': {'name': f"{name} database" if database_name is None else database_name}}
+        if connector is not None:
+            database_attributes = {'connector': connector, **database_attributes}
+        table_attributes = {'data': {'name': f"{name} table", 'rows': int(statistics.rows)}}
+        if privacy_column is not None:
+            table_attributes['differential_privacy'] = {'privacy_column': privacy_column}
+        columns = {}
+        for index, column_statistics in enumerate(statistics.columns.values()):
+            is_target = column_statistics.name in target_cols
+            is_feature = not is_target and (feature_cols is None or column_statistics.name in feature_cols)
+            columns[f"column_{index}"] = {'attributes': Inference.column_attributes(
+                column_statistics=column_statistics, is_feature=is_feature, is_target=is_target, bounds_quantiles=bounds_quantiles,
+                max_allowed_values=max_allowed_values)}
+
+        return {'dataset': {
+            'attributes': {
+                'data': {'name': name},
+                'differential_privacy': {'privacy_level': privacy_level},
+            },
+            'child_nodes': {'database': {
+                'attributes': database_attributes,
+                'child_nodes': {'schema': {
+                    'attributes': {'data': {'name': f"{name} schema"}},
+                    'child_nodes': {'table': {
+                        'attributes': table_attributes,
+                        'child_nodes': columns,
+                    }},
+                }},
+            }},
+        }}
+
+    @staticmethod
+    def column_attributes(column_statistics, is_feature=True, is_target=False, bounds_quantiles=None,  # noqa: C901
+                          max_allowed_values=DEFAULT_MAX_ALLOWED_VALUES):
+        data_type_name = Inference.data_type_name(column_statistics=column_statistics)
+        attributes = {'data': {'data_type_name': data_type_name, 'name': str(column_statistics.name)}}
+        machine_learning = {}
+        if is_feature:
+            machine_learning['is_feature'] = True
+        if is_target:
+            machine_learning['is_target'] = True
+        if len(machine_learning) != 0:
+            attributes['machine_learning'] = machine_learning
+        if data_type_name == 'boolean' or column_statistics.count == 0:
+            return attributes
+
+        private_sql_and_synthesis = {}
+        if data_type_name in ['int', 'float', 'datetime']:
+            lower, upper = Inference.bounds(column_statistics=column_statistics, bounds_quantiles=bounds_quantiles)
+            if data_type_name == 'int':
+                lower, upper = int(math.floor(lower)), int(math.ceil(upper))
+            elif data_type_name == 'float':
+                lower, upper = float(lower), float(upper)
+            else:
+                lower, upper = lower.to_pydatetime(), upper.to_pydatetime()
+            private_sql_and_synthesis['lower'] = lower
+            private_sql_and_synthesis['upper'] = upper
+        distinct_values = column_statistics.distinct_values()
+        if data_type_name == 'string':
+            private_sql_and_synthesis['cardinality'] = int(column_statistics.distinct_count())
+            if distinct_values is not None and len(distinct_values) <= max_allowed_values:
+                attributes['private_sql'] = {'allowed_values': [str(value) for value in distinct_values]}
+        elif data_type_name == 'int' and distinct_values is not None and len(distinct_values) <= max_allowed_values:
+            private_sql_and_synthesis['cardinality'] = len(distinct_values)
+        attributes['private_sql_and_synthesis'] = private_sql_and_synthesis
+        return attributes
+
+    @staticmethod
+    def data_type_name(column_statistics):
+        if column_statistics.kind == 'numeric':
+            if column_statistics.is_boolean:
+                return 'boolean'
+            return 'int' if column_statistics.is_integral else 'float'
+        if column_statistics.kind == 'datetime':
+            return 'datetime'
+        return 'string'
+
+    @staticmethod
+    def bounds(column_statistics, bounds_quantiles=None):
+        if bounds_quantiles is None:
+            statistics_dict = column_statistics.to_dict(quantiles=[])
+            return statistics_dict['min'], statistics_dict['max']
+        if len(bounds_quantiles) != 2 or not 0. <= bounds_quantiles[0] <= bounds_quantiles[1] <= 1.:
+            raise Exception(f"bounds_quantiles must be a (lower, upper) pair of quantiles, got {bounds_quantiles}")
+        quantiles = column_statistics.quantiles(quantiles=list(bounds_quantiles))
+        return quantiles[bounds_quantiles[0]], quantiles[bounds_quantiles[1]]
+
+    @staticmethod
+    def connector(source):
+        if source.type == 'csv':
+            connector = {'type_name': 'csv', 'uri': source.path}
+            for key in ['sep', 'decimal', 'header_row', 'skipinitialspace', 'use_original_header']:
+                if getattr(source, key, None) is not None:
+                    connector[key] = getattr(source, key)
+            if getattr(source, 'header_columns', None) is not None:
+                connector['header_columns'] = list(source.header_columns)
+            return connector
+        if source.type == 'postgresql':
+            from sqlalchemy.engine.url import make_url
+            url = make_url(source.connection_string)
+            connector = {'type_name': 'postgresql'}
+            for key, value in [('host', url.host), ('port', url.port), ('username', url.username), ('password', url.password)]:
+                if value is not None:
+                    connector[key] = value
+            return connector
+        return None
+
+    @staticmethod
+    def database_name(source):
+        if source.type == 'postgresql':
+            from sqlalchemy.engine.url import make_url
+            return make_url(source.connection_string).database
+        return None
+
+    @staticmethod
+    def default_name(source):
+        if isinstance(source.name, str) and len(source.name) != 0:
+            return source.name
+        if isinstance(source.path, str) and os.path.exists(source.path):
+            return os.path.splitext(os.path.basename(os.path.normpath(source.path)))[0]
+        return source.type
@@ -1,7 +1,9 @@
+import math
 import os
 
 from dq0.sdk.data.metadata.specification.specification import Specification
 from dq0.sdk.data.metadata.specification.specification_factory import SpecificationFactory
+from dq0.sdk.data.metadata.structure.inference import Inference
 from dq0.sdk.data.metadata.structure.node.node import Node
 from dq0.sdk.data.metadata.structure.node.node_factory import NodeFactory
 
@@ -43,6 +45,46 @@ class Metadata:
         specification = SpecificationFactory.from_specification_string(specification_string=specification_string, role_uuids=role_uuids)
         return NodeFactory.from_yaml_content(yaml_content=node_dict, format_type=format_type, force_list=False), specification
 
+    @staticmethod
+    def infer_from_source(source, name=None, connector=None, target_cols=None, feature_cols=None, privacy_level=Inference.DEFAULT_PRIVACY_LEVEL,
+                          privacy_column=None, bounds_quantiles=None, max_allowed_values=Inference.DEFAULT_MAX_ALLOWED_VALUES, role_uuids=None, **kwargs):
+        """Infers dataset_v1 metadata from the data of a source in one streaming pass.
+
+        Column data types, bounds (min and max or the given bounds_quantiles),
+        cardinality, allowed values of columns with at most max_allowed_values
+        distinct values and the number of rows are taken from
+        `source.compute_statistics`, so the data never has to fit into memory.
+
+        Args:
+            source (:obj:`dq0.sdk.data.Source`): the data source.
+            name (:obj:`str`, optional): dataset name. Defaults to the source name or file name.
+            connector (dict, optional): connector attributes. Derived from csv and postgresql sources by default.
+            target_cols (:obj:`list`, optional): target columns.
+            feature_cols (:obj:`list`, optional): feature columns. Defaults to all non-target columns.
+            privacy_level (int, optional): privacy level of the dataset.
+            privacy_column (:obj:`str`, optional): column identifying the individuals.
+            bounds_quantiles (tuple, optional): (lower, upper) quantiles to use as bounds instead of min and max.
+            max_allowed_values (int, optional): maximum number of distinct values to list as allowed values.
+            role_uuids (optional): role uuids of the specification.
+            kwargs: keyword arguments passed to compute_statistics, e.g. batch_rows and max_workers.
+
+        Returns:
+            the inferred Metadata
+        """
+        top_k = max(10, int(math.ceil(max_allowed_values / 10)))
+        statistics = source.compute_statistics(top_k=top_k, **kwargs)
+        node_dict = Inference.dataset_yaml_simple(
+            statistics=statistics, name=Inference.default_name(source) if name is None else name,
+            connector=Inference.connector(source) if connector is None else connector, database_name=Inference.database_name(source),
+            target_cols=target_cols, feature_cols=feature_cols, privacy_level=privacy_level, privacy_column=privacy_column,
+            bounds_quantiles=bounds_quantiles, max_allowed_values=max_allowed_values)
+        node, specification = Metadata.from_yaml_dict(yaml_dict={
+            'format': NodeFactory.FORMAT_TYPE_SIMPLE,
+            'node': node_dict,
+            'specification': 'dataset_v1',
+        }, role_uuids=role_uuids)
+        return Metadata(nodes={'dataset': node}, specifications={'dataset': specification})
+
     @staticmethod
     def check_nodes(nodes):
         if not isinstance(nodes, dict):
@@ -18,3 +18,25 @@ class Utils:
             if isinstance(data_type_name, str):
                 col_types[meta_column.data.name] = data_type_name
         return col_types if len(col_types) != 0 else None
+
+    @staticmethod
+    def get_col_properties(meta_table):
+        col_properties = {}
+        for meta_column in meta_table:
+            data_type_name = meta_column.data.data_type_name
+            if not isinstance(data_type_name, str):
+                continue
+            properties = {
+                'data_type_name': data_type_name,
+                'lower': None,
+                'upper': None,
+                'cardinality': None,
+                'allowed_values': None,
+            }
+            if data_type_name != 'boolean':
+                properties['lower'] = meta_column.private_sql_and_synthesis.lower
+                properties['upper'] = meta_column.private_sql_and_synthesis.upper
+                properties['cardinality'] = meta_column.private_sql_and_synthesis.cardinality
+                properties['allowed_values'] = meta_column.private_sql.allowed_values
+            col_properties[meta_column.data.name] = properties
+        return col_properties if len(col_properties) != 0 else None
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Sampling of data sources without reading them completely.
+
+The functions of this module draw samples from a stream of dataframe
+batches in a single pass with memory bounded by the sample size:
+
+    head: the first n rows.
+    reservoir: n rows drawn uniformly at random (reservoir sampling).
+    stratified: n rows drawn uniformly at random within every stratum of a
+        column, the strata keeping their proportions in the data.
+
+`sample_indices` implements the same methods for sources with random
+access, e.g. memory-mapped arrays or indexed image folders.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import numpy as np
+
+import pandas as pd
+
+
+SAMPLE_METHODS = ['head', 'reservoir', 'stratified']
+
+
+def check_sample_args(n, method):
+    """Checks the sample size and method.
+
+    Raises:
+        ValueError: if n is not a positive integer or the method is unknown.
+    """
+    if not isinstance(n, (int, np.integer)) or isinstance(n, bool) or n < 1:
+        raise ValueError(f"n must be a positive integer, got {n}")
+    if method not in SAMPLE_METHODS:
+        raise ValueError(f"sample method {method} not in available methods {SAMPLE_METHODS}")
+
+
+def sample_batches(batches, n, method='head', seed=None, stratify_by=None):
+    """Draws a sample of n rows from an iterable of dataframes in a single pass.
+
+    Iteration stops as soon as the sample is complete, i.e. after n rows for
+    method 'head'.
+
+    Args:
+        batches: iterable of pandas dataframes.
+        n (int): sample size.
+        method (:obj:`str`, optional): 'head', 'reservoir' or 'stratified'. Defaults to 'head'.
+        seed (int, optional): random seed.
+        stratify_by (:obj:`str`, optional): column to stratify by. Required for method 'stratified'.
+
+    Returns:
+        sample as pandas dataframe with the rows in source order.
+        Fewer than n rows if the data has fewer rows.
+    """
+    check_sample_args(n, method)
+    if method == 'stratified' and stratify_by is None:
+        raise ValueError('stratified sampling needs a column to stratify by')
+
+    rng = np.random.default_rng(seed)
+    try:
+        if method == 'head':
+            return _head(batches, n)
+        if method == 'reservoir':
+            reservoir = _Reservoir(n)
+            for batch in _check_batches(batches):
+                reservoir.add(batch, rng)
+            return reservoir.get()
+        return _stratified(batches, n, stratify_by, rng)
+    finally:
+        if hasattr(batches, 'close'):
+            batches.close()  # release the underlying file or connection
+
+
+def sample_indices(n_total, n, method='head', seed=None, labels=None):
+    """Draws the row indices of a sample of n rows out of n_total rows.
+
+    Args:
+        n_total (int): total number of rows.
+        n (int): sample size.
+        method (:obj:`str`, optional): 'head', 'reservoir' or 'stratified'. Defaults to 'head'.
+        seed (int, optional): random seed.
+        labels (:obj:`numpy.ndarray`, optional): stratum of every row. Required for method 'stratified'.
+
+    Returns:
+        sorted numpy array of at most n row indices
+    """
+    check_sample_args(n, method)
+    rng = np.random.default_rng(seed)
+    if method == 'head':
+        return np.arange(min(n, n_total))
+    if method == 'reservoir':
+        return np.sort(rng.choice(n_total, size=min(n, n_total), replace=False))
+
+    if labels is None:
+        raise ValueError('stratified sampling needs labels to stratify by')
+    labels = np.asarray(labels)
+    if labels.ndim != 1 or len(labels) != n_total:
+        raise ValueError(f"labels must be a vector of length {n_total}, got shape {labels.shape}")
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    sizes = allocate(counts, n)
+    indices = [rng.choice(np.nonzero(inverse == i)[0], size=size, replace=False) for i, size in enumerate(sizes) if size > 0]
+    return np.sort(np.concatenate(indices))
+
+
+def allocate(counts, n):
+    """Allocates a sample size to strata proportionally to their sizes.
+
+    The rounding remainder goes to the strata with the largest fractional
+    parts, so the sizes add up to min(n, sum(counts)).
+
+    Args:
+        counts: number of rows per stratum.
+        n (int): total sample size.
+
+    Returns:
+        numpy array of the sample size per stratum
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    total = counts.sum()
+    if total <= n:
+        return counts
+    quotas = counts * n / total
+    sizes = np.floor(quotas).astype(np.int64)
+    remainder = n - sizes.sum()
+    sizes[np.argsort(sizes - quotas, kind='stable')[:remainder]] += 1
+    return np.minimum(sizes, counts)
+
+
+def _check_batches(batches):
+    for batch in batches:
+        if not isinstance(batch, pd.DataFrame):
+            raise ValueError(f"source returned data of type {type(batch)} instead of pandas.DataFrame")
+        yield batch
+
+
+def _head(batches, n):
+    parts = []
+    n_rows = 0
+    for batch in _check_batches(batches):
+        parts.append(batch.iloc[:n - n_rows])
+        n_rows += len(parts[-1])
+        if n_rows >= n:
+            break
+    if len(parts) == 0:
+        return pd.DataFrame()
+    return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+
+def _stratified(batches, n, stratify_by, rng):
+    # one reservoir of size n per stratum. Every stratum needs at most n rows.
+    reservoirs = {}
+    columns = None
+    for batch in _check_batches(batches):
+        if stratify_by not in batch.columns:
+            raise ValueError(f"stratify_by column {stratify_by} not in columns {list(batch.columns)}")
+        columns = batch.iloc[:0] if columns is None else columns
+        for key, group in batch.groupby(stratify_by, sort=False, dropna=False, observed=True):
+            reservoirs.setdefault(key, _Reservoir(n)).add(group, rng)
+    if len(reservoirs) == 0:
+        return pd.DataFrame() if columns is None else columns
+
+    reservoirs = list(reservoirs.values())
+    sizes = allocate([r.seen for r in reservoirs], n)
+    parts = []
+    positions = []
+    for reservoir, size in zip(reservoirs, sizes):
+        if size == 0:
+            continue
+        selected = rng.choice(len(reservoir.positions), size=size, replace=False)
+        parts.append(reservoir.data.iloc[selected])
+        positions.append(reservoir.positions[selected])
+    data = pd.concat(parts)
+    return data.iloc[np.argsort(np.concatenate(positions), kind='stable')]
+
+
+class _Reservoir:
+    """Uniform random sample of at most n rows of a stream of dataframes.
+
+    Batches are processed vectorized: every row gets its reservoir slot
+    drawn at once and later rows replace earlier rows of the same slot, as
+    if the rows were processed one by one (algorithm R).
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.seen = 0
+        self.data = None
+        self.positions = np.empty(0, dtype=np.int64)  # stream position of every sampled row
+
+    def add(self, batch, rng):
+        m = len(batch)
+        if m == 0:
+            if self.data is None:
+                self.data = batch
+            return
+        stream_positions = self.seen + np.arange(m, dtype=np.int64)
+        slots = np.where(stream_positions < self.n, stream_positions, -1)
+        replacing = stream_positions >= self.n
+        drawn = np.floor(rng.random(replacing.sum()) * (stream_positions[replacing] + 1)).astype(np.int64)
+        slots[replacing] = np.where(drawn < self.n, drawn, -1)
+        self.seen += m
+
+        selected = np.nonzero(slots >= 0)[0][::-1]
+        if len(selected) == 0:
+            return
+        # keep only the last row written to every slot
+        _, last = np.unique(slots[selected], return_index=True)
+        selected = selected[last]
+
+        n_sampled = len(self.positions)
+        size = min(self.n, self.seen)
+        take = np.arange(size)
+        take[slots[selected]] = n_sampled + np.arange(len(selected))
+        previous = batch.iloc[:0] if self.data is None else self.data
+        self.data = pd.concat([previous, batch.iloc[selected]]).iloc[take]
+        self.positions = np.concatenate([self.positions, stream_positions[selected]])[take]
+
+    def get(self):
+        """Returns the sampled rows in stream order."""
+        if self.data is None:
+            return pd.DataFrame()
+        return self.data.iloc[np.argsort(self.positions, kind='stable')]
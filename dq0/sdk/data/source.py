@@ -5,13 +5,29 @@ The source class serves as the base class for all data sources.
 
 Implementing subclasses have to define at least read
 
+The read results of file based sources can be cached on disk by enabling
+a `dq0.sdk.data.cache.ReadCache` for the source.
+
+`aread` is the asyncio counterpart of read. It runs read in a worker thread,
+so several sources can be read concurrently with `aread_all`.
+
+`sample` draws a sample without reading the whole source. See
+`dq0.sdk.data.sampling` for the available methods.
+
+`compute_statistics` computes mergeable column statistics in one pass.
+See `dq0.sdk.data.statistics`.
+
 Copyright 2020, Gradient Zero
 All rights reserved
 """
 
+import asyncio
+import functools
 import uuid
 from abc import ABC, abstractmethod
 
+DEFAULT_BATCH_ROWS = 65536
+
 
 class Source(ABC):
     """Abstract base class for all data connector sources
@@ -37,8 +53,15 @@ class Source(ABC):
         sample_allowed (bool): True if there is sample data for this source
         path (:obj:`str`): Path to the data (filepath, URI)
         sample_path (:obj:`str`): Path to the data containing sample data. (filepath, URI)
+        cache (:obj:`dq0.sdk.data.cache.ReadCache`): Cache for read results. None if disabled.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # serve read calls of all implementing subclasses from the cache if enabled
+        if 'read' in cls.__dict__ and not getattr(cls.__dict__['read'], '_cached_read', False):
+            cls.read = _cached_read(cls.__dict__['read'])
+
     def __init__(self, path=None, **kwargs):
         super().__init__()
         self.uuid = uuid.uuid1()  # UUID for this data source. Will be set at runtime.
@@ -53,6 +76,7 @@ class Source(ABC):
         self.sample_allowed = False
         self.path = path
         self.sample_path = None
+        self.cache = None
 
     @abstractmethod
     def read(self, **kwargs):
@@ -69,6 +93,106 @@ class Source(ABC):
         """
         raise NotImplementedError()
 
+    async def aread(self, executor=None, **kwargs):
+        """Read data sources asynchronously
+
+        Runs read in a thread of the given executor so that the event loop
+        can overlap the I/O of several sources.
+
+        Args:
+            executor (:obj:`concurrent.futures.Executor`, optional): executor to run read in.
+                Defaults to the event loop's default executor.
+            kwargs: keyword arguments passed to read
+
+        Returns:
+            data read from the data source.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(self.read, **kwargs))
+
+    def sample(self, n, method='head', seed=None, stratify_by=None, **kwargs):
+        """Draws a sample of n rows
+
+        Sources providing `iter_batches` are streamed in a single pass with
+        memory bounded by the sample size, streaming stops after n rows for
+        method 'head'. Other sources are read completely and sampled.
+        Subclasses push the sampling down to the underlying storage where
+        possible.
+
+        Args:
+            n (int): sample size.
+            method (:obj:`str`, optional): 'head' for the first n rows, 'reservoir' for
+                a uniform random sample or 'stratified' for a uniform random sample per
+                stratum of the stratify_by column. Defaults to 'head'.
+            seed (int, optional): random seed.
+            stratify_by (:obj:`str`, optional): column to stratify by.
+                Defaults to the first target column.
+            kwargs: keyword arguments passed to iter_batches or read
+
+        Returns:
+            sample as pandas dataframe
+        """
+        from dq0.sdk.data import sampling
+        sampling.check_sample_args(n, method)
+        if method == 'stratified' and stratify_by is None:
+            stratify_by = self._get_default_stratify_by()
+
+        if hasattr(self, 'iter_batches'):
+            batch_rows = kwargs.pop('batch_rows', n if method == 'head' else DEFAULT_BATCH_ROWS)
+            batches = self.iter_batches(batch_rows=batch_rows, **kwargs)
+        else:
+            batches = [self.read(**kwargs)]
+        return sampling.sample_batches(batches, n, method=method, seed=seed, stratify_by=stratify_by)
+
+    def compute_statistics(self, columns=None, max_workers=1, top_k=10, **kwargs):
+        """Computes the column statistics in one pass
+
+        Sources providing `iter_batches` are streamed, other sources are
+        read completely.
+
+        Args:
+            columns (:obj:`list`, optional): columns to compute statistics for. Defaults to all columns.
+            max_workers (int, optional): number of batches processed concurrently. Defaults to 1.
+            top_k (int, optional): number of most frequent values to report. Defaults to 10.
+            kwargs: keyword arguments passed to iter_batches or read
+
+        Returns:
+            `dq0.sdk.data.statistics.DatasetStatistics` of the source
+        """
+        from dq0.sdk.data import statistics
+        if hasattr(self, 'iter_batches'):
+            batches = self.iter_batches(batch_rows=kwargs.pop('batch_rows', DEFAULT_BATCH_ROWS), **kwargs)
+        else:
+            batches = [self.read(**kwargs)]
+        return statistics.compute_statistics(batches, columns=columns, max_workers=max_workers, top_k=top_k)
+
+    def _get_default_stratify_by(self):
+        target_cols = getattr(self, 'target_cols', None)
+        if target_cols is None or len(target_cols) == 0:
+            raise ValueError('stratified sampling needs stratify_by or a target column in the metadata')
+        return target_cols[0]
+
+    def enable_cache(self, cache=None):
+        """Enables caching of the read results of this source.
+
+        Args:
+            cache (:obj:`dq0.sdk.data.cache.ReadCache`, optional): The cache to use.
+                Defaults to a cache in the default cache directory.
+        """
+        if cache is None:
+            from dq0.sdk.data.cache import ReadCache
+            cache = ReadCache()
+        self.cache = cache
+
+    def disable_cache(self):
+        """Disables caching of the read results of this source."""
+        self.cache = None
+
+    def invalidate_cache(self):
+        """Removes the cached read results of this source."""
+        if self.cache is not None:
+            self.cache.invalidate(self)
+
     def to_json(self):  # noqa: C901
         """Returns a json representation of this data sources information.
 
@@ -98,3 +222,36 @@ class Source(ABC):
             "sample_path": self.sample_path,
             "permissions": permissions,
         }
+
+
+async def aread_all(sources, executor=None, **kwargs):
+    """Reads the given data sources concurrently.
+
+    Args:
+        sources (:obj:`list`): the data sources to read.
+        executor (:obj:`concurrent.futures.Executor`, optional): executor to run the reads in.
+        kwargs: keyword arguments passed to the read method of every source
+
+    Returns:
+        list of the data read from the sources, in the order of the sources.
+    """
+    return await asyncio.gather(*[source.aread(executor=executor, **kwargs) for source in sources])
+
+
+def _cached_read(read):
+    """Wraps a read method to serve its results from the source's cache."""
+    @functools.wraps(read)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, 'cache', None)
+        if cache is None or len(args) != 0:
+            return read(self, *args, **kwargs)
+        key = cache.get_key(self, kwargs)
+        if key is None:
+            return read(self, **kwargs)
+        data = cache.get(key)
+        if data is None:
+            data = read(self, **kwargs)
+            cache.put(key, data)
+        return data
+    wrapper._cached_read = True
+    return wrapper
@@ -41,6 +41,35 @@ class BigQuery(SQL):
         Returns:
             SQL ResultSet as pandas dataframe
         """
+        rows = self._list_rows(query)
+
+        # either create temporary table or return result set as dataframe
+        df = rows.to_dataframe(create_bqstorage_client=False)
+
+        # return pandas dataframe
+        return df
+
+    def iter_batches(self, query=None, batch_rows=10000, **kwargs):
+        """Execute SQL query and stream the result set page by page
+
+        Args:
+            query: SQL Query to execute. Defaults to the query attribute.
+            batch_rows (int): maximum number of rows per batch.
+            kwargs: keyword arguments
+
+        Yields:
+            SQL ResultSet batches as pandas dataframes
+        """
+        query = self.query if query is None else query
+        if not isinstance(batch_rows, int) or batch_rows < 1:
+            raise ValueError(f"batch_rows must be a positive integer, got {batch_rows}")
+
+        rows = self._list_rows(query, page_size=batch_rows)
+        for df in rows.to_dataframe_iterable():
+            yield df
+
+    def _list_rows(self, query, page_size=None):
+        """Runs the query and returns the row iterator of its result table."""
         # check query
         if query is None:
             raise ValueError('you need to pass a query parameter')
@@ -70,11 +99,6 @@ class BigQuery(SQL):
             max_results=None,
             page_token=None,
             start_index=None,
-            page_size=None,
+            page_size=page_size,
         )
-
-        # either create temporary table or return result set as dataframe
-        df = rows.to_dataframe(create_bqstorage_client=False)
-
-        # return pandas dataframe
-        return df
+        return rows
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Process-wide registry of SQLAlchemy engines.
+
+All SQL data sources get their engine from this registry. Sources connecting
+to the same database share one engine and thereby one connection pool
+instead of each opening their own sockets.
+
+Example:
+    ```python
+    from dq0.sdk.data.sql import engine_registry
+
+    # optional: change the pool settings before the sources are created
+    engine_registry.configure(pool_size=10, max_overflow=20, pool_recycle=3600)
+
+    engine = engine_registry.get_engine('postgresql+psycopg2://user@host/db')
+    ```
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import logging
+import threading
+
+import sqlalchemy
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SETTINGS = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_recycle': 3600,
+    'pool_pre_ping': True,
+}
+
+_pool_settings = dict(DEFAULT_POOL_SETTINGS)
+_engines = {}
+_lock = threading.Lock()
+
+
+def configure(**pool_settings):
+    """Sets the default pool settings for engines created afterwards.
+
+    Args:
+        pool_settings: pool_size, max_overflow, pool_recycle and pool_pre_ping
+            as accepted by sqlalchemy.create_engine.
+    """
+    unknown = [k for k in pool_settings if k not in DEFAULT_POOL_SETTINGS]
+    if len(unknown) > 0:
+        raise ValueError(f"unknown pool settings {unknown}, allowed are {list(DEFAULT_POOL_SETTINGS.keys())}")
+    with _lock:
+        _pool_settings.update(pool_settings)
+
+
+def get_pool_settings():
+    """Returns the current default pool settings."""
+    with _lock:
+        return dict(_pool_settings)
+
+
+def get_engine(connection_string, **pool_settings):
+    """Returns the shared engine for the given connection string.
+
+    The engine is created on first use with the default pool settings
+    updated by the given pool settings. Engines are keyed by connection
+    string and pool settings.
+
+    Args:
+        connection_string (:obj:`str`): The sqlalchemy connection string.
+        pool_settings: settings overriding the default pool settings.
+
+    Returns:
+        sqlalchemy engine
+    """
+    with _lock:
+        settings = dict(_pool_settings, **pool_settings)
+        key = (connection_string, tuple(sorted(settings.items())))
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _create_engine(connection_string, settings)
+            _engines[key] = engine
+        return engine
+
+
+def dispose(connection_string=None):
+    """Closes the pooled connections and removes the engines from the registry.
+
+    Args:
+        connection_string (:obj:`str`, optional): Only dispose the engines of
+            this connection string. Defaults to all engines.
+    """
+    with _lock:
+        for key in list(_engines.keys()):
+            if connection_string is None or key[0] == connection_string:
+                _engines.pop(key).dispose()
+
+
+def _create_engine(connection_string, settings):
+    url = make_url(connection_string)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in [None, '', ':memory:']:
+            # every connection to an in-memory database is a new database, keep sqlalchemy's default pool
+            return sqlalchemy.create_engine(connection_string)
+        # the sqlite default pool does not keep connections, use a thread-safe queue pool instead
+        return sqlalchemy.create_engine(connection_string, poolclass=QueuePool,
+                                        connect_args={'check_same_thread': False}, **settings)
+    return sqlalchemy.create_engine(connection_string, **settings)
@@ -9,12 +9,9 @@ Copyright 2020, Gradient Zero
 All rights reserved
 """
 
+from dq0.sdk.data.sql import engine_registry
 from dq0.sdk.data.sql.sql import SQL
 
-import pandas as pd
-
-import sqlalchemy
-
 
 class MSSQL(SQL):
     """Data Source for MSSQL data.
@@ -30,7 +27,7 @@ class MSSQL(SQL):
     def __init__(self, connection_string):
         super().__init__(connection_string)
         self.type = 'mssql'
-        self.engine = sqlalchemy.create_engine(connection_string)
+        self.engine = engine_registry.get_engine(connection_string)
 
     def execute(self, query, **kwargs):
         """Execute MSSQL query
@@ -46,5 +43,4 @@ class MSSQL(SQL):
         if query is None:
             raise ValueError('you need to pass the query')
 
-        connection = self.get_connection()
-        return pd.read_sql_query(query, connection, **kwargs)
+        return self._read_sql_query(query, **kwargs)
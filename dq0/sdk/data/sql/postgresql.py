@@ -9,12 +9,10 @@ Copyright 2020, Gradient Zero
 All rights reserved
 """
 
+from dq0.sdk.data.metadata.structure.utils.utils import Utils as MetaUtils
+from dq0.sdk.data.sql import engine_registry
 from dq0.sdk.data.sql.sql import SQL
 
-import pandas as pd
-
-import sqlalchemy
-
 
 class PostgreSQL(SQL):
     """Data Source for PostgreSQL data.
@@ -47,7 +45,13 @@ class PostgreSQL(SQL):
         connection_string = f"postgresql+psycopg2://{username}{password_sep}{password}{user_sep}{host}{port_sep}{port}{database_sep}{database}"
         super().__init__(connection_string)
         self.type = 'postgresql'
-        self.engine = sqlalchemy.create_engine(connection_string)
+        self.engine = engine_registry.get_engine(connection_string)
+
+        if len(meta_database) != 0 and len(meta_database.schema()) != 0:
+            meta_table = meta_database.schema().table()
+            self.feature_cols, self.target_cols = MetaUtils.get_feature_target_cols(meta_table=meta_table)
+            self.col_types = MetaUtils.get_col_types(meta_table=meta_table)
+            self.col_properties = MetaUtils.get_col_properties(meta_table=meta_table)
 
     def execute(self, query, **kwargs):
         """Execute the Postgres query
@@ -63,5 +67,4 @@ class PostgreSQL(SQL):
         if query is None:
             raise ValueError('you need to pass the query')
 
-        connection = self.get_connection()
-        return pd.read_sql_query(query, connection, **kwargs)
+        return self._read_sql_query(query, **kwargs)
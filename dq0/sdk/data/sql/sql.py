@@ -1,13 +1,40 @@
 # -*- coding: utf-8 -*-
 """Data Source base class for SQL-based data sources.
 
+The engines of all SQL sources come from the process-wide
+`dq0.sdk.data.sql.engine_registry`. Queries check out a pooled connection
+and return it to the pool afterwards.
+
+Large tables can be extracted in partitions: the range of a numeric or
+datetime partition column is split into equally sized ranges that are
+fetched concurrently on pooled connections.
+
+Samples are drawn in the database where possible, so only the sampled
+rows are transferred.
+
 Copyright 2020, Gradient Zero
 All rights reserved
 """
+import collections
+import datetime
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
 from dq0.sdk.data.source import Source
 
+import numpy as np
+
+import pandas as pd
+
+# dialects supporting TABLESAMPLE BERNOULLI ... REPEATABLE
+TABLESAMPLE_DIALECTS = ['postgresql']
+RANDOM_FUNCTIONS = {
+    'bigquery': 'RAND()',
+    'mssql': 'NEWID()',
+    'mysql': 'RAND()',
+    'oracle': 'DBMS_RANDOM.VALUE',
+}
+
 
 class SQL(Source):
     """Data Source base class for SQL data.
@@ -15,9 +42,12 @@ class SQL(Source):
     Attributes:
         query (:obj:`str`): SQL query.
         connection_string (:obj:`str`): General purpose SQL data source connection string.
-        engine: the used sqlalchemy engine
-        engine_connection: the active sql connection
+        engine: the used sqlalchemy engine, shared with all sources of the same connection string
+        connection: the raw DBAPI connection pinned by `get_connection`
         type: the datasource type
+        partition_column (:obj:`str`): Column to partition reads by. None to read with a single query.
+        num_partitions (int): Number of partitions to read concurrently.
+        col_properties (dict): Column properties from the metadata, used for partition bounds.
 
     Args:
         connection (:obj:`str`): General purpose SQL data source connection string.
@@ -30,6 +60,9 @@ class SQL(Source):
         self.engine = None
         self.connection = None
         self.type = 'sql'
+        self.partition_column = None
+        self.num_partitions = 1
+        self.col_properties = None
 
     @abstractmethod
     def execute(self, query=None, **kwargs):
@@ -49,7 +82,9 @@ class SQL(Source):
     def get_connection(self):
         """Returns the active sql connection.
 
-        Initiates the connection if not already done.
+        Initiates the connection if not already done. The connection stays
+        checked out of the pool until `close` is called. Prefer `connect`
+        to check out a connection for a single query.
 
         Returns:
             Active sql connection. Throws error if engine is not set.
@@ -63,16 +98,333 @@ class SQL(Source):
         self.connection = self.engine.raw_connection()
         return self.connection
 
-    def read(self, **kwargs):
+    def connect(self):
+        """Checks out a connection from the engine's pool.
+
+        Use it as context manager to return the connection to the pool
+        once the query is done.
+
+        Returns:
+            sqlalchemy connection. Throws error if engine is not set.
+        """
+        if self.engine is None:
+            raise ValueError('could not find valid engine')
+        return self.engine.connect()
+
+    def close(self):
+        """Returns the connection pinned by `get_connection` to the pool."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def read(self, partition_column=None, num_partitions=None, lower_bound=None, upper_bound=None, max_workers=None, **kwargs):
         """Runs overriden 'execute' method with query parameter
 
+        If a partition column and more than one partition are given the
+        query is split into partitions that are executed concurrently.
+        See `iter_partitions`.
+
         Args:
+            partition_column (:obj:`str`, optional): Numeric or datetime column to partition by.
+                Defaults to the partition_column attribute.
+            num_partitions (int, optional): Number of partitions. Defaults to the num_partitions attribute.
+            lower_bound (optional): Lower bound of the partition column.
+            upper_bound (optional): Upper bound of the partition column.
+            max_workers (int, optional): Maximum number of concurrent queries.
+                Defaults to num_partitions, at most the pool capacity of the engine.
             kwargs: keyword arguments
 
         Returns:
-            CSV data as pandas dataframe
+            SQL ResultSet as pandas dataframe
+        """
+        partition_column = self.partition_column if partition_column is None else partition_column
+        num_partitions = self.num_partitions if num_partitions is None else num_partitions
+        if partition_column is None or num_partitions is None or num_partitions <= 1:
+            return self.execute(query=self.query, **kwargs)
+
+        partitions = list(self.iter_partitions(partition_column, num_partitions, lower_bound=lower_bound, upper_bound=upper_bound,
+                                               max_workers=max_workers, **kwargs))
+        return pd.concat(partitions, ignore_index=True)
+
+    def iter_partitions(self, partition_column, num_partitions, query=None, lower_bound=None, upper_bound=None, max_workers=None, **kwargs):
+        """Execute SQL query in partitions and yield the results in partition order
+
+        The range between lower and upper bound of the partition column is
+        split into num_partitions equally sized ranges. The first partition
+        additionally contains all rows below the lower bound and all NULL
+        values, the last partition all rows above the upper bound, so no
+        rows are lost if the bounds do not cover the data.
+
+        Bounds not given are taken from the column metadata (lower, upper)
+        or are queried from the database.
+
+        Up to max_workers partitions are fetched concurrently, each on its
+        own pooled connection. By default max_workers is capped by the pool
+        capacity (pool_size + max_overflow) of the engine, more workers
+        would wait for a connection and fail with the pool timeout.
+
+        Args:
+            partition_column (:obj:`str`): Numeric or datetime column to partition by.
+            num_partitions (int): Number of partitions.
+            query: SQL Query to execute. Defaults to the query attribute.
+            lower_bound (optional): Lower bound of the partition column.
+            upper_bound (optional): Upper bound of the partition column.
+            max_workers (int, optional): Maximum number of concurrent queries.
+                Defaults to num_partitions, at most the pool capacity of the engine.
+            kwargs: keyword arguments passed to execute
+
+        Yields:
+            SQL ResultSet partitions as pandas dataframes
+        """
+        query = self.query if query is None else query
+        if query is None:
+            raise ValueError('you need to pass the query')
+        if not isinstance(num_partitions, int) or num_partitions < 1:
+            raise ValueError(f"num_partitions must be a positive integer, got {num_partitions}")
+        query = query.strip().rstrip(';')
+
+        lower_bound, upper_bound = self._get_partition_bounds(query, partition_column, lower_bound, upper_bound)
+        if lower_bound is None or upper_bound is None:  # empty result set
+            yield self.execute(query=query, **kwargs)
+            return
+        queries = self._get_partition_queries(query, partition_column, num_partitions, lower_bound, upper_bound)
+
+        if max_workers is None:
+            pool_capacity = self._get_pool_capacity()
+            max_workers = len(queries) if pool_capacity is None else max(1, min(len(queries), pool_capacity))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # keep at most max_workers partitions in flight to bound memory when streaming
+            futures = collections.deque()
+            for partition_query in queries:
+                futures.append(executor.submit(self.execute, query=partition_query, **kwargs))
+                if len(futures) >= max_workers:
+                    yield futures.popleft().result()
+            while len(futures) > 0:
+                yield futures.popleft().result()
+
+    def sample(self, n, method='head', seed=None, stratify_by=None, query=None, table=None, **kwargs):
+        """Draws a sample of n rows
+
+        'head' is pushed down as a LIMIT query. 'reservoir' is pushed down as
+        TABLESAMPLE query on PostgreSQL if a table is given, otherwise as
+        random ordered LIMIT query if no seed is given. Random functions of
+        databases can not be seeded portably, so with a seed and for
+        'stratified' the result set is streamed and sampled client-side in a
+        single pass.
+
+        Args:
+            n (int): sample size.
+            method (:obj:`str`, optional): 'head', 'reservoir' or 'stratified'. See `Source.sample`.
+            seed (int, optional): random seed.
+            stratify_by (:obj:`str`, optional): column to stratify by.
+                Defaults to the first target column.
+            query: SQL Query to sample. Defaults to the query attribute.
+            table (:obj:`str`, optional): Table to sample instead of the query.
+            kwargs: keyword arguments passed to execute
+
+        Returns:
+            sample as pandas dataframe
+        """
+        from dq0.sdk.data import sampling
+        sampling.check_sample_args(n, method)
+        query = self.query if query is None else query
+        if table is not None:
+            query = f"SELECT * FROM {self._quote(table)}"
+        if query is None:
+            raise ValueError('you need to pass the query')
+        query = query.strip().rstrip(';')
+
+        if method == 'head':
+            return self.execute(query=self._get_limit_query(query, n), **kwargs)
+        if method == 'reservoir':
+            if table is not None and self._get_dialect_name() in TABLESAMPLE_DIALECTS:
+                data = self._sample_table(table, n, seed, **kwargs)
+                if data is not None:
+                    return data
+            elif seed is None:
+                return self.execute(query=self._get_limit_query(query, n, order_by_random=True), **kwargs)
+        return super().sample(n, method=method, seed=seed, stratify_by=stratify_by, query=query, **kwargs)
+
+    def compute_statistics(self, columns=None, max_workers=1, top_k=10, partition_column=None, num_partitions=None, **kwargs):
+        """Computes the column statistics in one pass
+
+        If a partition column and more than one partition are given the
+        partitions are fetched concurrently (see `iter_partitions`) and their
+        statistics merged. Otherwise the result set is streamed.
+
+        Args:
+            columns (:obj:`list`, optional): columns to compute statistics for. Defaults to all columns.
+            max_workers (int, optional): number of batches or partitions processed concurrently. Defaults to 1.
+            top_k (int, optional): number of most frequent values to report. Defaults to 10.
+            partition_column (:obj:`str`, optional): Numeric or datetime column to partition by.
+                Defaults to the partition_column attribute.
+            num_partitions (int, optional): Number of partitions. Defaults to the num_partitions attribute.
+            kwargs: keyword arguments passed to iter_partitions or iter_batches
+
+        Returns:
+            `dq0.sdk.data.statistics.DatasetStatistics` of the source
+        """
+        partition_column = self.partition_column if partition_column is None else partition_column
+        num_partitions = self.num_partitions if num_partitions is None else num_partitions
+        if partition_column is None or num_partitions is None or num_partitions <= 1:
+            return super().compute_statistics(columns=columns, max_workers=max_workers, top_k=top_k, **kwargs)
+
+        from dq0.sdk.data import statistics
+        partitions = self.iter_partitions(partition_column, num_partitions, **kwargs)
+        return statistics.compute_statistics(partitions, columns=columns, max_workers=max_workers, top_k=top_k)
+
+    def _sample_table(self, table, n, seed, **kwargs):
+        """Samples a table with TABLESAMPLE BERNOULLI and reduces the result to n rows.
+
+        The sampling percentage is derived from the planner's row estimate of
+        the table and oversamples by 50%. Returns None if fewer than n rows
+        were sampled.
+        """
+        import sqlalchemy
+
+        regclass_query = sqlalchemy.text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)")
+        n_rows = self.execute(query=regclass_query, params={'table': self._quote_table(table)}).iloc[0, 0]
+        if n_rows is None or n_rows <= 0:  # table never analyzed
+            n_rows = self.execute(query=f"SELECT COUNT(*) FROM {self._quote_table(table)}").iloc[0, 0]
+        percentage = min(100., 150. * n / max(n_rows, 1))
+        seed = np.random.default_rng().integers(2**31) if seed is None else seed
+        data = self.execute(query=self._get_tablesample_query(table, percentage, seed), **kwargs)
+        if len(data) < n and percentage < 100.:
+            return None
+        if len(data) > n:
+            data = data.iloc[np.sort(np.random.default_rng(seed).choice(len(data), size=n, replace=False))]
+        return data
+
+    def get_columns_query(self, columns, query=None):
+        """Returns a query selecting only the given columns of the query result
+
+        Args:
+            columns (:obj:`list`): columns to select.
+            query: SQL Query to wrap. Defaults to the query attribute.
+
+        Returns:
+            the wrapped query
+        """
+        query = self.query if query is None else query
+        if query is None:
+            raise ValueError('you need to pass the query')
+        if len(columns) == 0:
+            raise ValueError('no columns to select')
+        return f"SELECT {', '.join(self._quote(column) for column in columns)} FROM ({query}) dq0_columns"
+
+    def _get_tablesample_query(self, table, percentage, seed):
+        return f"SELECT * FROM {self._quote_table(table)} TABLESAMPLE BERNOULLI ({percentage!r}) REPEATABLE ({int(seed)})"
+
+    def _get_limit_query(self, query, n, order_by_random=False):
+        """Wraps the query into a query returning its first n rows in the syntax of the database."""
+        dialect_name = self._get_dialect_name()
+        order_by = f" ORDER BY {RANDOM_FUNCTIONS.get(dialect_name, 'RANDOM()')}" if order_by_random else ''
+        if dialect_name == 'mssql':
+            return f"SELECT TOP {int(n)} * FROM ({query}) dq0_sample{order_by}"
+        if dialect_name == 'oracle':
+            return f"SELECT * FROM ({query}) dq0_sample{order_by} FETCH FIRST {int(n)} ROWS ONLY"
+        return f"SELECT * FROM ({query}) dq0_sample{order_by} LIMIT {int(n)}"
+
+    def _get_dialect_name(self):
+        return self.type if self.engine is None else self.engine.dialect.name
+
+    def _get_partition_bounds(self, query, partition_column, lower_bound, upper_bound):
+        """Returns the partition bounds taken from the arguments, the metadata or the database."""
+        if self.col_properties is not None and partition_column in self.col_properties:
+            properties = self.col_properties[partition_column]
+            lower_bound = properties['lower'] if lower_bound is None else lower_bound
+            upper_bound = properties['upper'] if upper_bound is None else upper_bound
+        if lower_bound is None or upper_bound is None:
+            column = self._quote(partition_column)
+            bounds = self.execute(query=f"SELECT MIN({column}) AS lower_bound, MAX({column}) AS upper_bound FROM ({query}) dq0_bounds")
+            lower_bound = bounds.iloc[0, 0] if lower_bound is None else lower_bound
+            upper_bound = bounds.iloc[0, 1] if upper_bound is None else upper_bound
+        if pd.isna(lower_bound) or pd.isna(upper_bound):
+            return None, None
+        if isinstance(lower_bound, (str, datetime.date, np.datetime64)):
+            lower_bound = pd.Timestamp(lower_bound)
+            upper_bound = pd.Timestamp(upper_bound)
+        if lower_bound > upper_bound:
+            raise ValueError(f"lower_bound {lower_bound} is greater than upper_bound {upper_bound}")
+        return lower_bound, upper_bound
+
+    def _get_partition_queries(self, query, partition_column, num_partitions, lower_bound, upper_bound):
+        """Splits the query into num_partitions range queries on the partition column."""
+        if isinstance(lower_bound, pd.Timestamp):
+            boundaries = pd.to_datetime(np.linspace(lower_bound.value, upper_bound.value, num_partitions + 1).astype(np.int64))
+            literals = [f"'{b.isoformat(sep=' ')}'" for b in boundaries]
+        elif isinstance(lower_bound, (int, np.integer)) and isinstance(upper_bound, (int, np.integer)):
+            boundaries = np.unique(np.ceil(np.linspace(lower_bound, upper_bound, num_partitions + 1)).astype(np.int64))
+            literals = [str(b) for b in boundaries]
+        else:
+            boundaries = np.unique(np.linspace(float(lower_bound), float(upper_bound), num_partitions + 1))
+            literals = [repr(float(b)) for b in boundaries]
+
+        column = self._quote(partition_column)
+        inner = literals[1:-1]
+        if len(inner) == 0:
+            return [query]
+        conditions = [f"{column} < {inner[0]} OR {column} IS NULL"]
+        for lower, upper in zip(inner[:-1], inner[1:]):
+            conditions.append(f"{column} >= {lower} AND {column} < {upper}")
+        conditions.append(f"{column} >= {inner[-1]}")
+        return [f"SELECT * FROM ({query}) dq0_partition WHERE {condition}" for condition in conditions]
+
+    def _get_pool_capacity(self):
+        """pool_size + max_overflow of the engine's queue pool, None if not bounded."""
+        pool = getattr(self.engine, 'pool', None)
+        max_overflow = getattr(pool, '_max_overflow', -1)
+        if not hasattr(pool, 'size') or max_overflow < 0:
+            return None
+        return pool.size() + max_overflow
+
+    def _quote(self, column):
+        if self.engine is None:
+            return column
+        return self.engine.dialect.identifier_preparer.quote(column)
+
+    def _quote_table(self, table):
+        """Quotes every part of a schema-qualified table name like schema.table separately."""
+        return '.'.join(self._quote(part) for part in table.split('.'))
+
+    def iter_batches(self, query=None, batch_rows=10000, **kwargs):
+        """Execute SQL query and stream the result set batch by batch
+
+        The query is executed with a server-side cursor where the driver
+        supports it (e.g. psycopg2, mysqlclient, cx_Oracle) and the rows
+        are fetched with fetchmany, so memory stays constant and the first
+        batch is available as soon as the database starts returning rows.
+
+        Args:
+            query: SQL Query to execute. Defaults to the query attribute.
+            batch_rows (int): maximum number of rows per batch.
+            kwargs: keyword arguments passed to pandas.read_sql_query
+
+        Yields:
+            SQL ResultSet batches as pandas dataframes
+        """
+        query = self.query if query is None else query
+        if query is None:
+            raise ValueError('you need to pass the query')
+        if not isinstance(batch_rows, int) or batch_rows < 1:
+            raise ValueError(f"batch_rows must be a positive integer, got {batch_rows}")
+        with self.connect() as connection:
+            connection = connection.execution_options(stream_results=True)
+            for batch in pd.read_sql_query(query, connection, chunksize=batch_rows, **kwargs):
+                yield batch
+
+    def _read_sql_query(self, query, **kwargs):
+        """Reads the query result on a pooled connection.
+
+        Args:
+            query: SQL Query to execute
+            kwargs: keyword arguments passed to pandas.read_sql_query
+
+        Returns:
+            SQL ResultSet as pandas dataframe
         """
-        self.execute(query=self.query, **kwargs)
+        with self.connect() as connection:
+            return pd.read_sql_query(query, connection, **kwargs)
 
     def to_json(self):  # noqa: C901
         """Returns a json representation of this data sources information.
@@ -0,0 +1,497 @@
+# -*- coding: utf-8 -*-
+"""Streaming statistics of data sources.
+
+The statistics are computed in one pass over the batches of a data source.
+Every column keeps a small, fixed size state:
+
+    count, null count, min and max
+    mean and variance (Welford's algorithm, batches combined with Chan's formula)
+    approximate quantiles (KLL-style compactor sketch)
+    approximate distinct count (HyperLogLog)
+    approximate top-k frequencies (Misra-Gries summary)
+
+All states are mergeable. Batches, files or table partitions can therefore
+be processed in parallel and their partial statistics merged afterwards.
+
+Example:
+    ```python
+    stats = data_source.compute_statistics(batch_rows=100000, max_workers=4)
+    stats.to_dict()['columns']['age']['quantiles'][0.5]
+    ```
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import pandas as pd
+
+
+DEFAULT_QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+NUMERIC = 'numeric'
+DATETIME = 'datetime'
+OTHER = 'other'
+
+
+def compute_statistics(batches, columns=None, max_workers=1, **kwargs):
+    """Computes the statistics of a stream of dataframes in one pass.
+
+    Args:
+        batches: iterable of pandas dataframes.
+        columns (:obj:`list`, optional): columns to compute statistics for. Defaults to all columns.
+        max_workers (int, optional): number of batches processed concurrently. Defaults to 1.
+        kwargs: keyword arguments passed to `DatasetStatistics`.
+
+    Returns:
+        the merged `DatasetStatistics`
+    """
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError(f"max_workers must be a positive integer, got {max_workers}")
+    statistics = DatasetStatistics(**kwargs)
+    if max_workers == 1:
+        for batch in batches:
+            statistics.update(_select(batch, columns))
+        return statistics
+
+    def compute_partial(batch):
+        partial = DatasetStatistics(**kwargs)
+        partial.update(_select(batch, columns))
+        return partial
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # keep at most max_workers batches in flight to bound memory
+        futures = collections.deque()
+        for batch in batches:
+            futures.append(executor.submit(compute_partial, batch))
+            if len(futures) >= max_workers:
+                statistics.merge(futures.popleft().result())
+        while len(futures) > 0:
+            statistics.merge(futures.popleft().result())
+    return statistics
+
+
+def _select(batch, columns):
+    if not isinstance(batch, pd.DataFrame):
+        raise ValueError(f"source returned data of type {type(batch)} instead of pandas.DataFrame")
+    return batch if columns is None else batch[columns]
+
+
+class DatasetStatistics:
+    """Mergeable statistics of all columns of a dataset.
+
+    Args:
+        quantile_k (int, optional): size parameter of the quantile sketches.
+        hll_precision (int, optional): number of index bits of the HyperLogLog sketches.
+        top_k (int, optional): number of most frequent values to report.
+        seed (int, optional): seed of the quantile sketch compactions.
+
+    Attributes:
+        rows (int): number of rows seen.
+        columns (dict): `ColumnStatistics` by column name, in column order.
+    """
+
+    def __init__(self, quantile_k=256, hll_precision=14, top_k=10, seed=None):
+        self.quantile_k = quantile_k
+        self.hll_precision = hll_precision
+        self.top_k = top_k
+        self.seed = seed
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, df):
+        """Adds a batch of rows.
+
+        Args:
+            df (:obj:`pandas.DataFrame`): the batch.
+        """
+        self.rows += len(df)
+        for name in df.columns:
+            self._get_column(name).update(df[name])
+
+    def merge(self, other):
+        """Merges the statistics of another part of the dataset into these statistics.
+
+        Args:
+            other (:obj:`DatasetStatistics`): the statistics to merge.
+        """
+        self.rows += other.rows
+        for name, column in other.columns.items():
+            self._get_column(name).merge(column)
+
+    def to_dict(self, quantiles=None):
+        """Returns the statistics as dict.
+
+        Args:
+            quantiles (:obj:`list`, optional): quantiles to estimate. Defaults to DEFAULT_QUANTILES.
+
+        Returns:
+            dict with the number of rows and the statistics of every column
+        """
+        return {
+            'rows': self.rows,
+            'columns': {name: column.to_dict(quantiles=quantiles) for name, column in self.columns.items()},
+        }
+
+    def _get_column(self, name):
+        if name not in self.columns:
+            self.columns[name] = ColumnStatistics(name, quantile_k=self.quantile_k, hll_precision=self.hll_precision,
+                                                  top_k=self.top_k, seed=self.seed)
+        return self.columns[name]
+
+
+class ColumnStatistics:
+    """Mergeable statistics of a single column.
+
+    Mean, variance and quantiles are computed for numeric columns, min, max
+    and quantiles for numeric and datetime columns. Counts, distinct count
+    and top-k frequencies are computed for all columns.
+
+    Args:
+        name (:obj:`str`): column name.
+        quantile_k (int, optional): size parameter of the quantile sketch.
+        hll_precision (int, optional): number of index bits of the HyperLogLog sketch.
+        top_k (int, optional): number of most frequent values to report.
+        seed (int, optional): seed of the quantile sketch compactions.
+
+    Attributes:
+        kind (:obj:`str`): 'numeric', 'datetime' or 'other'. None until the first non-null value is seen.
+        count (int): number of non-null values.
+        null_count (int): number of null values.
+        is_integral (bool): True if all numeric values are whole numbers.
+        is_boolean (bool): True if all numeric values are booleans.
+    """
+
+    def __init__(self, name, quantile_k=256, hll_precision=14, top_k=10, seed=None):
+        self.name = name
+        self.kind = None
+        self.count = 0
+        self.null_count = 0
+        self.is_integral = True
+        self.is_boolean = True
+        self.min = None
+        self.max = None
+        self.mean = 0.
+        self.m2 = 0.
+        self.top_k = top_k
+        self.quantile_sketch = QuantileSketch(k=quantile_k, seed=seed)
+        self.distinct_sketch = HyperLogLog(precision=hll_precision)
+        self.frequent_items = MisraGries(capacity=max(10 * top_k, 100))
+
+    def update(self, values):
+        """Adds a batch of values.
+
+        Args:
+            values (:obj:`pandas.Series`): the values.
+
+        Raises:
+            ValueError: if the values are of another kind than the values seen before.
+        """
+        nulls = values.isna()
+        values = values[~nulls]
+        self.null_count += int(nulls.sum())
+        if len(values) == 0:
+            return
+        self._set_kind(_get_kind(values))
+
+        if self.kind == NUMERIC:
+            numbers = values.to_numpy(dtype=np.float64)
+            self.is_boolean = self.is_boolean and pd.api.types.is_bool_dtype(values)
+            self.is_integral = self.is_integral and (pd.api.types.is_integer_dtype(values) or bool(np.all(np.mod(numbers, 1) == 0)))
+            self._update_moments(len(numbers), numbers.mean(), ((numbers - numbers.mean()) ** 2).sum())
+            self._update_min_max(numbers.min(), numbers.max())
+            self.quantile_sketch.update(numbers)
+            hash_values = pd.Series(numbers)
+        elif self.kind == DATETIME:
+            timestamps = pd.to_datetime(values).to_numpy(dtype='datetime64[ns]').view(np.int64)
+            self._update_min_max(timestamps.min(), timestamps.max())
+            self.quantile_sketch.update(timestamps.astype(np.float64))
+            hash_values = pd.Series(timestamps)
+        else:
+            hash_values = values.astype(str) if values.dtype == object else values
+        self.count += len(values)
+        self.distinct_sketch.update(pd.util.hash_pandas_object(hash_values, index=False).to_numpy())
+        self.frequent_items.update(values.value_counts(sort=False, dropna=True))
+
+    def merge(self, other):
+        """Merges the statistics of the same column of another part of the dataset.
+
+        Args:
+            other (:obj:`ColumnStatistics`): the statistics to merge.
+        """
+        self.null_count += other.null_count
+        if other.count == 0:
+            return
+        self._set_kind(other.kind)
+        if self.kind == NUMERIC:
+            self._update_moments(other.count, other.mean, other.m2)
+            self.is_integral = self.is_integral and other.is_integral
+            self.is_boolean = self.is_boolean and other.is_boolean
+        self._update_min_max(other.min, other.max)
+        self.count += other.count
+        self.quantile_sketch.merge(other.quantile_sketch)
+        self.distinct_sketch.merge(other.distinct_sketch)
+        self.frequent_items.merge(other.frequent_items)
+
+    @property
+    def variance(self):
+        """Sample variance of the values (ddof=1). None if not numeric or less than two values."""
+        if self.kind != NUMERIC or self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    def quantiles(self, quantiles=None):
+        """Returns approximate quantiles of the values.
+
+        Args:
+            quantiles (:obj:`list`, optional): quantiles to estimate. Defaults to DEFAULT_QUANTILES.
+
+        Returns:
+            dict quantile -> value. Empty if not numeric or datetime.
+        """
+        quantiles = DEFAULT_QUANTILES if quantiles is None else quantiles
+        if self.kind not in [NUMERIC, DATETIME] or self.count == 0:
+            return {}
+        return {q: self._to_value(v) for q, v in zip(quantiles, self.quantile_sketch.quantiles(quantiles))}
+
+    def to_dict(self, quantiles=None):
+        """Returns the statistics as dict.
+
+        Args:
+            quantiles (:obj:`list`, optional): quantiles to estimate. Defaults to DEFAULT_QUANTILES.
+
+        Returns:
+            dict of the column statistics
+        """
+        numeric = self.kind == NUMERIC and self.count > 0
+        variance = self.variance
+        return {
+            'kind': self.kind,
+            'count': self.count,
+            'null_count': self.null_count,
+            'min': self._to_value(self.min),
+            'max': self._to_value(self.max),
+            'mean': float(self.mean) if numeric else None,
+            'variance': variance,
+            'std': None if variance is None else float(np.sqrt(variance)),
+            'quantiles': self.quantiles(quantiles),
+            'distinct_count': self.distinct_count(),
+            'top_k': self.frequent_items.top(self.top_k),
+        }
+
+    def distinct_count(self):
+        """Returns the approximate number of distinct non-null values.
+
+        Exact if there are no more distinct values than counters of the
+        frequent items summary.
+        """
+        if self.frequent_items.is_exact:
+            return len(self.frequent_items.counts)
+        return min(self.distinct_sketch.estimate(), self.count)
+
+    def distinct_values(self):
+        """Returns the sorted distinct non-null values or None if they are not known exactly."""
+        if not self.frequent_items.is_exact:
+            return None
+        return sorted(_to_python(value) for value in self.frequent_items.counts.index)
+
+    def _set_kind(self, kind):
+        if self.kind is None:
+            self.kind = kind
+        elif self.kind != kind:
+            raise ValueError(f"column {self.name} contains {self.kind} and {kind} values. Please read it with a fixed dtype")
+
+    def _update_moments(self, count, mean, m2):
+        # Chan et al. parallel combination of Welford states
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+
+    def _update_min_max(self, min_value, max_value):
+        self.min = min_value if self.min is None else min(self.min, min_value)
+        self.max = max_value if self.max is None else max(self.max, max_value)
+
+    def _to_value(self, value):
+        if value is None:
+            return None
+        if self.kind == DATETIME:
+            return pd.Timestamp(int(value))
+        return float(value)
+
+
+def _get_kind(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return DATETIME
+    if pd.api.types.is_numeric_dtype(values):
+        return NUMERIC
+    return OTHER
+
+
+class QuantileSketch:
+    """Mergeable approximate quantile sketch.
+
+    A hierarchy of compactors as in the KLL sketch: level h holds items of
+    weight 2^h. A level holding more than k items is sorted and every
+    second item (random offset) is promoted to the next level. The rank
+    error is about O(log(n / k) / k).
+
+    Args:
+        k (int, optional): maximum number of items per level.
+        seed (int, optional): random seed of the compaction offsets.
+    """
+
+    def __init__(self, k=256, seed=None):
+        self.k = k
+        self.levels = []
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Adds an array of numeric values."""
+        self._add(0, np.asarray(values, dtype=np.float64))
+        self._compact()
+
+    def merge(self, other):
+        """Merges another sketch into this sketch."""
+        for level, items in enumerate(other.levels):
+            self._add(level, items)
+        self._compact()
+
+    def quantiles(self, quantiles):
+        """Returns the estimated values of the given quantiles.
+
+        Args:
+            quantiles (:obj:`list`): quantiles between 0 and 1.
+
+        Returns:
+            numpy array of the estimated values
+        """
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.float64) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        ranks = np.asarray(quantiles, dtype=np.float64) * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)]
+
+    def _add(self, level, items):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0, dtype=np.float64))
+        self.levels[level] = np.concatenate([self.levels[level], items])
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # an odd item stays on its level to keep the total weight exact
+                keep = items[-1:] if len(items) % 2 == 1 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                self.levels[level] = keep
+                self._add(level + 1, pairs[self.rng.integers(2)::2])
+            level += 1
+
+
+class HyperLogLog:
+    """Mergeable approximate distinct counter.
+
+    Args:
+        precision (int, optional): number of hash bits used as register index.
+            The sketch uses 2^precision registers, the relative error is about 1.04 / sqrt(2^precision).
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        """Adds an array of 64 bit hash values."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        remaining = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - _bit_length(remaining) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        """Merges another sketch of the same precision into this sketch."""
+        if other.precision != self.precision:
+            raise ValueError(f"can not merge HyperLogLog sketches of precision {self.precision} and {other.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        """Returns the estimated number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+
+def _bit_length(values):
+    """Vectorized int.bit_length for uint64 arrays."""
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.int64)
+    for shift in [32, 16, 8, 4, 2, 1]:
+        mask = values >= np.uint64(1 << shift)
+        lengths[mask] += shift
+        values[mask] >>= np.uint64(shift)
+    return lengths + (values > 0)
+
+
+class MisraGries:
+    """Mergeable frequent items summary.
+
+    Keeps at most capacity counters. Every count is underestimated by at
+    most n / (capacity + 1), so all values more frequent than that are
+    contained. The counts are exact as long as there are at most capacity
+    distinct values.
+
+    Args:
+        capacity (int, optional): maximum number of counters.
+
+    Attributes:
+        is_exact (bool): True if the counts are exact.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.is_exact = True
+
+    def update(self, value_counts):
+        """Adds value counts, e.g. the value_counts of a batch."""
+        if len(self.counts) == 0:
+            counts = value_counts.astype(np.int64)
+        else:
+            counts = self.counts.add(value_counts.astype(np.int64), fill_value=0).astype(np.int64)
+        if len(counts) > self.capacity:
+            # subtract the (capacity + 1)-th largest count from all counters
+            threshold = np.partition(counts.to_numpy(), len(counts) - self.capacity - 1)[len(counts) - self.capacity - 1]
+            counts = counts[counts > threshold] - threshold
+            self.is_exact = False
+        self.counts = counts
+
+    def merge(self, other):
+        """Merges another summary into this summary."""
+        self.update(other.counts)
+        self.is_exact = self.is_exact and other.is_exact
+
+    def top(self, k):
+        """Returns the k most frequent values as list of (value, estimated count) tuples."""
+        counts = self.counts.sort_values(ascending=False, kind='stable').iloc[:k]
+        return [(_to_python(value), int(count)) for value, count in counts.items()]
+
+
+def _to_python(value):
+    return value.item() if isinstance(value, np.generic) else value
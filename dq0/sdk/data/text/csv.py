@@ -7,19 +7,38 @@ Copyright 2020, Gradient Zero
 All rights reserved
 """
 
+import logging
+
 from dq0.sdk.data.metadata.structure.utils.utils import Utils as MetaUtils
 from dq0.sdk.data.source import Source
 
+import numpy as np
+
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
 
 class CSV(Source):
     """Data Source for CSV data.
 
     Provides function to read in csv data.
 
+    If use_meta_dtypes is set, the column metadata is pushed down to
+    pandas.read_csv: only feature and target columns are read, string
+    columns with cardinality or allowed_values are parsed as category,
+    bounded int columns get the narrowest fitting dtype, bounded float
+    columns float64 and datetime columns are parsed as datetimes.
+
     Args:
-        path (:obj:`str`): Absolute path to the CSV file.
+        meta_database: The database node of the dataset metadata.
+
+    Attributes:
+        use_meta_dtypes (bool): True to read with the metadata derived
+            column projection and dtypes. Defaults to False.
+        narrow_floats (bool): True to read bounded float columns whose bounds
+            fit the float32 range as float32 with use_meta_dtypes. float32 keeps
+            about 7 significant digits only. Defaults to False.
     """
 
     def __init__(self, meta_database):
@@ -52,22 +71,90 @@ class CSV(Source):
         skipinitialspace = meta_connector.skipinitialspace
         self.skipinitialspace = False if skipinitialspace is None else skipinitialspace
 
+        self.use_meta_dtypes = False
+        self.narrow_floats = False
+        self.col_properties = None
+
         if len(meta_database) != 0 and len(meta_database.schema()) != 0:
             meta_table = meta_database.schema().table()
             self.feature_cols, self.target_cols = MetaUtils.get_feature_target_cols(meta_table=meta_table)
             self.col_types = MetaUtils.get_col_types(meta_table=meta_table)
+            self.col_properties = MetaUtils.get_col_properties(meta_table=meta_table)
 
     def read(self, **kwargs):
         """Read CSV data sources
 
         Args:
             kwargs: keyword arguments
+                May contain use_meta_dtypes and narrow_floats to override the attributes of the same name.
 
         Returns:
             CSV data as pandas dataframe
         """
+        read_args, meta_keys = self._get_read_args(**kwargs)
+        try:
+            return pd.read_csv(self.path, **read_args)
+        except (ValueError, OverflowError, TypeError) as e:
+            if len(meta_keys) == 0:
+                self._print_read_error(read_args, e)
+                return None
+            # the data does not match its metadata, e.g. values out of bounds.
+            # retry once without the read arguments taken from the metadata.
+            logger.warning(f"Could not read CSV with metadata dtypes, reading without them: {e}")
+            read_args = {k: v for k, v in read_args.items() if k not in meta_keys}
+        except Exception as e:
+            self._print_read_error(read_args, e)
+            return None
+
+        try:
+            return pd.read_csv(self.path, **read_args)
+        except Exception as e:
+            self._print_read_error(read_args, e)
+
+    def iter_batches(self, batch_rows=10000, **kwargs):
+        """Read CSV data source chunk by chunk
+
+        The metadata derived header, separator, decimal and na_values
+        handling is the same as in `read`, so every batch has the same
+        columns as the full dataframe would have.
+
+        Args:
+            batch_rows (int): maximum number of rows per batch.
+            kwargs: keyword arguments
+
+        Yields:
+            CSV data as pandas dataframes of at most batch_rows rows
+        """
+        if not isinstance(batch_rows, int) or batch_rows < 1:
+            raise ValueError(f"batch_rows must be a positive integer, got {batch_rows}")
+
+        read_args, _ = self._get_read_args(**kwargs)
+        try:
+            reader = pd.read_csv(self.path, chunksize=batch_rows, **read_args)
+        except Exception as e:
+            self._print_read_error(read_args, e)
+            raise
 
+        with reader:
+            for batch in reader:
+                yield batch
+
+    def _get_read_args(self, **kwargs):
+        """Combines the metadata settings with the given kwargs to the
+        keyword arguments of pandas.read_csv.
+
+        Args:
+            kwargs: keyword arguments
+
+        Returns:
+            dict of keyword arguments for pandas.read_csv and the list of
+            keys added from the column metadata
+        """
+        use_meta_dtypes = self.use_meta_dtypes
+        narrow_floats = self.narrow_floats
         if kwargs is not None:  # prioritize kwargs over metadata
+            use_meta_dtypes = kwargs.pop("use_meta_dtypes", self.use_meta_dtypes)
+            narrow_floats = kwargs.pop("narrow_floats", self.narrow_floats)
             header = kwargs.pop("header", self.header_row)
             names = kwargs.pop("names", self.header_columns)
             skiprows = kwargs.pop("skiprows", [])
@@ -84,15 +171,87 @@ class CSV(Source):
             elif names is not None:
                 header = None
 
-        try:
-            return pd.read_csv(self.path, header=header, names=names,
-                               skiprows=skiprows, sep=sep, decimal=decimal,
-                               na_values=na_values, index_col=index_col,
-                               skipinitialspace=skipinitialspace, **kwargs)
-        except Exception as e:
-            print(
-                'Failed to load CSV using use_original_header {}, '
-                'header {}, names {}, skiprows {}, sep {}, decimal {}, '
-                'na_values {} and kwargs {} due to {}'.format(
-                    self.use_original_header, header, names, skiprows,
-                    sep, decimal, na_values, kwargs, e))
+        meta_keys = []
+        if use_meta_dtypes and not isinstance(header, list):
+            for key, value in self._get_meta_read_args(index_col=index_col, narrow_floats=narrow_floats).items():
+                if key not in kwargs:
+                    kwargs[key] = value
+                    meta_keys.append(key)
+
+        read_args = dict(header=header, names=names, skiprows=skiprows, sep=sep,
+                         decimal=decimal, na_values=na_values, index_col=index_col,
+                         skipinitialspace=skipinitialspace, **kwargs)
+        return read_args, meta_keys
+
+    def _get_meta_read_args(self, index_col=None, narrow_floats=False):
+        """Derives usecols, dtype and parse_dates from the column metadata.
+
+        Args:
+            index_col: index column(s) to read in addition to the feature and target columns.
+            narrow_floats: True to read bounded float columns as float32.
+
+        Returns:
+            dict of keyword arguments for pandas.read_csv
+        """
+        meta_read_args = {}
+        if self.col_properties is None:
+            return meta_read_args
+
+        if index_col is None and hasattr(self, 'feature_cols') and hasattr(self, 'target_cols'):
+            usecols = self.feature_cols + [c for c in self.target_cols if c not in self.feature_cols]
+            if len(usecols) != 0:
+                meta_read_args['usecols'] = usecols
+
+        dtype = {}
+        parse_dates = []
+        for name, properties in self.col_properties.items():
+            if 'usecols' in meta_read_args and name not in meta_read_args['usecols']:
+                continue
+            if properties['data_type_name'] == 'datetime':
+                parse_dates.append(name)
+                continue
+            col_dtype = CSV._get_meta_dtype(properties, narrow_floats=narrow_floats)
+            if col_dtype is not None:
+                dtype[name] = col_dtype
+        if len(dtype) != 0:
+            meta_read_args['dtype'] = dtype
+        if len(parse_dates) != 0:
+            meta_read_args['parse_dates'] = parse_dates
+        return meta_read_args
+
+    @staticmethod
+    def _get_meta_dtype(properties, narrow_floats=False):
+        """Returns the most compact pandas dtype for a column given its
+        metadata properties or None to let pandas infer it. Floats are only
+        narrowed to float32 with narrow_floats, the bounds say nothing about
+        the precision."""
+        data_type_name = properties['data_type_name']
+        lower = properties['lower']
+        upper = properties['upper']
+        if data_type_name == 'string':
+            if properties['cardinality'] is not None or properties['allowed_values'] is not None:
+                return 'category'
+        elif data_type_name == 'boolean':
+            return 'boolean'
+        elif data_type_name == 'int' and lower is not None and upper is not None:
+            # nullable integer types to allow for missing values
+            for dtype, pd_dtype in [(np.int8, 'Int8'), (np.int16, 'Int16'), (np.int32, 'Int32')]:
+                if np.iinfo(dtype).min <= lower and upper <= np.iinfo(dtype).max:
+                    return pd_dtype
+            return 'Int64'
+        elif data_type_name == 'float' and lower is not None and upper is not None:
+            if narrow_floats and np.finfo(np.float32).min <= lower and upper <= np.finfo(np.float32).max:
+                return np.float32
+            return np.float64
+        return None
+
+    def _print_read_error(self, read_args, e):
+        kwargs = {k: v for k, v in read_args.items()
+                  if k not in ['header', 'names', 'skiprows', 'sep', 'decimal', 'na_values', 'index_col', 'skipinitialspace']}
+        print(
+            'Failed to load CSV using use_original_header {}, '
+            'header {}, names {}, skiprows {}, sep {}, decimal {}, '
+            'na_values {} and kwargs {} due to {}'.format(
+                self.use_original_header, read_args['header'], read_args['names'],
+                read_args['skiprows'], read_args['sep'], read_args['decimal'],
+                read_args['na_values'], kwargs, e))
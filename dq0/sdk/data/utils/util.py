@@ -20,8 +20,6 @@ import pandas as pd
 
 import scipy as sp
 
-import tensorflow as tf
-
 import yaml
 
 
@@ -789,6 +787,8 @@ def initialize_rnd_numbers_generators_state(seed=1, verbose=True):
         seed (int, optional): random seed. Default is 1.
         verbose (bool, optional): Boolean flag to print seed used.
     """
+    import tensorflow as tf
+
     # get Tensorflow version (first number only)
     tf_version = int(tf.__version__.split('.')[0])
 
@@ -887,6 +887,8 @@ def _fix_metric_names(metric):
     """
 
     if metric.lower() == 'accuracy':
+        import tensorflow as tf
+
         # TODO: Do we need this for reasons other than tf1 compat?
         # Its used above and if its to convert mse to long name then we
         # add mae, ...
@@ -916,6 +918,8 @@ def instantiate_metrics_from_name(metrics_list):
 
     """
 
+    import tensorflow as tf
+
     # get every class defined in the tensorflow.keras.metrics module
     keras_metric_classes_l = [m[1] for m in inspect.getmembers(
         tf.keras.metrics, inspect.isclass)]
@@ -1017,6 +1021,8 @@ def tensorflow_tensor_to_numpy_ndarray(*args):
 
     """
 
+    import tensorflow as tf
+
     eager_execution_enabled = tf.executing_eagerly()
     # In TensorFlow 2 eager execution is activated by default.
     #
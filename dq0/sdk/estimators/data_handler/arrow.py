@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Arrow data handler.
+
+Data handler of the pyarrow dataset based sources Parquet, Feather and
+ORC. Only the needed columns are read from the files.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import logging
+
+from dq0.sdk.data.binary.arrow_dataset import ArrowDataset
+from dq0.sdk.estimators.data_handler.tabular import TabularDataHandler
+
+logger = logging.getLogger(__name__)
+
+
+class ArrowDataHandler(TabularDataHandler):
+    """Data Handler for Parquet, Feather and ORC data sources"""
+
+    def __init__(self, pipeline_steps=None, pipeline_config_path=None, transformers_root_dir='.'):
+        super().__init__(pipeline_steps=pipeline_steps, pipeline_config_path=pipeline_config_path, transformers_root_dir=transformers_root_dir)
+
+    def _check_data_source(self, data_source):
+        if not isinstance(data_source, ArrowDataset):
+            raise ValueError(f"data_source attached to estimator and handled by the Arrow data handler is not of Type: dq0.sdk.data.binary.arrow_dataset.ArrowDataset but: {type(data_source)}")  # noqa:E501
+
+    def _read(self, data_source, columns):
+        return data_source.read(columns=columns)
+
+    def _iter_batches(self, data_source, columns, batch_rows):
+        return data_source.iter_batches(batch_rows=batch_rows, columns=columns)
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""Out-of-core train/test split.
+
+Every row is assigned to train or test by a deterministic hash of its row
+key (one or more key columns) or of its row index. The assignment does not
+depend on the other rows, so the data is split while it is streamed batch
+by batch and the same row always lands in the same split.
+
+Stratified splits first stream the key and target columns only and keep the
+row hashes per class. The test rows of every class are the rows with the
+smallest hashes, i.e. a deterministic per-class reservoir sample of the
+class's test quota.
+
+The splits are written to Arrow IPC (feather) files or NPY source
+directories and read back memory-mapped, so the peak memory stays near one
+copy of the data.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import collections
+import math
+import os
+
+from dq0.sdk.data import sampling
+from dq0.sdk.data.binary.npy import NPY, NPYWriter
+
+import numpy as np
+
+import pandas as pd
+
+import pyarrow as pa
+from pyarrow import feather
+
+DEFAULT_HASH_KEY = '0123456789123456'
+SPLIT_FORMATS = ['arrow', 'npy']
+
+
+def hash_rows(keys, seed=None):
+    """Returns a 64 bit hash of every row of the keys.
+
+    Args:
+        keys (:obj:`pandas.DataFrame` or :obj:`pandas.Series`): the row keys.
+        seed (int, optional): seed to get a different but deterministic split.
+
+    Returns:
+        numpy array of uint64 hashes
+    """
+    hash_key = DEFAULT_HASH_KEY if seed is None else f"{int(seed) % 10 ** 16:016d}"
+    return pd.util.hash_pandas_object(keys, index=False, hash_key=hash_key).to_numpy()
+
+
+class HashSplitter:
+    """Assigns rows to train or test by hashing their keys.
+
+    Args:
+        train_size (float): share of rows in the train split.
+        key_cols (:obj:`list`, optional): columns identifying a row. Defaults to the row index.
+            Rows with the same key are assigned to the same split.
+        stratify_col (:obj:`str`, optional): column to stratify by. Needs `fit` before splitting.
+        seed (int, optional): seed of the row hashes.
+    """
+
+    def __init__(self, train_size, key_cols=None, stratify_col=None, seed=None):
+        if not 0. < train_size < 1.:
+            raise ValueError(f"train_size must be in (0, 1), got {train_size}")
+        self.train_size = train_size
+        self.key_cols = key_cols
+        self.stratify_col = stratify_col
+        self.seed = seed
+        self.labels = None
+        self.thresholds = None
+        self.has_test = None
+
+    def fit(self, batches):
+        """Computes the per-class hash thresholds of a stratified split.
+
+        Streams the batches once. Only the row hashes are kept, the batches
+        need to contain the key and stratify columns only.
+
+        Args:
+            batches: iterable of pandas dataframes.
+        """
+        if self.stratify_col is None:
+            return self
+        hashes_by_label = collections.defaultdict(list)
+        offset = 0
+        for batch in batches:
+            hashes = self._hash(batch, offset)
+            offset += len(batch)
+            values = batch[self.stratify_col]
+            if values.isna().any():
+                raise ValueError(f"stratify column {self.stratify_col} contains missing values")
+            for label, positions in values.groupby(values, sort=False, observed=True).indices.items():
+                hashes_by_label[label].append(hashes[positions])
+
+        self.labels = pd.Index(list(hashes_by_label.keys()))
+        hashes_by_label = [np.concatenate(hashes) for hashes in hashes_by_label.values()]
+        # same split sizes as sklearn's train_test_split
+        n_test = offset - int(math.floor(self.train_size * offset))
+        sizes = sampling.allocate([len(hashes) for hashes in hashes_by_label], n_test)
+        # test rows of a class are the rows with the smallest hashes
+        self.thresholds = np.array([np.partition(hashes, size - 1)[size - 1] if size > 0 else 0
+                                    for hashes, size in zip(hashes_by_label, sizes)], dtype=np.uint64)
+        self.has_test = np.asarray(sizes) > 0
+        return self
+
+    def get_test_mask(self, batch, offset=0):
+        """Returns True for the rows of the batch assigned to the test split.
+
+        Args:
+            batch (:obj:`pandas.DataFrame`): rows to assign.
+            offset (int, optional): row index of the first row of the batch in the data.
+
+        Returns:
+            boolean numpy array
+        """
+        hashes = self._hash(batch, offset)
+        if self.stratify_col is None:
+            # top 53 bits as uniform float in [0, 1)
+            return (hashes >> np.uint64(11)).astype(np.float64) * 2. ** -53 < 1. - self.train_size
+        if self.thresholds is None:
+            raise ValueError('stratified split needs fit before splitting')
+        codes = self.labels.get_indexer(batch[self.stratify_col])
+        known = codes >= 0
+        codes = np.where(known, codes, 0)
+        return known & self.has_test[codes] & (hashes <= self.thresholds[codes])
+
+    def split(self, batches, writer):
+        """Streams the batches into the writer.
+
+        Args:
+            batches: iterable of pandas dataframes.
+            writer (:obj:`SplitWriter`): writer of the splits.
+        """
+        offset = 0
+        for batch in batches:
+            writer.write(batch, self.get_test_mask(batch, offset))
+            offset += len(batch)
+
+    def _hash(self, batch, offset):
+        if self.key_cols is None:
+            keys = pd.Series(np.arange(offset, offset + len(batch), dtype=np.int64))
+        else:
+            keys = batch[self.key_cols]
+        return hash_rows(keys, seed=self.seed)
+
+
+class SplitWriter:
+    """Writes train and test splits batch by batch.
+
+    Args:
+        split_dir (:obj:`str`): directory of the split files.
+        feature_cols (:obj:`list`): feature columns.
+        target_col (:obj:`str`): target column.
+        split_format (:obj:`str`, optional): 'arrow' for Arrow IPC files read back as
+            pandas objects or 'npy' for NPY source directories read back as
+            memory-mapped numpy arrays. 'npy' needs numeric features and target.
+            Defaults to 'arrow'.
+        dtype (optional): split_format 'npy' only. dtype of the feature matrices. Defaults to float64.
+    """
+
+    def __init__(self, split_dir, feature_cols, target_col, split_format='arrow', dtype=np.float64):
+        if split_format not in SPLIT_FORMATS:
+            raise ValueError(f"split format {split_format} not in available formats {SPLIT_FORMATS}")
+        os.makedirs(split_dir, exist_ok=True)
+        self.split_dir = split_dir
+        self.feature_cols = list(feature_cols)
+        self.target_col = target_col
+        self.split_format = split_format
+        self.dtype = dtype
+        self.columns = self.feature_cols + [target_col] if target_col not in self.feature_cols else self.feature_cols
+        self.writers = None
+        self.schema = None
+
+    def write(self, batch, is_test):
+        """Appends the rows of the batch to the train and test split.
+
+        Args:
+            batch (:obj:`pandas.DataFrame`): rows to write.
+            is_test: boolean mask of the test rows.
+        """
+        batch = batch[self.columns]
+        if self.split_format == 'npy':
+            if self.writers is None:
+                self.writers = {split: NPYWriter(os.path.join(self.split_dir, split), feature_cols=self.feature_cols, target_cols=[self.target_col],
+                                                 dtype=self.dtype)
+                                for split in ['train', 'test']}
+            self.writers['train'].write(batch[~is_test])
+            self.writers['test'].write(batch[is_test])
+            return
+
+        if self.writers is None:
+            self.schema = pa.Schema.from_pandas(batch, preserve_index=False)
+            self.writers = {split: pa.ipc.new_file(self._get_filename(split), self.schema) for split in ['train', 'test']}
+        table = pa.Table.from_pandas(batch, schema=self.schema, preserve_index=False)
+        self.writers['train'].write_table(table.filter(pa.array(~is_test)))
+        self.writers['test'].write_table(table.filter(pa.array(is_test)))
+
+    def close(self):
+        """Finishes the split files."""
+        if self.writers is None:
+            raise ValueError('no data to split')
+        for writer in self.writers.values():
+            writer.close()
+
+    def cleanup(self):
+        """Removes the temporary files of unfinished npy splits."""
+        if self.split_format == 'npy' and self.writers is not None:
+            for writer in self.writers.values():
+                writer.cleanup()
+
+    def read(self):
+        """Reads the splits memory-mapped.
+
+        Returns:
+            X_train, X_test, y_train, y_test
+        """
+        if self.split_format == 'npy':
+            X_train, y_train = NPY(os.path.join(self.split_dir, 'train')).read(mmap_mode='r')
+            X_test, y_test = NPY(os.path.join(self.split_dir, 'test')).read(mmap_mode='r')
+            return X_train, X_test, y_train, y_test
+
+        train = feather.read_table(self._get_filename('train'), memory_map=True)
+        test = feather.read_table(self._get_filename('test'), memory_map=True)
+        return (train.select(self.feature_cols).to_pandas(), test.select(self.feature_cols).to_pandas(),
+                train.column(self.target_col).to_pandas().rename(self.target_col), test.column(self.target_col).to_pandas().rename(self.target_col))
+
+    def _get_filename(self, split):
+        return os.path.join(self.split_dir, f"{split}.arrow")
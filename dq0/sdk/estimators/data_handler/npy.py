@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""NumPy data handler.
+
+Data handler of NPY data sources and of in-memory (X, y) numpy arrays
+or scipy sparse matrices X.
+The arrays of NPY sources are memory-mapped, only the rows of the splits
+are copied into memory.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import logging
+
+from dq0.sdk.data.binary.npy import NPY
+from dq0.sdk.estimators.data_handler.base import BasicDataHandler
+from dq0.sdk.estimators.data_handler.hash_split import HashSplitter
+from dq0.sdk.estimators.data_handler.tabular import SPLIT_MODES
+
+import numpy as np
+
+import pandas as pd
+
+import scipy.sparse
+
+from sklearn.model_selection import train_test_split
+
+logger = logging.getLogger(__name__)
+
+
+class NPYDataHandler(BasicDataHandler):
+    """Data Handler for NPY data sources and numpy arrays"""
+
+    def __init__(self, pipeline_steps=None, pipeline_config_path=None, transformers_root_dir='.'):
+        super().__init__(pipeline_steps=pipeline_steps, pipeline_config_path=pipeline_config_path, transformers_root_dir=transformers_root_dir)
+
+    def setup_data(self, data_source, train_size=0.66, split_mode='random', stratify=False, seed=None, mmap_mode='r', **kwargs):
+        """ Setup data from a NPY data source or a tuple (X, y) of numpy arrays.
+
+        Args:
+            data_source: the NPY data source or a tuple (X, y) of numpy arrays.
+            train_size (float, optional): share of rows in the train split. Defaults to 0.66.
+            split_mode (:obj:`str`, optional): 'random' for sklearn's train_test_split or 'hash'
+                for a deterministic split by row index hashes. Defaults to 'random'.
+            stratify (bool, optional): True to stratify the split by y. Defaults to False.
+            seed (int, optional): random seed of split_mode 'random', hash seed of split_mode 'hash'.
+            mmap_mode (:obj:`str`, optional): numpy.load memory-map mode of NPY sources.
+                Defaults to 'r'. None loads the arrays into memory.
+            kwargs: keyword arguments
+
+        Returns:
+            X_train, X_test, y_train, y_test
+        """
+        if split_mode not in SPLIT_MODES:
+            raise ValueError(f"split_mode {split_mode} not in available modes {SPLIT_MODES}")
+        X, y = self._read(data_source, mmap_mode=mmap_mode)
+        if y is None or y.ndim != 1:
+            raise ValueError("NPYDataHandler needs a single target column y (Check the NPY source!)")
+        if X.shape[0] != len(y):
+            raise ValueError(f"X and y have different numbers of rows: {X.shape[0]} and {len(y)}")
+
+        # run pipeline
+        if self.pipeline is not None:
+            X = self.pipeline.fit_transform(X)
+
+        if split_mode == 'hash':
+            splitter = HashSplitter(train_size, stratify_col='y' if stratify else None, seed=seed)
+            labels = pd.DataFrame({'y': y})
+            is_test = splitter.fit([labels]).get_test_mask(labels)
+            train_index, test_index = np.nonzero(~is_test)[0], np.nonzero(is_test)[0]
+        else:
+            train_index, test_index = train_test_split(np.arange(X.shape[0]), train_size=train_size, stratify=y if stratify else None, random_state=seed)
+        return X[train_index], X[test_index], y[train_index], y[test_index]
+
+    def get_input_dim(self, X):
+        if not len(X.shape) == 2:
+            raise ValueError("Feature Vector X is not 2-dim. The NPYDataHandler can only handle 2-dim arrays")
+        return X.shape[-1]
+
+    def get_output_dim(self, y):
+        return len(pd.unique(y))
+
+    def _read(self, data_source, mmap_mode='r'):
+        if isinstance(data_source, NPY):
+            return data_source.read(mmap_mode=mmap_mode)
+        if isinstance(data_source, (tuple, list)) and len(data_source) == 2:
+            # sparse matrices are kept sparse
+            X = data_source[0].tocsr() if scipy.sparse.issparse(data_source[0]) else np.asarray(data_source[0])
+            return X, None if data_source[1] is None else np.asarray(data_source[1])
+        raise ValueError(f"data_source attached to estimator and handled by the NPY data handler is not of Type: dq0.sdk.data.binary.npy.NPY or a tuple (X, y) but: {type(data_source)}")  # noqa:E501
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""SQL data handler.
+
+Data handler of the SQL data sources. Only the needed columns of the query
+result are selected, partitioned sources are read with concurrent
+partition queries and hash splits stream the result set.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import logging
+
+from dq0.sdk.estimators.data_handler.tabular import TabularDataHandler
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class SQLDataHandler(TabularDataHandler):
+    """Data Handler for SQL data sources"""
+
+    def __init__(self, pipeline_steps=None, pipeline_config_path=None, transformers_root_dir='.'):
+        super().__init__(pipeline_steps=pipeline_steps, pipeline_config_path=pipeline_config_path, transformers_root_dir=transformers_root_dir)
+
+    def _check_data_source(self, data_source):
+        # imported here to not import sqlalchemy with the estimators
+        from dq0.sdk.data.sql.sql import SQL
+        if not isinstance(data_source, SQL):
+            raise ValueError(f"data_source attached to estimator and handled by the SQL data handler is not of Type: dq0.sdk.data.sql.sql.SQL but: {type(data_source)}")  # noqa:E501
+        if data_source.query is None:
+            raise ValueError("SQL data source has no query. Please set its query attribute")
+
+    def _read(self, data_source, columns):
+        partition_column = data_source.partition_column
+        if partition_column is None or data_source.num_partitions is None or data_source.num_partitions <= 1:
+            return data_source.execute(query=self._get_query(data_source, columns))
+        if columns is not None and partition_column not in columns:
+            columns = columns + [partition_column]
+        partitions = data_source.iter_partitions(partition_column, data_source.num_partitions, query=self._get_query(data_source, columns))
+        return pd.concat(list(partitions), ignore_index=True)
+
+    def _iter_batches(self, data_source, columns, batch_rows):
+        return data_source.iter_batches(query=self._get_query(data_source, columns), batch_rows=batch_rows)
+
+    def _get_query(self, data_source, columns):
+        if columns is None:
+            return data_source.query
+        return data_source.get_columns_query(columns)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""Streaming data handler for Keras estimators.
+
+The data source is streamed once batch by batch. Every batch is
+transformed with the pipeline fitted on a bounded uniform random sample of
+the rows, assigned to train or test by row hashes (see `dq0.sdk.estimators.data_handler.hash_split`) and
+appended to memory-mapped NPY splits. The splits are returned as
+`tf.data.Dataset` or `keras.utils.Sequence` reading the batches from the
+memory maps, so Keras estimators train on data larger than memory.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import logging
+import math
+
+from dq0.sdk.estimators.data_handler.arrow import ArrowDataHandler
+from dq0.sdk.estimators.data_handler.csv import CSVDataHandler
+from dq0.sdk.estimators.data_handler.hash_split import HashSplitter, SplitWriter
+from dq0.sdk.estimators.data_handler.sql import SQLDataHandler
+from dq0.sdk.estimators.data_handler.tabular import DEFAULT_BATCH_ROWS, DEFAULT_PIPELINE_FIT_ROWS, TabularDataHandler
+
+import numpy as np
+
+import tensorflow as tf
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_TYPES = ['dataset', 'sequence']
+
+# data handlers used to read the data sources
+reader_classes = [CSVDataHandler, ArrowDataHandler, SQLDataHandler]
+
+
+class BatchSequence(tf.keras.utils.Sequence):
+    """Keras Sequence of mini-batches of (memory-mapped) arrays.
+
+    Only the rows of the requested batch are read. With shuffle the rows
+    are permuted at the end of every epoch.
+
+    Args:
+        X (:obj:`numpy.ndarray`): feature matrix.
+        y (:obj:`numpy.ndarray`): target vector.
+        batch_size (int, optional): rows per batch. Defaults to 32.
+        shuffle (bool, optional): True to shuffle the rows every epoch. Defaults to False.
+        seed (int, optional): seed of the shuffling.
+    """
+
+    def __init__(self, X, y, batch_size=32, shuffle=False, seed=None):
+        if len(X) != len(y):
+            raise ValueError(f"X and y have different numbers of rows: {len(X)} and {len(y)}")
+        self.X = X
+        self.y = y
+        self.batch_size = int(batch_size)
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.indices = None
+        self.on_epoch_end()
+
+    @property
+    def shape(self):
+        """Shape of the feature matrix"""
+        return self.X.shape
+
+    def __len__(self):
+        return math.ceil(len(self.X) / self.batch_size)
+
+    def __getitem__(self, idx):
+        if idx < 0 or idx >= len(self):
+            raise IndexError(f"batch index {idx} out of range")
+        start = idx * self.batch_size
+        end = min(start + self.batch_size, len(self.X))
+        if self.indices is None:
+            return np.asarray(self.X[start:end]), np.asarray(self.y[start:end])
+        # sorted indices read the memory map in file order
+        rows = np.sort(self.indices[start:end])
+        return self.X[rows], self.y[rows]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.indices = self.rng.permutation(len(self.X))
+
+
+def make_dataset(X, y, batch_size=32, shuffle=False, shuffle_buffer_size=None, seed=None, num_parallel_calls=tf.data.experimental.AUTOTUNE,
+                 prefetch=tf.data.experimental.AUTOTUNE):
+    """Returns a `tf.data.Dataset` of mini-batches of (memory-mapped) arrays.
+
+    The dataset is a range of batch indices, loading the batches is a
+    parallel map. With shuffle the batch order changes every epoch and the
+    rows are mixed across batches in a shuffle buffer.
+
+    Args:
+        X (:obj:`numpy.ndarray`): feature matrix.
+        y (:obj:`numpy.ndarray`): target vector.
+        batch_size (int, optional): rows per batch. Defaults to 32.
+        shuffle (bool, optional): True to shuffle every epoch. Defaults to False.
+        shuffle_buffer_size (int, optional): rows in the shuffle buffer. Defaults to 8 batches.
+        seed (int, optional): seed of the shuffling.
+        num_parallel_calls (int, optional): number of batches loaded in parallel. Defaults to AUTOTUNE.
+        prefetch (int, optional): number of batches to prefetch, None for no prefetching. Defaults to AUTOTUNE.
+
+    Returns:
+        dataset of (X, y) batches
+    """
+    if len(X) != len(y):
+        raise ValueError(f"X and y have different numbers of rows: {len(X)} and {len(y)}")
+    batch_size = int(batch_size)
+    n_rows = len(X)
+    n_batches = math.ceil(n_rows / batch_size)
+
+    def load_batch(idx):
+        start = int(idx) * batch_size
+        end = min(start + batch_size, n_rows)
+        return np.asarray(X[start:end]), np.asarray(y[start:end])
+
+    def map_batch(idx):
+        X_batch, y_batch = tf.numpy_function(load_batch, [idx], (tf.as_dtype(X.dtype), tf.as_dtype(y.dtype)))
+        X_batch.set_shape((None,) + tuple(X.shape[1:]))
+        y_batch.set_shape((None,) + tuple(y.shape[1:]))
+        return X_batch, y_batch
+
+    dataset = tf.data.Dataset.range(n_batches)
+    if shuffle:
+        dataset = dataset.shuffle(max(n_batches, 1), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.map(map_batch, num_parallel_calls=num_parallel_calls, deterministic=not shuffle)
+    if shuffle:
+        shuffle_buffer_size = 8 * batch_size if shuffle_buffer_size is None else int(shuffle_buffer_size)
+        dataset = dataset.unbatch().shuffle(shuffle_buffer_size, seed=seed, reshuffle_each_iteration=True).batch(batch_size)
+    if prefetch is not None:
+        dataset = dataset.prefetch(prefetch)
+    return dataset
+
+
+class KerasStreamDataHandler(TabularDataHandler):
+    """Streaming Data Handler for Keras estimators
+
+    Handles the CSV, Arrow and SQL data sources of the other tabular data
+    handlers. setup_data returns the train and test features as
+    `tf.data.Dataset` or `keras.utils.Sequence` and the targets as
+    memory-mapped arrays.
+    """
+
+    def __init__(self, pipeline_steps=None, pipeline_config_path=None, transformers_root_dir='.'):
+        super().__init__(pipeline_steps=pipeline_steps, pipeline_config_path=pipeline_config_path, transformers_root_dir=transformers_root_dir)
+        self.reader = None
+
+    def setup_data(self, data_source, train_size=0.66, stratify=False, seed=None, split_key=None, split_dir=None, batch_rows=DEFAULT_BATCH_ROWS,
+                   pipeline_fit_rows=DEFAULT_PIPELINE_FIT_ROWS, batch_size=32, shuffle=True, shuffle_buffer_size=None, output='dataset',
+                   num_parallel_calls=tf.data.experimental.AUTOTUNE, prefetch=tf.data.experimental.AUTOTUNE, dtype=np.float32, **kwargs):
+        """ Setup data from the data source.
+
+        The pipeline is fitted on a uniform random sample of pipeline_fit_rows
+        rows and applied batch by batch. The rows are split by the hash of their split_key or
+        row index, the test split is never shuffled.
+
+        Args:
+            data_source (:obj:`dq0.sdk.data.Source`): the data source.
+            train_size (float, optional): share of rows in the train split. Defaults to 0.66.
+            stratify (bool, optional): True to stratify the split by the target column. Defaults to False.
+            seed (int, optional): seed of the split and the shuffling.
+            split_key (optional): Column or list of columns identifying a row. Defaults to the row index.
+            split_dir (:obj:`str`, optional): Directory of the split files.
+                Defaults to a new temporary directory that is removed with the handler, see close.
+            batch_rows (int, optional): Rows per batch streamed from the data source.
+            pipeline_fit_rows (int, optional): Rows of the random sample to fit the pipeline on.
+                Defaults to DEFAULT_PIPELINE_FIT_ROWS. None fits on all rows, which reads the
+                whole data source into memory, see fit_pipeline.
+            batch_size (int, optional): Rows per training batch. Defaults to 32.
+            shuffle (bool, optional): True to shuffle the train split every epoch. Defaults to True.
+            shuffle_buffer_size (int, optional): output 'dataset' only. Rows in the shuffle buffer.
+            output (:obj:`str`, optional): 'dataset' for `tf.data.Dataset` or 'sequence' for
+                `keras.utils.Sequence`. Defaults to 'dataset'.
+            num_parallel_calls (int, optional): output 'dataset' only. Batches loaded in parallel.
+            prefetch (int, optional): output 'dataset' only. Batches to prefetch.
+            dtype (optional): dtype of the features. Defaults to float32.
+            kwargs: keyword arguments
+
+        Returns:
+            X_train, X_test, y_train, y_test
+        """
+        if output not in OUTPUT_TYPES:
+            raise ValueError(f"output {output} not in available output types {OUTPUT_TYPES}")
+        self._check_data_source(data_source)
+        if getattr(data_source, 'feature_cols', None) is None or getattr(data_source, 'target_cols', None) is None:
+            raise ValueError(f"{type(data_source).__name__} data source has not attribute feature_cols or target_cols. Please set this values on init or in the metadata")  # noqa:E501
+        if len(data_source.target_cols) != 1:
+            raise ValueError(f"{type(self).__name__} currently only supports one target_col (Check Metadata!); len(target_cols): {len(data_source.target_cols)}")  # noqa:E501
+
+        target_col = data_source.target_cols[0]
+        key_cols = None if split_key is None else [split_key] if isinstance(split_key, str) else list(split_key)
+        columns = self.get_columns(data_source)
+        if columns is not None and key_cols is not None:
+            columns.extend(col for col in key_cols if col not in columns)
+        splitter = HashSplitter(train_size, key_cols=key_cols, stratify_col=target_col if stratify else None, seed=seed)
+        if stratify:
+            # first pass over the key and target columns only
+            key_target_cols = list(dict.fromkeys(([] if key_cols is None else key_cols) + [target_col]))
+            splitter.fit(self._iter_batches(data_source, key_target_cols, batch_rows))
+
+        if self.pipeline is not None:
+            self.fit_pipeline(data_source, n_rows=pipeline_fit_rows, seed=seed, batch_rows=batch_rows)
+
+        self.split_dir = self._get_split_dir(split_dir)
+        writer = SplitWriter(self.split_dir, feature_cols=data_source.feature_cols, target_col=target_col, split_format='npy', dtype=dtype)
+        self.data = None
+        try:
+            self._write_splits(self._iter_batches(data_source, columns, batch_rows), splitter, writer)
+            writer.close()
+        finally:
+            writer.cleanup()
+        X_train, X_test, y_train, y_test = writer.read()
+
+        if output == 'sequence':
+            train = BatchSequence(X_train, y_train, batch_size=batch_size, shuffle=shuffle, seed=seed)
+            test = BatchSequence(X_test, y_test, batch_size=batch_size)
+        else:
+            train = make_dataset(X_train, y_train, batch_size=batch_size, shuffle=shuffle, shuffle_buffer_size=shuffle_buffer_size, seed=seed,
+                                 num_parallel_calls=num_parallel_calls, prefetch=prefetch)
+            test = make_dataset(X_test, y_test, batch_size=batch_size, num_parallel_calls=num_parallel_calls, prefetch=prefetch)
+        return train, test, y_train, y_test
+
+    def get_input_dim(self, X):
+        if isinstance(X, tf.data.Dataset):
+            shape = X.element_spec[0].shape
+        else:
+            shape = X.shape
+        if not len(shape) == 2:
+            raise ValueError(f"Feature Vector X is not 2-dim. The {type(self).__name__} can only handle 2-dim DFs")
+        return shape[-1]
+
+    def _check_data_source(self, data_source):
+        errors = []
+        for reader_class in reader_classes:
+            reader = reader_class()
+            try:
+                reader._check_data_source(data_source)
+            except ValueError as e:
+                errors.append(str(e))
+                continue
+            self.reader = reader
+            return
+        raise ValueError(f"data_source attached to estimator cannot be streamed by the {type(self).__name__}: {' '.join(errors)}")
+
+    def _read(self, data_source, columns):
+        return self.reader._read(data_source, columns)
+
+    def _iter_batches(self, data_source, columns, batch_rows):
+        return self.reader._iter_batches(data_source, columns, batch_rows)
+
+    def _write_splits(self, batches, splitter, writer):
+        """Transform the batches and write them to the train or test split"""
+        offset = 0
+        for batch in batches:
+            # rows are assigned before transforming them
+            is_test = splitter.get_test_mask(batch, offset)
+            offset += len(batch)
+            if self.pipeline is not None:
+                batch = self.pipeline.transform(batch)
+                if len(batch) != len(is_test):
+                    raise ValueError(f"pipeline changed the number of rows from {len(is_test)} to {len(batch)}, cannot split by row hashes")
+            writer.write(batch, is_test)
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""Tabular data handler.
+
+Base class of the data handlers of data sources returning pandas
+dataframes. Only the feature and target columns of the metadata and the
+input columns of the pipeline config are read.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import logging
+import shutil
+import tempfile
+import weakref
+
+from dq0.sdk.data import sampling
+from dq0.sdk.estimators.data_handler.base import BasicDataHandler
+from dq0.sdk.estimators.data_handler.hash_split import HashSplitter, SplitWriter
+from dq0.sdk.pipeline.transformer.transformer import has_sparse_columns, to_sparse_matrix
+
+import numpy as np
+
+import pandas as pd
+
+from sklearn.model_selection import train_test_split
+
+logger = logging.getLogger(__name__)
+
+SPLIT_MODES = ['random', 'hash']
+DEFAULT_BATCH_ROWS = 65536
+# rows of the random sample streaming handlers fit the pipeline on
+DEFAULT_PIPELINE_FIT_ROWS = 100000
+
+
+class TabularDataHandler(BasicDataHandler):
+    """Tabular Data Handler for all estimators
+
+    Subclasses define the data source type in `_check_data_source` and how
+    to read columns in `_read` and `_iter_batches`.
+
+    Temporary split directories created by setup_data are removed by close,
+    at the end of a with block or when the handler is garbage collected.
+    """
+
+    def __init__(self, pipeline_steps=None, pipeline_config_path=None, transformers_root_dir='.'):
+        super().__init__(pipeline_steps=pipeline_steps, pipeline_config_path=pipeline_config_path, transformers_root_dir=transformers_root_dir)
+        self._split_dir_finalizer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Removes the temporary split directory created by setup_data. Given split directories are kept."""
+        if self._split_dir_finalizer is not None:
+            self._split_dir_finalizer()
+            self._split_dir_finalizer = None
+
+    def setup_data(self, data_source, train_size=0.66, split_mode='random', stratify=False, seed=None, split_key=None, split_dir=None,
+                   split_format='arrow', batch_rows=DEFAULT_BATCH_ROWS, **kwargs):
+        """ Setup data from the data source.
+
+        split_mode 'random' reads the data into memory and splits it with
+        sklearn's train_test_split. split_mode 'hash' assigns every row by a
+        deterministic hash of its split_key or row index while streaming the
+        data source and writes the splits to split_dir, see
+        `dq0.sdk.estimators.data_handler.hash_split`. The peak memory stays
+        near one copy of the data and the data attribute is not kept.
+        With a pipeline the data is still read and transformed in memory.
+
+        Args:
+            data_source (:obj:`dq0.sdk.data.Source`): the data source.
+            train_size (float, optional): share of rows in the train split. Defaults to 0.66.
+            split_mode (:obj:`str`, optional): 'random' or 'hash'. Defaults to 'random'.
+            stratify (bool, optional): True to stratify the split by the target column. Defaults to False.
+            seed (int, optional): random seed of split_mode 'random', hash seed of split_mode 'hash'.
+            split_key (optional): split_mode 'hash' only. Column or list of columns identifying a row.
+                Defaults to the row index.
+            split_dir (:obj:`str`, optional): split_mode 'hash' only. Directory of the split files.
+                Defaults to a new temporary directory that is removed with the handler, see close.
+            split_format (:obj:`str`, optional): split_mode 'hash' only. 'arrow' to return pandas
+                objects or 'npy' to return memory-mapped numpy arrays. Defaults to 'arrow'.
+            batch_rows (int, optional): split_mode 'hash' only. Rows per streamed batch.
+            kwargs: keyword arguments
+
+        Returns:
+            X_train, X_test, y_train, y_test
+        """
+        if split_mode not in SPLIT_MODES:
+            raise ValueError(f"split_mode {split_mode} not in available modes {SPLIT_MODES}")
+        self._check_data_source(data_source)
+        if not hasattr(data_source, 'feature_cols') and not hasattr(data_source, 'target_cols'):
+            raise ValueError(f"{type(data_source).__name__} data source has not attribute feature_cols or target_cols. Please set this values on init or in the metadata")  # noqa:E501
+
+        if split_mode == 'hash':
+            return self._setup_data_hash(data_source, train_size=train_size, stratify=stratify, seed=seed, split_key=split_key,
+                                         split_dir=split_dir, split_format=split_format, batch_rows=batch_rows)
+
+        self.data = self._read_data(data_source)
+
+        # run pipeline
+        if self.pipeline is not None:
+            self.data = self.pipeline.fit_transform(self.data)
+
+        X = self._get_X(self.data, data_source.feature_cols)
+        y = self._get_y(self.data, data_source.target_cols)
+        X_train, X_test, y_train, y_test = self._train_test_split(X, y, train_size=train_size, stratify=stratify, seed=seed)
+        return X_train, X_test, y_train, y_test
+
+    def iter_batches(self, data_source, batch_rows=DEFAULT_BATCH_ROWS, split=None, train_size=0.66, seed=None, split_key=None):
+        """ Iterate over the data source in (X, y) batches without reading it into memory.
+
+        A pipeline must be fitted before, e.g. with fit_pipeline, it is
+        applied to every batch. With split 'train' or 'test' only the
+        rows of this split are returned, assigned by the same row hashes as
+        setup_data with split_mode 'hash' and stratify False.
+
+        Args:
+            data_source (:obj:`dq0.sdk.data.Source`): the data source.
+            batch_rows (int, optional): Rows per batch streamed from the data source.
+            split (:obj:`str`, optional): None for all rows, 'train' or 'test' for the rows of the split.
+            train_size (float, optional): share of rows in the train split. Defaults to 0.66.
+            seed (int, optional): hash seed of the split.
+            split_key (optional): Column or list of columns identifying a row. Defaults to the row index.
+
+        Yields:
+            X, y
+
+        Raises:
+            ValueError: if the pipeline is not fitted.
+        """
+        if split not in [None, 'train', 'test']:
+            raise ValueError(f"split must be None, 'train' or 'test', got {split}")
+        if self.pipeline is not None and not hasattr(self.pipeline, 'col_names'):
+            raise ValueError("the pipeline is not fitted, a pipeline fitted on one batch would use its statistics and categories only. "
+                             "Call fit_pipeline first.")
+        self._check_data_source(data_source)
+        if getattr(data_source, 'feature_cols', None) is None or getattr(data_source, 'target_cols', None) is None:
+            raise ValueError(f"{type(data_source).__name__} data source has not attribute feature_cols or target_cols. Please set this values on init or in the metadata")  # noqa:E501
+        key_cols = None if split_key is None else [split_key] if isinstance(split_key, str) else list(split_key)
+        columns = self.get_columns(data_source)
+        if columns is not None and key_cols is not None:
+            columns.extend(col for col in key_cols if col not in columns)
+        splitter = None if split is None else HashSplitter(train_size, key_cols=key_cols, seed=seed)
+
+        offset = 0
+        for batch in self._iter_batches(data_source, columns, batch_rows):
+            if splitter is not None:
+                is_test = splitter.get_test_mask(batch, offset)
+                offset += len(batch)
+                batch = batch[is_test if split == 'test' else ~is_test]
+                if len(batch) == 0:
+                    continue
+            if self.pipeline is not None:
+                batch = self.pipeline.transform(batch)
+            yield self._get_X(batch, data_source.feature_cols), self._get_y(batch, data_source.target_cols)
+
+    def fit_pipeline(self, data_source, n_rows=None, seed=None, batch_rows=DEFAULT_BATCH_ROWS):
+        """Fits the pipeline in an explicit pass over the data source.
+
+        Without n_rows the pipeline is fitted on all rows, which are read into
+        memory. With n_rows it is fitted on a uniform random sample of n_rows
+        rows drawn in one streaming pass: scalers use the statistics of the
+        sample and encoders only know the categories of the sample.
+
+        Args:
+            data_source (:obj:`dq0.sdk.data.Source`): the data source.
+            n_rows (int, optional): sample size. Defaults to None (all rows).
+            seed (int, optional): random seed of the sample.
+            batch_rows (int, optional): Rows per batch streamed from the data source.
+
+        Returns:
+            the fitted pipeline
+        """
+        if self.pipeline is None:
+            raise ValueError(f"{type(self).__name__} has no pipeline to fit")
+        self._check_data_source(data_source)
+        if n_rows is None:
+            data = self._read_data(data_source)
+        else:
+            logger.info(f"fitting the pipeline on a random sample of {n_rows} rows")
+            data = sampling.sample_batches(self._iter_batches(data_source, self.get_columns(data_source), batch_rows), n_rows, method='reservoir',
+                                           seed=seed)
+        if len(data) == 0:
+            raise ValueError('no data to fit the pipeline on')
+        return self.pipeline.fit(data)
+
+    def get_classes(self, data_source, batch_rows=DEFAULT_BATCH_ROWS):
+        """Returns the sorted distinct values of the target column like iter_batches returns them.
+
+        Without pipeline only the target column is streamed. A pipeline may
+        transform the target, it must be fitted and is applied to all columns.
+        """
+        self._check_data_source(data_source)
+        target_cols = getattr(data_source, 'target_cols', None)
+        if target_cols is None or len(target_cols) != 1:
+            raise ValueError(f"{type(self).__name__} currently only supports one target_col (Check Metadata!); target_cols: {target_cols}")
+        if self.pipeline is not None:
+            targets = (y for _, y in self.iter_batches(data_source, batch_rows=batch_rows))
+        else:
+            targets = (batch[target_cols[0]] for batch in self._iter_batches(data_source, list(target_cols), batch_rows))
+        classes = set()
+        for y in targets:
+            classes.update(pd.unique(y.dropna()))
+        return np.array(sorted(classes))
+
+    def get_input_dim(self, X):
+        if not len(X.shape) == 2:
+            raise ValueError(f"Feature Vector X is not 2-dim. The {type(self).__name__} can only handle 2-dim DFs")
+        return X.shape[-1]
+
+    def get_output_dim(self, y):
+        return len(pd.unique(y))
+
+    def get_columns(self, data_source):
+        """Returns the columns to read from the data source.
+
+        The feature and target columns and the input columns of the
+        pipeline steps. None to read all columns if there are no feature
+        columns or the pipeline steps were given without config.
+        """
+        feature_cols = getattr(data_source, 'feature_cols', None)
+        if feature_cols is None or len(feature_cols) == 0:
+            return None
+        columns = list(feature_cols)
+        for col in getattr(data_source, 'target_cols', None) or []:
+            if col not in columns:
+                columns.append(col)
+        if self.pipeline is not None:
+            if not hasattr(self.pipeline, 'steps_input_cols'):
+                return None
+            for input_cols in self.pipeline.steps_input_cols:
+                columns.extend(col for col in input_cols if col not in columns)
+        return columns
+
+    def _check_data_source(self, data_source):
+        """Raises a ValueError if the data source is not handled by this data handler"""
+        raise NotImplementedError()
+
+    def _read(self, data_source, columns):
+        """Reads the given columns of the data source as dataframe. All columns if columns is None."""
+        raise NotImplementedError()
+
+    def _iter_batches(self, data_source, columns, batch_rows):
+        """Reads the given columns of the data source as dataframes of at most batch_rows rows."""
+        raise NotImplementedError()
+
+    def _get_X(self, data, feature_cols):
+        """Get X features vectors assuming data is a Pandas DataFrame. CSR matrix if there are sparse feature columns."""
+        X = data[feature_cols]
+        if has_sparse_columns(X):
+            return to_sparse_matrix(X)
+        return X
+
+    def _get_y(self, data, target_cols):
+        """Get y target vector assuming data is a Pandas DataFrame"""
+        if len(target_cols) == 1:
+            return data[target_cols[-1]]
+        else:
+            raise ValueError(f"{type(self).__name__} currently only supports one target_col (Check Metadata!); len(target_cols): {len(target_cols)}")
+
+    def _train_test_split(self, X, y, train_size=0.66, stratify=False, seed=None):
+        X_train, X_test, y_train, y_test = train_test_split(X, y, train_size=train_size, stratify=y if stratify else None, random_state=seed)
+        return X_train, X_test, y_train, y_test
+
+    def _read_data(self, data_source):
+        """Read the data into memory and check it against the pipeline config"""
+        data = self._read(data_source, self.get_columns(data_source))
+        # Check type of data, must be pandas.DataFrame
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError("Data loaded is not of type pandas.DataFrame, but: {}".format(type(data)))
+
+        # check if header is present and is matching the pipeline config columns
+        if self.pipeline is not None and hasattr(self.pipeline, 'steps_input_cols'):
+            if len(self.pipeline.steps_input_cols) > 0:
+                input_cols_first_step = self.pipeline.steps_input_cols[0]
+                for col in input_cols_first_step:
+                    if col not in data.columns:
+                        raise ValueError(f"Column '{col}' not in the columns of the data source. Check if it matches the input columns the pipeline config.")
+        return data
+
+    def _get_split_dir(self, split_dir):
+        """Returns split_dir or a new temporary directory removed with the handler"""
+        # the directory of an earlier setup_data is replaced
+        self.close()
+        if split_dir is not None:
+            return split_dir
+        split_dir = tempfile.mkdtemp(prefix='dq0_split_')
+        self._split_dir_finalizer = weakref.finalize(self, shutil.rmtree, split_dir, ignore_errors=True)
+        return split_dir
+
+    def _setup_data_hash(self, data_source, train_size, stratify, seed, split_key, split_dir, split_format, batch_rows):
+        """Split by row hashes while streaming the data into split files"""
+        if len(data_source.target_cols) != 1:
+            raise ValueError(f"{type(self).__name__} currently only supports one target_col (Check Metadata!); len(target_cols): {len(data_source.target_cols)}")  # noqa:E501
+        target_col = data_source.target_cols[0]
+        key_cols = None if split_key is None else [split_key] if isinstance(split_key, str) else list(split_key)
+        splitter = HashSplitter(train_size, key_cols=key_cols, stratify_col=target_col if stratify else None, seed=seed)
+        self.split_dir = self._get_split_dir(split_dir)
+        writer = SplitWriter(self.split_dir, feature_cols=data_source.feature_cols, target_col=target_col, split_format=split_format)
+        self.data = None
+
+        try:
+            if self.pipeline is not None:
+                # the pipeline is fitted on the whole data. The rows are assigned before transforming them.
+                data = self._read_data(data_source)
+                is_test = splitter.fit([data]).get_test_mask(data)
+                data = self.pipeline.fit_transform(data)
+                if has_sparse_columns(data):
+                    raise ValueError("split_mode 'hash' cannot write sparse columns of the pipeline, use split_mode 'random'")
+                if len(data) != len(is_test):
+                    raise ValueError(f"pipeline changed the number of rows from {len(is_test)} to {len(data)}, cannot split by row hashes")
+                writer.write(data, is_test)
+                del data
+            else:
+                columns = self.get_columns(data_source)
+                if columns is not None and key_cols is not None:
+                    columns.extend(col for col in key_cols if col not in columns)
+                if stratify:
+                    # first pass over the key and target columns only
+                    key_target_cols = list(dict.fromkeys(([] if key_cols is None else key_cols) + [target_col]))
+                    splitter.fit(self._iter_batches(data_source, key_target_cols, batch_rows))
+                splitter.split(self._iter_batches(data_source, columns, batch_rows), writer)
+            writer.close()
+        finally:
+            writer.cleanup()
+        return writer.read()
@@ -5,13 +5,32 @@ Copyright 2021, Gradient Zero
 All rights reserved
 """
 
+import importlib
+
+from dq0.sdk.estimators.data_handler.arrow import ArrowDataHandler
 from dq0.sdk.estimators.data_handler.csv import CSVDataHandler
+from dq0.sdk.estimators.data_handler.npy import NPYDataHandler
+from dq0.sdk.estimators.data_handler.sql import SQLDataHandler
 
 data_handler_types = {
-    'csv': CSVDataHandler
+    'csv': CSVDataHandler,
+    'arrow': ArrowDataHandler,
+    'feather': ArrowDataHandler,
+    'orc': ArrowDataHandler,
+    'parquet': ArrowDataHandler,
+    'sql': SQLDataHandler,
+    'npy': NPYDataHandler,
+    'numpy': NPYDataHandler,
+    # imported on first use, the module imports tensorflow
+    'kerasstream': 'dq0.sdk.estimators.data_handler.stream:KerasStreamDataHandler'
 }
 
 
 def data_handler_factory(data_handler_instance, pipeline_steps=None, pipeline_config_path=None, transformers_root_dir='.'):
+    if data_handler_instance.lower() not in data_handler_types:
+        raise ValueError(f"data handler {data_handler_instance} not in available data handlers {list(data_handler_types.keys())}")
     data_handler_class = data_handler_types[data_handler_instance.lower()]
+    if isinstance(data_handler_class, str):
+        module_name, _, class_name = data_handler_class.partition(':')
+        data_handler_class = getattr(importlib.import_module(module_name), class_name)
     return data_handler_class(pipeline_steps=pipeline_steps, pipeline_config_path=pipeline_config_path, transformers_root_dir=transformers_root_dir)
@@ -11,6 +11,7 @@ All rights reserved
 import logging
 import uuid
 
+from dq0.sdk.estimators.data_handler.tabular import DEFAULT_PIPELINE_FIT_ROWS
 from dq0.sdk.estimators.data_handler.utils import data_handler_factory
 from dq0.sdk.projects import Project
 
@@ -51,3 +52,68 @@ class Estimator(Project):
             return self.model.fit(X, **kwargs)
         else:
             return self.model.fit(X, y, **kwargs)
+
+    def fit_stream(self, batches=None, classes=None, epochs=1, data_handler_instance='CSV', pipeline_steps=None, pipeline_config_path=None,
+                   transformers_root_dir='.', pipeline_fit_rows=DEFAULT_PIPELINE_FIT_ROWS, **kwargs):
+        """Incremental fit method using the partial_fit of the model.
+
+        Only one batch is held in memory. Models without partial_fit raise a
+        ValueError, use setup_data and fit for them. A pipeline of the data
+        handler is fitted before on a bounded random sample drawn in an
+        explicit pass over the data source, see fit_pipeline of the data handler.
+
+        Params:
+            batches: iterable of (X, y) batches. Must be re-iterable for more than one epoch.
+                Defaults to the train split of the attached data source streamed by the data handler.
+            classes: all target classes, required by the first partial_fit of classifiers.
+                Defaults to the distinct target values of the attached data source after the pipeline.
+            epochs: number of passes over the batches; default is 1
+            data_handler_instane: string: as defined in dq0.sdk.estimators.data_handler_utils; default is CSV
+            pipeline_fit_rows: rows of the random sample to fit the pipeline on; default is DEFAULT_PIPELINE_FIT_ROWS.
+                None fits on all rows, which reads the whole data source into memory
+            **kwargs: keyword arguments of the data handler's iter_batches, e.g. batch_rows and split
+        """
+        if self.model is None or not hasattr(self.model, 'partial_fit'):
+            raise ValueError(f"{type(self).__name__} cannot learn incrementally, its model {type(self.model).__name__} has no partial_fit. "
+                             "Use setup_data and fit instead.")
+        is_classifier = getattr(self.model, '_estimator_type', None) == 'classifier'
+
+        if batches is None:
+            batches = self._get_stream_batches(data_handler_instance, pipeline_steps, pipeline_config_path, transformers_root_dir, pipeline_fit_rows, kwargs)
+            if is_classifier and classes is None:
+                classes = self.data_handler.get_classes(self.data_source)
+        elif epochs > 1 and iter(batches) is batches:
+            raise ValueError('batches is an iterator and cannot be iterated for more than one epoch')
+        if is_classifier and classes is None:
+            raise ValueError(f"{type(self).__name__} is a classifier and needs all target classes for the first partial_fit")
+
+        fit_params = {'classes': classes} if is_classifier else {}
+        for _ in range(epochs):
+            for X, y in batches:
+                self.model.partial_fit(X, y, **fit_params)
+        return self.model
+
+    def _get_stream_batches(self, data_handler_instance, pipeline_steps, pipeline_config_path, transformers_root_dir, pipeline_fit_rows, kwargs):
+        """Batches of the attached data source, the pipeline is fitted before"""
+        if self.data_source is None:
+            raise ValueError('fit_stream needs batches or an attached data source')
+        self.data_handler = data_handler_factory(data_handler_instance, pipeline_steps=pipeline_steps, pipeline_config_path=pipeline_config_path,
+                                                 transformers_root_dir=transformers_root_dir)
+        if not hasattr(self.data_handler, 'iter_batches'):
+            raise ValueError(f"data handler {data_handler_instance} cannot stream the data source")
+        if self.data_handler.pipeline is not None:
+            self.data_handler.fit_pipeline(self.data_source, n_rows=pipeline_fit_rows, seed=kwargs.get('seed'))
+        kwargs.setdefault('split', 'train')
+        return _BatchIterable(self.data_handler, self.data_source, kwargs)
+
+
+class _BatchIterable:
+    """Re-iterable batches of a data handler"""
+
+    def __init__(self, data_handler, data_source, kwargs):
+        self.data_handler = data_handler
+        self.data_source = data_source
+        self.kwargs = kwargs
+
+    def __iter__(self):
+        return self.data_handler.iter_batches(self.data_source, **self.kwargs)
@@ -80,3 +80,33 @@ class ElasticNet(RegressorMixin, Estimator):
         self.model = linear_model.ElasticNet(alpha=alpha, l1_ratio=l1_ratio, fit_intercept=fit_intercept, normalize=normalize, precompute=precompute,
                                              max_iter=max_iter, copy_X=copy_X, tol=tol, warm_start=warm_start, positive=positive, random_state=random_state,
                                              selection=selection)
+
+
+class SGDClassifier(ClassifierMixin, Estimator):
+    """Sklearn SGDClassifier, supports fit_stream"""
+
+    def __init__(self, loss='hinge', *, penalty='l2', alpha=0.0001, l1_ratio=0.15, fit_intercept=True, max_iter=1000, tol=0.001, shuffle=True, verbose=0,
+                 epsilon=0.1, n_jobs=None, random_state=None, learning_rate='optimal', eta0=0.0, power_t=0.5, early_stopping=False,
+                 validation_fraction=0.1, n_iter_no_change=5, class_weight=None, warm_start=False, average=False, **kwargs):
+        super().__init__(**kwargs)
+        self.model_type = 'LinearModelEstimatorClassifier'
+        self.model = linear_model.SGDClassifier(loss=loss, penalty=penalty, alpha=alpha, l1_ratio=l1_ratio, fit_intercept=fit_intercept, max_iter=max_iter,
+                                                tol=tol, shuffle=shuffle, verbose=verbose, epsilon=epsilon, n_jobs=n_jobs, random_state=random_state,
+                                                learning_rate=learning_rate, eta0=eta0, power_t=power_t, early_stopping=early_stopping,
+                                                validation_fraction=validation_fraction, n_iter_no_change=n_iter_no_change, class_weight=class_weight,
+                                                warm_start=warm_start, average=average)
+
+
+class SGDRegressor(RegressorMixin, Estimator):
+    """Sklearn SGDRegressor, supports fit_stream"""
+
+    def __init__(self, loss='squared_loss', *, penalty='l2', alpha=0.0001, l1_ratio=0.15, fit_intercept=True, max_iter=1000, tol=0.001, shuffle=True,
+                 verbose=0, epsilon=0.1, random_state=None, learning_rate='invscaling', eta0=0.01, power_t=0.25, early_stopping=False,
+                 validation_fraction=0.1, n_iter_no_change=5, warm_start=False, average=False, **kwargs):
+        super().__init__(**kwargs)
+        self.model_type = 'LinearModelEstimatorRegressor'
+        self.model = linear_model.SGDRegressor(loss=loss, penalty=penalty, alpha=alpha, l1_ratio=l1_ratio, fit_intercept=fit_intercept, max_iter=max_iter,
+                                               tol=tol, shuffle=shuffle, verbose=verbose, epsilon=epsilon, random_state=random_state,
+                                               learning_rate=learning_rate, eta0=eta0, power_t=power_t, early_stopping=early_stopping,
+                                               validation_fraction=validation_fraction, n_iter_no_change=n_iter_no_change, warm_start=warm_start,
+                                               average=average)
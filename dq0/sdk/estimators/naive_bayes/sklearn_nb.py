@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+""" Sklearn naive Bayes models. All of them support fit_stream.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import logging
+
+from dq0.sdk.estimators.base_mixin import ClassifierMixin
+from dq0.sdk.estimators.estimator import Estimator
+
+from sklearn import naive_bayes
+
+logger = logging.getLogger(__name__)
+
+
+class GaussianNB(ClassifierMixin, Estimator):
+    """Sklearn GaussianNB"""
+
+    def __init__(self, *, priors=None, var_smoothing=1e-09, **kwargs):
+        super().__init__(**kwargs)
+        self.model_type = 'NaiveBayesEstimatorClassifier'
+        self.model = naive_bayes.GaussianNB(priors=priors, var_smoothing=var_smoothing)
+
+
+class MultinomialNB(ClassifierMixin, Estimator):
+    """Sklearn MultinomialNB"""
+
+    def __init__(self, *, alpha=1.0, fit_prior=True, class_prior=None, **kwargs):
+        super().__init__(**kwargs)
+        self.model_type = 'NaiveBayesEstimatorClassifier'
+        self.model = naive_bayes.MultinomialNB(alpha=alpha, fit_prior=fit_prior, class_prior=class_prior)
+
+
+class BernoulliNB(ClassifierMixin, Estimator):
+    """Sklearn BernoulliNB"""
+
+    def __init__(self, *, alpha=1.0, binarize=0.0, fit_prior=True, class_prior=None, **kwargs):
+        super().__init__(**kwargs)
+        self.model_type = 'NaiveBayesEstimatorClassifier'
+        self.model = naive_bayes.BernoulliNB(alpha=alpha, binarize=binarize, fit_prior=fit_prior, class_prior=class_prior)
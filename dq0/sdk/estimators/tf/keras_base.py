@@ -22,6 +22,9 @@ class NeuralNetworkBase(Estimator):
     """Base TF Network mixin."""
 
     def fit(self, X, y, **kwargs):
+        if isinstance(X, (tf.data.Dataset, tf.keras.utils.Sequence)):
+            # datasets and sequences yield the targets with the features
+            y = None
         self.model.compile(optimizer=self.optimizer,
                            loss=self.loss,
                            metrics=self.metrics)
@@ -41,6 +44,8 @@ class NeuralNetworkBase(Estimator):
         self.input_dim = self.data_handler.get_input_dim(self.X_train)
         self.out_shape = self.data_handler.get_output_dim(self.y_train)
 
+        return self.X_train, self.X_test, self.y_train, self.y_test
+
 
 class NN_Classifier(NeuralNetworkBase):
     """Keras neural network classification models with one hot encoded targets."""
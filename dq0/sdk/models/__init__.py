@@ -3,9 +3,13 @@
 
 This package contains the model abstract classes and
 implementing subclasses.
+
+The subpackages are imported on first access (PEP 562), so importing this
+package does not import tensorflow.
 """
 
-from . import bayes, tf, user
+import importlib
+
 from .model import Model
 
 __all__ = [
@@ -14,3 +18,15 @@ __all__ = [
     'user',
     'Model'
 ]
+
+_lazy_submodules = ['bayes', 'tf', 'user']
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Column-wise execution of pipeline steps
+
+The steps of a pipeline are compiled into a dependency graph over the
+columns they read and write. Steps touching disjoint columns do not depend
+on each other and run concurrently with joblib, every step gets only its
+input columns and the result DataFrame is assembled once after the last
+step.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import logging
+
+from joblib import Parallel, delayed
+
+import numpy as np
+
+import pandas as pd
+
+import scipy.sparse
+
+logger = logging.getLogger(__name__)
+
+
+def get_input_col(step):
+    """Input columns of a step, None if it reads and replaces all columns"""
+    input_col = getattr(step, 'input_col', None)
+    if input_col is None:
+        return None
+    if isinstance(input_col, (list, tuple, pd.Index)):
+        return list(input_col)
+    return [input_col]
+
+
+def get_step_levels(steps, columns):
+    """Groups the steps into levels of independent steps.
+
+    A step depends on an earlier step if one of them has no input_col, if
+    their input columns overlap or if it reads columns that are not in
+    columns, e.g. columns generated by a 1 to N transformer.
+
+    Args:
+        steps: list of (name, transformer) tuples.
+        columns: columns of the input DataFrame.
+
+    Returns:
+        list of levels, each a list of step indexes in pipeline order. The
+        steps of a level only depend on steps of earlier levels.
+    """
+    columns = set(columns)
+    input_cols = [get_input_col(step) for _, step in steps]
+    step_levels = []
+    for j, cols_j in enumerate(input_cols):
+        level = 0
+        for k in range(j):
+            if _depends(cols_j, input_cols[k], columns):
+                level = max(level, step_levels[k] + 1)
+        step_levels.append(level)
+
+    levels = [[] for _ in range(max(step_levels, default=-1) + 1)]
+    for j, level in enumerate(step_levels):
+        levels[level].append(j)
+    return levels
+
+
+def _depends(cols_j, cols_k, columns):
+    if cols_j is None or cols_k is None:
+        return True
+    cols_j = set(cols_j)
+    return not cols_j <= columns or not cols_j.isdisjoint(cols_k)
+
+
+def run_steps(steps, X, y=None, fit=False, n_jobs=None, prefer='threads'):
+    """Runs the steps on the DataFrame X level by level.
+
+    Steps with input_col replace their input columns by their results,
+    results with other column names are appended like the sequential
+    fit_transform of a 1 to N transformer does. X is not modified.
+
+    Args:
+        steps: list of (name, transformer) tuples.
+        X: pandas DataFrame with unique column names.
+        y: target passed to the fit of the steps.
+        fit: True to fit the steps. Defaults to False.
+        n_jobs: number of parallel jobs, -1 for all CPUs. Defaults to None (sequential).
+        prefer: joblib backend preference, 'threads' or 'processes'. Defaults to 'threads'.
+
+    Returns:
+        the list of (name, transformer) tuples, fitted if fit is True, and the transformed DataFrame
+    """
+    steps = list(steps)
+    state = {c: X[c] for c in X.columns}
+    # input and result columns of every step to restore the sequential column order
+    step_cols = [None] * len(steps)
+    for level in get_step_levels(steps, X.columns):
+        cols = [get_input_col(steps[j][1]) or list(state) for j in level]
+        args = [(steps[j][1], _input_frame(state, steps[j][0], cols_j, X.index), y, fit) for j, cols_j in zip(level, cols)]
+        if n_jobs is None or n_jobs == 1 or len(level) == 1:
+            results = [_run_step(*a) for a in args]
+        else:
+            results = Parallel(n_jobs=n_jobs, prefer=prefer)(delayed(_run_step)(*a) for a in args)
+        for j, cols_j, (step, X_t) in zip(level, cols, results):
+            steps[j] = (steps[j][0], step)
+            step_cols[j] = (cols_j, _update_state(state, steps[j][0], cols_j, X_t, X.index))
+        logger.debug(f"pipeline steps {[steps[j][0] for j in level]} done")
+
+    if not state:
+        return steps, pd.DataFrame(index=X.index)
+    return steps, pd.concat([state[c] for c in get_sequential_order(X.columns, step_cols)], axis=1)
+
+
+def get_sequential_order(columns, step_cols):
+    """Column order of the sequential run of the steps.
+
+    Steps keeping their column names keep the column positions, the result
+    columns of all other steps replace their input columns at the end, so
+    appended columns are ordered by pipeline order and not by level.
+
+    Args:
+        columns: columns of the input DataFrame.
+        step_cols: list of (input columns, result columns) tuples in pipeline order.
+
+    Returns:
+        list of the result columns
+    """
+    order = list(columns)
+    for cols, result_cols in step_cols:
+        if result_cols == cols:
+            continue
+        removed = set(cols)
+        order = [c for c in order if c not in removed] + result_cols
+    return order
+
+
+def _run_step(step, X, y, fit):
+    if fit:
+        return step, step.fit_transform(X, y)
+    return step, step.transform(X)
+
+
+def _input_frame(state, name, cols, index):
+    missing = [c for c in cols if c not in state]
+    if missing:
+        raise ValueError(f"pipeline step '{name}' needs the columns {missing}, available are {list(state)}")
+    if not cols:
+        return pd.DataFrame(index=index)
+    return pd.concat([state[c] for c in cols], axis=1)
+
+
+def _update_state(state, name, cols, X_t, index):
+    """Replaces the input columns of a step by its result columns and returns the result column names"""
+    X_t = _to_frame(name, X_t, cols, index)
+    if list(X_t.columns) == cols:
+        for c in cols:
+            state[c] = X_t[c]
+        return cols
+    for c in cols:
+        del state[c]
+    duplicates = [c for c in X_t.columns if c in state]
+    if duplicates or not X_t.columns.is_unique:
+        raise ValueError(f"pipeline step '{name}' returned columns that already exist: {duplicates or list(X_t.columns)}")
+    for c in X_t.columns:
+        state[c] = X_t[c]
+    return list(X_t.columns)
+
+
+def _to_frame(name, X_t, cols, index):
+    """Results without column names keep the names of the input columns"""
+    if X_t.shape[0] != len(index):
+        raise ValueError(f"pipeline step '{name}' returned {X_t.shape[0]} rows for {len(index)} input rows")
+    if isinstance(X_t, pd.DataFrame):
+        return X_t if X_t.index.equals(index) else X_t.set_axis(index, axis=0)
+    if not scipy.sparse.issparse(X_t):
+        X_t = np.asarray(X_t).reshape(len(index), -1)
+    if X_t.shape[1] != len(cols):
+        raise ValueError(f"pipeline step '{name}' returned {X_t.shape[1]} columns without names for its {len(cols)} input columns")
+    if scipy.sparse.issparse(X_t):
+        return pd.DataFrame.sparse.from_spmatrix(X_t, index=index, columns=cols)
+    return pd.DataFrame(X_t, index=index, columns=cols, copy=False)
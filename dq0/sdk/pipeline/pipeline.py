@@ -1,39 +1,69 @@
 # -*- coding: utf-8 -*-
 """
+Pipelines set up from a config run column-wise: the steps are compiled into
+a dependency graph over their input_col, steps on disjoint columns run
+concurrently if n_jobs is given and each step gets only its input columns.
+
+Fitted pipelines are saved with joblib together with a format version and
+the dq0-sdk and scikit-learn versions. Uncompressed files are loaded with
+memory-mapped numpy arrays, so inference loads the fitted transformers
+without refitting and without copying their state. The source code of
+custom transformer files is stored with the pipeline, so the file can be
+loaded on other machines. Loading a pipeline executes code, only load
+files from trusted sources.
+
 Copyright 2021, Gradient Zero
 All rights reserved
 """
 
 import logging
+import os
+import sys
 
+import dq0.sdk
 from dq0.sdk.errors.errors import fatal_error
-from dq0.sdk.pipeline import pipeline_config
+from dq0.sdk.pipeline import dag, pipeline_config
+from dq0.sdk.pipeline.transformer.transformer import ScratchBlocks, Transformer_1_to_1
+
+import joblib
 
 import pandas as pd
 
+import scipy.sparse
+
+import sklearn
 from sklearn import pipeline
 
 logger = logging.getLogger(__name__)
 
+# version of the saved pipeline format, increase on incompatible changes
+FORMAT_VERSION = 2
+
 
 class Pipeline():
 
-    def __init__(self, steps=None, config_path=None, transformers_root_dir='.', **kwargs):
+    def __init__(self, steps=None, config_path=None, transformers_root_dir='.', n_jobs=None, prefer='threads', **kwargs):
         """
         Initialize with steps directly (standalone mode) or with config file. Both can not be given.
         params:
             steps: List of (name, transform) tuples (implementing fit/transform) that are chained, in the order in which they are chained.
             config_path: path to config file where the pipelien steps are given.
+            n_jobs: number of steps of a config pipeline that run in parallel, -1 for all CPUs. Defaults to None (sequential).
+            prefer: joblib backend preference, 'threads' or 'processes'. Defaults to 'threads'.
         """
+        self.n_jobs = n_jobs
+        self.prefer = prefer
         # using steps as input (stand alone)
         if (steps is not None) and (config_path is None):
             self.pipeline = pipeline.Pipeline(steps)
+            self.column_wise = False
         # using config path
         elif (steps is None) and (config_path is not None):
             pp_config = pipeline_config.PipelineConfig(config_path=config_path)
             steps = pp_config.get_steps_from_config(root_dir=transformers_root_dir)
             self.steps_input_cols = pp_config.get_input_columns_per_step()  # use for checks later
             self.pipeline = pipeline.Pipeline(steps)
+            self.column_wise = True
         else:
             fatal_error("Both steps and config_path are given. Only one should be given.")
 
@@ -42,18 +72,149 @@ class Pipeline():
             self.col_names = X.columns
         else:
             self.col_names = None
-        self.pipeline = self.pipeline.fit(X=X, y=y, **fit_params)
+        if self._is_column_wise(X, fit_params):
+            self._run_column_wise(X, y, fit=True)
+        else:
+            self.pipeline = self.pipeline.fit(X=X, y=y, **fit_params)
+        return self
 
     def fit_transform(self, X, y=None, **fit_params):
         if hasattr(X, 'columns'):
             self.col_names = X.columns
         else:
             self.col_names = None
-        X_t = self.pipeline.fit_transform(X=X, y=y, **fit_params)
-        if self.col_names is not None:
-            X_t = pd.DataFrame(X_t, columns=self.col_names)
+        if self._is_column_wise(X, fit_params):
+            return self._run_column_wise(X, y, fit=True)
+        if fit_params:
+            X_t = self.pipeline.fit_transform(X=X, y=y, **fit_params)
+        else:
+            X_t = self._run_sequential(X, y, fit=True)
+        return self._to_frame(X_t, X)
+
+    def transform(self, X):
+        """Transform X with the fitted pipeline, e.g. batch by batch after fitting on a sample"""
+        self._check_fitted()
+        if self._is_column_wise(X):
+            return self._run_column_wise(X)
+        X_t = self._run_sequential(X)
+        return self._to_frame(X_t, X)
 
+    def _run_sequential(self, X, y=None, fit=False):
+        """Runs the steps one after the other.
+
+        The Transformer_1_to_1 steps share the float blocks allocated during
+        this call and update them in place, the blocks of earlier calls are
+        never reused.
+        """
+        scratch = ScratchBlocks()
+        for _, step in self.pipeline.steps:
+            if step is None or step == 'passthrough':
+                continue
+            if isinstance(step, Transformer_1_to_1):
+                X = step.fit_transform(X, y, scratch=scratch) if fit else step.transform(X, scratch=scratch)
+            else:
+                X = step.fit_transform(X, y) if fit else step.transform(X)
+        return X
+
+    def _is_column_wise(self, X, fit_params=None):
+        """Config pipelines run column-wise on DataFrames, fit params are only supported by the sequential pipeline"""
+        return getattr(self, 'column_wise', False) and isinstance(X, pd.DataFrame) and X.columns.is_unique and not fit_params
+
+    def _run_column_wise(self, X, y=None, fit=False):
+        steps, X_t = dag.run_steps(self.pipeline.steps, X, y=y, fit=fit, n_jobs=getattr(self, 'n_jobs', None),
+                                   prefer=getattr(self, 'prefer', 'threads'))
+        # fitted copies of the steps are returned by the processes backend
+        self.pipeline.steps = steps
         return X_t
 
+    def _to_frame(self, X_t, X):
+        """Wraps array and sparse matrix results of DataFrame inputs, DataFrame results are returned as they are"""
+        if self.col_names is None or isinstance(X_t, pd.DataFrame):
+            return X_t
+        index = X.index if len(X.index) == X_t.shape[0] else None
+        if scipy.sparse.issparse(X_t):
+            return pd.DataFrame.sparse.from_spmatrix(X_t, index=index, columns=self.col_names)
+        return pd.DataFrame(X_t, columns=self.col_names, index=index, copy=False)
+
     def get_params(self, deep=True):
         return self.pipeline.get_params(deep=deep)
+
+    def save(self, path, compress=0):
+        """Saves the fitted pipeline.
+
+        Args:
+            path: file path.
+            compress: joblib compression level 0-9. Compressed files cannot be memory-mapped on load.
+                Defaults to 0.
+        """
+        self._check_fitted()
+        state = {
+            'format_version': FORMAT_VERSION,
+            'dq0_sdk_version': dq0.sdk.version,
+            'sklearn_version': sklearn.__version__,
+            # unpickled before the pipeline to import the transformer code of the steps
+            'transformer_modules': _TransformerModules(self._get_transformer_modules()),
+            'pipeline': self,
+        }
+        # replace the file at once, pipelines loaded from it may still memory-map the old file
+        tmp_path = f"{path}.tmp"
+        try:
+            joblib.dump(state, tmp_path, compress=compress)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def load(path, mmap_mode='r'):
+        """Loads a fitted pipeline saved with save.
+
+        Loading unpickles the file and executes the source code of the custom
+        transformer files stored in it. Only load files from trusted sources.
+
+        Args:
+            path: file path.
+            mmap_mode: numpy memory-map mode of the fitted arrays, None to load them into memory.
+                Defaults to 'r', the fitted state is read-only then.
+
+        Returns:
+            the fitted Pipeline
+        """
+        state = joblib.load(path, mmap_mode=mmap_mode)
+        if not isinstance(state, dict) or 'format_version' not in state or not isinstance(state.get('pipeline'), Pipeline):
+            raise ValueError(f"{path} is not a saved dq0 pipeline")
+        if state['format_version'] > FORMAT_VERSION:
+            raise ValueError(f"{path} has pipeline format version {state['format_version']}, this dq0-sdk {dq0.sdk.version} reads up to "
+                             f"version {FORMAT_VERSION}. Please update dq0-sdk.")
+        if state['sklearn_version'] != sklearn.__version__:
+            logger.warning(f"{path} was saved with scikit-learn {state['sklearn_version']}, loading it with {sklearn.__version__}")
+        return state['pipeline']
+
+    def _get_transformer_modules(self):
+        """Module names and source code of the transformer files the steps were loaded from"""
+        modules = {}
+        for _, step in self.pipeline.steps:
+            module_name = type(step).__module__
+            if module_name.startswith(pipeline_config.MODULE_PREFIX) and module_name not in modules:
+                modules[module_name] = pipeline_config.get_transformer_source(sys.modules[module_name])
+        return modules
+
+    def _check_fitted(self):
+        if not hasattr(self, 'col_names'):
+            raise ValueError('Pipeline is not fitted. Call fit or fit_transform first.')
+
+
+class _TransformerModules:
+    """Imports the transformer source code when unpickled"""
+
+    def __init__(self, modules):
+        self.modules = modules
+
+    def __reduce__(self):
+        return (_load_transformer_modules, (self.modules,))
+
+
+def _load_transformer_modules(modules):
+    for name, source in modules.items():
+        pipeline_config.load_transformer_source(source, name)
+    return _TransformerModules(modules)
@@ -4,14 +4,111 @@ Copyright 2021, Gradient Zero
 All rights reserved
 """
 
+import hashlib
 import importlib
 import logging
 import os
+import sys
+import types
 
 import yaml
 
 logger = logging.getLogger(__name__)
 
+# prefix of the module names of transformer files
+MODULE_PREFIX = 'dq0_pipeline_transformers_'
+
+BUILTIN_MODULE = 'dq0.sdk.pipeline.transformer.transformer'
+
+# built-in transformers, resolved by class name without executing a transformer file
+transformer_classes = {name: f'{BUILTIN_MODULE}:{name}' for name in [
+    'Binarizer',
+    'ColumnSelector',
+    'FunctionTransformer',
+    'KBinsDiscretizer',
+    'KernelCenterer',
+    'LabelBinarizer',
+    'LabelEncoder',
+    'MaxAbsScaler',
+    'MinMaxScaler',
+    'MultiLabelBinarizer',
+    'Normalizer',
+    'OneHotEncoder',
+    'OrdinalEncoder',
+    'PolynomialFeatures',
+    'PowerTransformer',
+    'QuantileTransformer',
+    'RobustScaler',
+    'StandardScaler',
+]}
+
+
+def load_transformer_module(path, name=None):
+    """Imports a transformer file once.
+
+    The module is registered in sys.modules under a name derived from the
+    resolved path, so every pipeline using the file shares one module and the
+    transformers of fitted pipelines can be pickled.
+
+    Args:
+        path: path of the python file.
+        name: module name. Defaults to the name derived from the path.
+
+    Returns:
+        the module
+    """
+    if name is None:
+        name = MODULE_PREFIX + hashlib.sha1(os.path.realpath(path).encode()).hexdigest()[:16]
+    module = sys.modules.get(name)
+    if module is None:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Could not find transformer file {path}")
+        spec = importlib.util.spec_from_file_location(name=name, location=path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            del sys.modules[name]
+            raise
+    return module
+
+
+def load_transformer_source(source, name):
+    """Imports the source code of a transformer file saved with a pipeline.
+
+    The module is registered in sys.modules under its saved name, a module
+    of this name that is already imported is used as it is.
+
+    Args:
+        source: python source code.
+        name: module name.
+
+    Returns:
+        the module
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        module = types.ModuleType(name)
+        # there is no file to read the source from when saved again
+        module.__source__ = source
+        sys.modules[name] = module
+        try:
+            exec(compile(source, f"<saved transformers {name}>", 'exec'), module.__dict__)
+        except Exception:
+            del sys.modules[name]
+            raise
+    return module
+
+
+def get_transformer_source(module):
+    """Returns the source code of a module loaded with load_transformer_module or load_transformer_source"""
+    source = getattr(module, '__source__', None)
+    if source is None:
+        with open(module.__file__) as f:
+            source = f.read()
+    return source
+
 
 class PipelineConfig:
     """ Helper class to set up a pipline with a given config yaml.
@@ -56,31 +153,75 @@ class PipelineConfig:
                 steps_input_cols.append(pipeline_config_step[key]['input_col'])
         return steps_input_cols
 
-    def get_steps_from_config(self, root_dir='./dq0/sdk/pipeline/transformer/transformer.py'):
-        """Goes though the list pipeline of the config and sets ups the setps list of tuples to initialize the pipeline with."""
-        pipeline_config = self.config['pipeline']
+    def get_steps_from_config(self, root_dir=None):
+        """Goes though the list pipeline of the config and sets ups the setps list of tuples to initialize the pipeline with.
+
+        Args:
+            root_dir: path of a python file with custom transformers. Classes not defined there
+                are looked up in the built-in transformers. Defaults to the built-in transformers only.
+
+        Raises:
+            ValueError: if a step is malformed or its transformer cannot be created. The message names the step.
+        """
+        pipeline_config = self.config.get('pipeline') if isinstance(self.config, dict) else None
+        if not isinstance(pipeline_config, list):
+            raise ValueError("pipeline config needs a 'pipeline' list of steps")
+        module = get_transformer_module(root_dir)
         self.steps = []
         for pipeline_config_step in pipeline_config:
-            print('pipeline_config_step', pipeline_config_step)
-            key = list(pipeline_config_step.keys())[0]
-            target_class = pipeline_config_step[key]['class']
-            params = pipeline_config_step[key]
-            # Try loading the class given the name in the pipeline and initialize with the params
+            if not isinstance(pipeline_config_step, dict) or len(pipeline_config_step) != 1:
+                raise ValueError(f"pipeline step {pipeline_config_step} must map one unique name to its params")
+            key, params = next(iter(pipeline_config_step.items()))
+            if not isinstance(params, dict) or 'class' not in params:
+                raise ValueError(f"pipeline step '{key}' has no transformer class")
+            params = dict(params)
+            target_class = params.pop('class')
+            transformer_class = get_transformer_class(target_class, module)
+            if transformer_class is None:
+                raise ValueError(f"pipeline step '{key}': unknown transformer class {target_class}. "
+                                 f"Built-in transformers are {sorted(transformer_classes)}")
             try:
-                spec = importlib.util.spec_from_file_location(name=target_class,
-                                                              location=root_dir)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                trans = getattr(module, target_class)(**params)
-                if trans is None:
-                    raise Exception(f"The transformer {target_class} couldn't be loaded")
-
-                else:
-                    self.steps.append((key, trans))
-
+                trans = transformer_class(**params)
             except Exception as e:
-                print(f'{e}')
-                pass
+                raise ValueError(f"pipeline step '{key}': could not create {target_class} with params {params}: {e}") from e
+            logger.debug(f"pipeline step {key}: {trans}")
+            self.steps.append((key, trans))
 
         logger.info(f"loaded tranformers: {self.steps}")
         return self.steps
+
+
+def get_transformer_module(root_dir):
+    """Returns the module of a custom transformer file.
+
+    Args:
+        root_dir: path of the python file. None, a directory or the file of the built-in transformers
+            select the built-in transformers, which are imported as a package module.
+
+    Returns:
+        the module, or None for the built-in transformers
+    """
+    if root_dir is None or os.path.isdir(root_dir):
+        return None
+    builtin_path = importlib.util.find_spec(BUILTIN_MODULE).origin
+    if os.path.isfile(root_dir) and os.path.samefile(root_dir, builtin_path):
+        return None
+    return load_transformer_module(root_dir)
+
+
+def get_transformer_class(name, module=None):
+    """Resolves a transformer class by name.
+
+    Args:
+        name: class name.
+        module: module of a custom transformer file, searched before the built-in transformers.
+
+    Returns:
+        the class, or None if it is unknown
+    """
+    if module is not None and isinstance(getattr(module, name, None), type):
+        return getattr(module, name)
+    if name not in transformer_classes:
+        return None
+    module_name, _, class_name = transformer_classes[name].partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
@@ -7,10 +7,13 @@ All rights reserved
 """
 
 import logging
+import weakref
 from abc import ABC, abstractmethod
 
 from dq0.sdk.errors.errors import fatal_error
 
+from joblib import Parallel, delayed
+
 import numpy as np
 
 import pandas as pd
@@ -45,56 +48,109 @@ class Transformer(ABC):
 
 
 class Transformer_1_to_1(ABC):
-    """Standart transformer with 1 to 1 column mappings"""
+    """Standart transformer with 1 to 1 column mappings
+
+    Numeric pandas columns are copied into a float block that the sklearn
+    transformer updates in place (its copy param is disabled during
+    transform). Within one Pipeline call the blocks are tracked by a
+    ScratchBlocks passed from step to step, so the next Transformer_1_to_1
+    reuses them without a copy and a chain of scalers keeps one copy of the
+    data. Without scratch blocks nothing is updated in place, results
+    returned to the caller are never modified by later transforms. Without
+    input_col the input DataFrame is not modified.
+
+    With keep_sparse sparse results are not densified: DataFrames get
+    pandas sparse columns and numpy inputs scipy sparse matrices. DataFrames
+    of sparse columns are passed to the sklearn transformer as CSR matrix.
+
+    Args:
+        input_col: list of columns to transform. Defaults to all columns.
+        keep_sparse: True to keep sparse results sparse. Defaults to False.
+    """
 
-    def __init__(self, input_col=None, **kwargs):
+    def __init__(self, input_col=None, keep_sparse=False, **kwargs):
         self.transformer = None
         self.col_names = None
         self.input_col = input_col
+        self.keep_sparse = keep_sparse
 
     def fit(self, X, y=None):
         # If input_col is given only those will be processed.
         # keep pandas column names after transformation
         if self.input_col is not None:
-            self.transformer = self.transformer.fit(X[self.input_col])
-        else:
-            self.transformer = self.transformer.fit(X)
+            X = X[self.input_col]
+        if hasattr(X, 'columns') and self.keep_sparse and has_sparse_columns(X):
+            X = to_sparse_matrix(X)
+        elif hasattr(X, 'columns') and _is_numeric(X):
+            # fitted on the values like they are transformed
+            X = X.to_numpy()
+        self.transformer = self.transformer.fit(X)
         return self
 
-    def fit_transform(self, X, y=None):
+    def fit_transform(self, X, y=None, scratch=None):
         self.fit(X, y)
-        return self.transform(X)
+        return self.transform(X, scratch=scratch)
 
-    def transform(self, X):
+    def transform(self, X, scratch=None):
+        """Transforms X.
+
+        Args:
+            X: pandas DataFrame or numpy array.
+            scratch: ScratchBlocks of the running pipeline call, blocks in it are updated in place.
+                Defaults to None (the result is a new block).
+        """
         if hasattr(X, 'columns'):
             self.col_names = X.columns
         else:
             self.col_names = None
         # case ColumnTransformer
         if self.input_col is not None:
-            X_t = self.transformer.transform(X[self.input_col])
-            # check and convert sparse encoding arrays
-            if isinstance(X_t, scipy.sparse.csr.csr_matrix):
-                X_t = X_t.toarray()
+            X_t = self._transform_frame(X[self.input_col], scratch)
             # some transformers return flat shapes
             if X_t.ndim == 1:
                 X_t = X_t.reshape(-1, 1)
-            X[self.input_col] = X_t
+            X[self.input_col] = _to_frame(X_t, self.input_col, X.index)
 
         elif self.col_names is not None:
-            X_t = self.transformer.transform(X)
-            # check and convert sparse encoding arrays
-            if isinstance(X_t, scipy.sparse.csr.csr_matrix):
-                X_t = X_t.toarray()
-            X = pd.DataFrame(X_t, columns=self.col_names)
+            X_t = self._transform_frame(X, scratch)
+            X = _to_frame(X_t, self.col_names, X.index)
         else:  # numpy array
             X_t = self.transformer.transform(X)
             # check and convert sparse encoding arrays
-            if isinstance(X_t, scipy.sparse.csr.csr_matrix):
+            if scipy.sparse.issparse(X_t) and not self.keep_sparse:
                 X_t = X_t.toarray()
             X = X_t
         return X
 
+    def _transform_frame(self, X, scratch):
+        """Transforms a DataFrame, numeric columns in place of a float block of the scratch blocks or a new copy"""
+        if self.keep_sparse and has_sparse_columns(X):
+            X_t = self.transformer.transform(to_sparse_matrix(X))
+        elif not _is_numeric(X):
+            X_t = self.transformer.transform(X)
+        else:
+            values = X.to_numpy()
+            if values.dtype != np.float64 or scratch is None or values not in scratch:
+                values = X.to_numpy(dtype=np.float64, copy=True)
+            X_t = self._transform_inplace(values)
+            if scratch is not None and isinstance(X_t, np.ndarray) and X_t.dtype == np.float64:
+                scratch.add(X_t)
+        # check and convert sparse encoding arrays
+        if scipy.sparse.issparse(X_t) and not self.keep_sparse:
+            X_t = X_t.toarray()
+        return X_t
+
+    def _transform_inplace(self, values):
+        """Calls the transform of the sklearn transformer with copy disabled"""
+        params = self.transformer.get_params(deep=False)
+        if not params.get('copy', False):
+            return self.transformer.transform(values)
+        self.transformer.set_params(copy=False)
+        try:
+            return self.transformer.transform(values)
+        finally:
+            self.transformer.set_params(copy=True)
+
     def _update_X_pandas(X, X_t, input_col):
         """Takes the input pd.DataFrame and updates the input columns of the DataFrame with the
         new values after the transformation. If the mapping of the columns (X_t) are not 1:1 the
@@ -103,12 +159,76 @@ class Transformer_1_to_1(ABC):
         pass
 
 
+class ScratchBlocks:
+    """Float blocks allocated during one pipeline call.
+
+    Transformer_1_to_1 steps update these blocks in place. A new instance is
+    used for every call, so blocks returned to the caller are not reused.
+    """
+
+    def __init__(self):
+        # by id of the base array
+        self._blocks = weakref.WeakValueDictionary()
+
+    def add(self, values):
+        base = _get_base(values)
+        self._blocks[id(base)] = base
+
+    def __contains__(self, values):
+        base = _get_base(values)
+        return self._blocks.get(id(base)) is base
+
+
+def has_sparse_columns(X):
+    """True if the DataFrame X has pandas sparse columns"""
+    return any(isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes)
+
+
+def to_sparse_matrix(X):
+    """Returns the DataFrame X as scipy CSR matrix without densifying its sparse columns"""
+    if not all(isinstance(dtype, pd.SparseDtype) and dtype.fill_value == 0 for dtype in X.dtypes):
+        X = X.astype(pd.SparseDtype(np.result_type(*[getattr(dtype, 'subtype', dtype) for dtype in X.dtypes]), 0))
+    return X.sparse.to_coo().tocsr()
+
+
+def _to_frame(X_t, columns, index):
+    if scipy.sparse.issparse(X_t):
+        return pd.DataFrame.sparse.from_spmatrix(X_t, index=index, columns=columns)
+    return pd.DataFrame(X_t, columns=columns, index=index, copy=False)
+
+
+def _is_numeric(X):
+    return len(X.columns) > 0 and all(pd.api.types.is_numeric_dtype(dtype) for dtype in X.dtypes)
+
+
+def _get_base(values):
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+    return values
+
+
 class Transformer_1_to_N(Transformer):
     """Transformer with 1 to N column mappings (e.g. One-Hot-Encoding).
     The mapping if performed column wise so the N new columns can be named an track accordingly.
     A many to many mapping is not possible with this type of transformer
+
+    The columns are fitted and transformed in parallel with joblib if n_jobs is given.
+    The transformed columns are written into a single preallocated array.
+
+    Args:
+        input_col: list of columns to transform. Defaults to all columns.
+        n_jobs: number of parallel jobs, -1 for all CPUs. Defaults to None (sequential).
+        prefer: joblib backend preference, 'threads' or 'processes'. Defaults to 'threads'.
+        keep_sparse: True to return pandas sparse columns (scipy sparse matrices for numpy
+            inputs) if a transformer returns sparse results. Defaults to False.
     """
 
+    def __init__(self, input_col=None, n_jobs=None, prefer='threads', keep_sparse=False, **kwargs):
+        super().__init__(input_col=input_col, **kwargs)
+        self.n_jobs = n_jobs
+        self.prefer = prefer
+        self.keep_sparse = keep_sparse
+
     @abstractmethod
     def _get_column_names(self, transformer, c_name):
         """Specific to each transformer mapping. Gets names of the resulting Xt columns."""
@@ -140,18 +260,13 @@ class Transformer_1_to_N(Transformer):
         """
         if type(X) == pd.DataFrame:
 
-            self.transformers_c = []
-            self.column_names_ = []
-
             if self.input_col is not None:
                 col_process = self.input_col
             else:
                 col_process = X.columns
 
-            for c in col_process:
-                transformer = self._setup_transformer()
-                self.transformers_c.append(transformer.fit(X.loc[:, [c]]))
-                self.column_names_.append(self._get_column_names(transformer, c))
+            self.transformers_c = self._parallel(_fit_column, [(self._setup_transformer(), X.loc[:, [c]]) for c in col_process])
+            self.column_names_ = [self._get_column_names(transformer, c) for transformer, c in zip(self.transformers_c, col_process)]
         else:
             transformer = self._setup_transformer()
             self.transformer = transformer.fit(X)
@@ -170,28 +285,71 @@ class Transformer_1_to_N(Transformer):
         """
         if type(X) == pd.DataFrame:
 
-            all_df = []
-
             if self.input_col is not None:
                 col_process = self.input_col
             else:
                 col_process = X.columns
 
-            for i, c in enumerate(col_process):
-                transformer = self.transformers_c[i]
+            transformed_cols = self._parallel(_transform_column, [(transformer, X.loc[:, [c]]) for transformer, c in zip(self.transformers_c, col_process)])
+            if any(transformed_col.shape[0] != len(X) for transformed_col in transformed_cols):
+                # e.g. MultiLabelBinarizer treats a DataFrame as one sample of labels
+                return pd.concat([pd.DataFrame(transformed_col.toarray() if scipy.sparse.issparse(transformed_col) else transformed_col, columns=names)
+                                  for transformed_col, names in zip(transformed_cols, self.column_names_)], axis=1)
 
-                transformed_col = transformer.transform(X.loc[:, [c]])
-                if isinstance(transformed_col, scipy.sparse.csr.csr_matrix):
-                    transformed_col = transformed_col.toarray()
-                df_col = pd.DataFrame(transformed_col, columns=self.column_names_[i])
-                all_df.append(df_col)
-            return pd.concat(all_df, axis=1)
+            columns = [name for names in self.column_names_ for name in names]
+            if self.keep_sparse and any(scipy.sparse.issparse(transformed_col) for transformed_col in transformed_cols):
+                return pd.DataFrame.sparse.from_spmatrix(self._stack_sparse(transformed_cols, len(X)), index=X.index, columns=columns)
+            return pd.DataFrame(self._stack_dense(transformed_cols, len(X)), columns=columns, index=X.index)
         else:
             X_t = self.transformer.transform(X)
-            if isinstance(X_t, scipy.sparse.csr.csr_matrix):
+            if scipy.sparse.issparse(X_t) and not self.keep_sparse:
                 X_t = X_t.toarray()
             return X_t
 
+    def _stack_dense(self, transformed_cols, n_rows):
+        """Writes the transformed columns into one preallocated array"""
+        # column major, so every column block is a contiguous slice
+        dtype = np.result_type(*[transformed_col.dtype for transformed_col in transformed_cols])
+        X_t = np.zeros((n_rows, sum(len(names) for names in self.column_names_)), dtype=dtype, order='F')
+        start = 0
+        for transformed_col, names in zip(transformed_cols, self.column_names_):
+            end = start + len(names)
+            if scipy.sparse.issparse(transformed_col) and transformed_col.dtype == dtype:
+                # densify in place
+                transformed_col.tocsr().toarray(out=X_t[:, start:end])
+            elif scipy.sparse.issparse(transformed_col):
+                X_t[:, start:end] = transformed_col.toarray()
+            else:
+                X_t[:, start:end] = self._check_block(np.asarray(transformed_col).reshape(n_rows, -1), names)
+            start = end
+        return X_t
+
+    def _stack_sparse(self, transformed_cols, n_rows):
+        """Stacks the transformed columns into one CSR matrix, dense blocks are converted"""
+        blocks = [self._check_block(transformed_col if scipy.sparse.issparse(transformed_col)
+                                    else scipy.sparse.csr_matrix(np.asarray(transformed_col).reshape(n_rows, -1)), names)
+                  for transformed_col, names in zip(transformed_cols, self.column_names_)]
+        return scipy.sparse.hstack(blocks, format='csr')
+
+    def _check_block(self, block, names):
+        if block.shape[1] != len(names):
+            raise ValueError(f"{type(self).__name__} returned {block.shape[1]} columns for the {len(names)} column names {names}")
+        return block
+
+    def _parallel(self, func, args):
+        """Runs func for every tuple of args, in parallel if n_jobs is given"""
+        if self.n_jobs is None or self.n_jobs == 1:
+            return [func(*a) for a in args]
+        return Parallel(n_jobs=self.n_jobs, prefer=self.prefer)(delayed(func)(*a) for a in args)
+
+
+def _fit_column(transformer, X_c):
+    return transformer.fit(X_c)
+
+
+def _transform_column(transformer, X_c):
+    return transformer.transform(X_c)
+
 
 class StandardScaler(Transformer_1_to_1):
 
@@ -240,6 +398,8 @@ class KBinsDiscretizer(Transformer_1_to_N):
 
     def _get_column_names(self, transformer, c_name):
         """Specific to this transformer mapping. Gets names of the resulting Xt columns."""
+        if self.encode == 'ordinal':
+            return [f"{c_name}_bin"]
         col_names = []
         for i in range(transformer.n_bins_[0]):
             col_names.append(f"{c_name}_bin_{i}")
@@ -7,8 +7,11 @@ Copyright 2020, Gradient Zero
 All rights reserved
 """
 
+import asyncio
 from abc import ABC
 
+from dq0.sdk.data.source import aread_all
+
 
 class Project(ABC):
     """Abstract base class for all all models and data jobs.
@@ -54,3 +57,30 @@ class Project(ABC):
             pass
         if self.data_sources is None or len(self.data_sources) < 1:
             self.data_source = None
+
+    async def aread_data_sources(self, executor=None, **kwargs):
+        """Reads all attached data sources concurrently.
+
+        Args:
+            executor (:obj:`concurrent.futures.Executor`, optional): executor to run the reads in.
+            kwargs: keyword arguments passed to the read method of every source
+
+        Returns:
+            list of the data read from the attached sources, in the order they were attached.
+        """
+        if self.data_sources is None:
+            return []
+        return await aread_all(self.data_sources, executor=executor, **kwargs)
+
+    def read_data_sources(self, **kwargs):
+        """Reads all attached data sources concurrently and waits for the results.
+
+        Use `aread_data_sources` if an event loop is already running.
+
+        Args:
+            kwargs: keyword arguments passed to the read method of every source
+
+        Returns:
+            list of the data read from the attached sources, in the order they were attached.
+        """
+        return asyncio.run(self.aread_data_sources(**kwargs))
@@ -1,9 +1,27 @@
 # -*- coding: utf-8 -*-
 """DQ0 SDK Utils Package
+
+The utils are imported on first access (PEP 562).
 """
 
-from .yaml_config import YamlConfig
+import importlib
 
 __all__ = [
     'YamlConfig'
 ]
+
+_lazy_attributes = {
+    'YamlConfig': '.yaml_config',
+}
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,38 +1,65 @@
 # -*- coding: utf-8 -*-
 """Managed classes of custom_objects, Optimizers and Losses
 
+The dictionaries are built on first access, so importing this module does
+not import tensorflow and tensorflow_hub.
+
 Copyright 2020, Gradient Zero
 All rights reserved
 """
-import tensorflow.compat.v1
 
-import tensorflow_hub as hub
 
-custom_objects = {
-    'KerasLayer': hub.KerasLayer,
-}
+def _get_custom_objects():
+    import tensorflow_hub as hub
 
-optimizers = {
-    'Adagrad': tensorflow.keras.optimizers.Adagrad,
-    'Adam': tensorflow.keras.optimizers.Adam,
-    'SGD': tensorflow.keras.optimizers.SGD
-}
+    return {
+        'KerasLayer': hub.KerasLayer,
+    }
+
+
+def _get_optimizers():
+    import tensorflow.compat.v1
+
+    return {
+        'Adagrad': tensorflow.keras.optimizers.Adagrad,
+        'Adam': tensorflow.keras.optimizers.Adam,
+        'SGD': tensorflow.keras.optimizers.SGD
+    }
 
-losses = {
-    'BinaryCrossentropy': tensorflow.keras.losses.BinaryCrossentropy,
-    'CategoricalCrossentropy': tensorflow.keras.losses.CategoricalCrossentropy,
-    'CategoricalHinge': tensorflow.keras.losses.CategoricalHinge,
-    'CosineSimilarity': tensorflow.keras.losses.CosineSimilarity,
-    'Hinge': tensorflow.keras.losses.Hinge,
-    'Huber': tensorflow.keras.losses.Huber,
-    'KLDivergence': tensorflow.keras.losses.KLDivergence,
-    'LogCosh': tensorflow.keras.losses.LogCosh,
-    'MeanAbsoluteError': tensorflow.keras.losses.MeanAbsoluteError,
-    'MeanAbsolutePercentageError': tensorflow.keras.losses.MeanAbsolutePercentageError,
-    'MeanSquaredError': tensorflow.keras.losses.MeanSquaredError,
-    'MeanSquaredLogarithmicError': tensorflow.keras.losses.MeanSquaredLogarithmicError,
-    'Poisson': tensorflow.keras.losses.Poisson,
-    # 'Reduction': tensorflow.keras.losses.Reduction,
-    'SparseCategoricalCrossentropy': tensorflow.keras.losses.SparseCategoricalCrossentropy,
-    'SquaredHinge': tensorflow.keras.losses.SquaredHinge,
+
+def _get_losses():
+    import tensorflow.compat.v1
+
+    return {
+        'BinaryCrossentropy': tensorflow.keras.losses.BinaryCrossentropy,
+        'CategoricalCrossentropy': tensorflow.keras.losses.CategoricalCrossentropy,
+        'CategoricalHinge': tensorflow.keras.losses.CategoricalHinge,
+        'CosineSimilarity': tensorflow.keras.losses.CosineSimilarity,
+        'Hinge': tensorflow.keras.losses.Hinge,
+        'Huber': tensorflow.keras.losses.Huber,
+        'KLDivergence': tensorflow.keras.losses.KLDivergence,
+        'LogCosh': tensorflow.keras.losses.LogCosh,
+        'MeanAbsoluteError': tensorflow.keras.losses.MeanAbsoluteError,
+        'MeanAbsolutePercentageError': tensorflow.keras.losses.MeanAbsolutePercentageError,
+        'MeanSquaredError': tensorflow.keras.losses.MeanSquaredError,
+        'MeanSquaredLogarithmicError': tensorflow.keras.losses.MeanSquaredLogarithmicError,
+        'Poisson': tensorflow.keras.losses.Poisson,
+        # 'Reduction': tensorflow.keras.losses.Reduction,
+        'SparseCategoricalCrossentropy': tensorflow.keras.losses.SparseCategoricalCrossentropy,
+        'SquaredHinge': tensorflow.keras.losses.SquaredHinge,
+    }
+
+
+_lazy_attributes = {
+    'custom_objects': _get_custom_objects,
+    'optimizers': _get_optimizers,
+    'losses': _get_losses,
 }
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        value = _lazy_attributes[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
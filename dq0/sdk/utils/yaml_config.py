@@ -18,7 +18,7 @@ All rights reserved
 import logging
 
 from dq0.sdk.errors.errors import fatal_error
-from dq0.sdk.utils.managed_classes import custom_objects
+from dq0.sdk.utils import managed_classes
 
 import yaml
 
@@ -34,10 +34,11 @@ class YamlConfig():
     def __init__(self,
                  yaml_path,
                  yaml_dict=None,
-                 custom_objects=custom_objects):
+                 custom_objects=None):
         self.yaml_str = None
         self.yaml_path = yaml_path
-        self.custom_objects = custom_objects
+        # defaults to the managed custom objects, importing tensorflow_hub on first use
+        self.custom_objects = managed_classes.custom_objects if custom_objects is None else custom_objects
         if yaml_dict is None:
             self.read_yaml_file()
         else:
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Arrow data handler unit tests.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+from dq0.sdk.data.binary import Parquet
+from dq0.sdk.estimators.data_handler.arrow import ArrowDataHandler
+from dq0.sdk.estimators.data_handler.utils import data_handler_factory
+from dq0.sdk.estimators.linear_model import sklearn_lm
+from dq0.sdk.pipeline.transformer import transformer
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+import scipy
+
+
+def _get_data_source(tmp_path, n_rows=1000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.normal(size=n_rows), 'b': rng.integers(0, 10, n_rows), 'extra': ['x'] * n_rows,
+                       'y': rng.choice([0, 1], n_rows)})
+    path = str(tmp_path / 'test.parquet')
+    df.to_parquet(path, row_group_size=100)
+    data_source = Parquet(path)
+    data_source.feature_cols = ['a', 'b']
+    data_source.target_cols = ['y']
+    return df, data_source
+
+
+@pytest.mark.parametrize('split_mode', ['random', 'hash'])
+def test_ArrowDataHandler_setup_data_001(tmp_path, split_mode):
+    df, data_source = _get_data_source(tmp_path)
+    data_handler = data_handler_factory('Parquet')
+    assert isinstance(data_handler, ArrowDataHandler)
+    X_train, X_test, y_train, y_test = data_handler.setup_data(data_source=data_source, split_mode=split_mode, stratify=True, seed=1, batch_rows=128)
+    assert list(X_train.columns) == ['a', 'b']
+    assert len(X_train) + len(X_test) == len(df)
+    assert len(X_test) == len(df) - int(np.floor(0.66 * len(df)))
+    assert y_test.mean() == pytest.approx(df['y'].mean(), abs=0.01)
+    if split_mode == 'random':
+        # only the feature and target columns are read
+        assert list(data_handler.data.columns) == ['a', 'b', 'y']
+    assert data_handler.get_input_dim(X_train) == 2
+    assert data_handler.get_output_dim(y_train) == 2
+
+    with pytest.raises(ValueError):
+        data_handler.setup_data(data_source=(X_train, y_train))
+
+
+def test_ArrowDataHandler_sparse_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path)
+    data_handler = ArrowDataHandler(pipeline_steps=[('OneHotEncoder', transformer.OneHotEncoder(input_col=['b'], keep_sparse=True))])
+    data_source.feature_cols = ['a'] + [f"b_{i}" for i in range(10)]
+    X_train, X_test, y_train, y_test = data_handler.setup_data(data_source=data_source, seed=1)
+    assert scipy.sparse.isspmatrix_csr(X_train)
+    assert X_train.shape == (len(y_train), 11)
+    np.testing.assert_array_equal(X_train[:, 1:].sum(axis=1), 1)
+    assert data_handler.get_input_dim(X_train) == 11
+
+    # sparse features are passed to the estimator
+    estimator = sklearn_lm.SGDClassifier(random_state=0)
+    estimator.fit(X_train, y_train)
+    assert 0. <= estimator.score(X_test, y_test) <= 1.
+
+
+def test_ArrowDataHandler_fit_pipeline_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path)
+    # the first batch has other statistics than the whole data
+    df.loc[:99, 'a'] += 10
+    df.to_parquet(data_source.path, row_group_size=100)
+    data_handler = ArrowDataHandler(pipeline_steps=[('StandardScaler', transformer.StandardScaler(input_col=['a']))])
+
+    # the pipeline is never fitted on the first batch only
+    with pytest.raises(ValueError):
+        next(data_handler.iter_batches(data_source, batch_rows=100))
+
+    data_handler.fit_pipeline(data_source)
+    X = pd.concat([X for X, _ in data_handler.iter_batches(data_source, batch_rows=100)])
+    assert X['a'].mean() == pytest.approx(0., abs=1e-10)
+    assert X['a'].std(ddof=0) == pytest.approx(1.)
+
+    # a uniform sample of all batches
+    data_handler.fit_pipeline(data_source, n_rows=500, seed=1, batch_rows=100)
+    X = pd.concat([X for X, _ in data_handler.iter_batches(data_source, batch_rows=100)])
+    assert X['a'].mean() == pytest.approx(0., abs=0.2)
@@ -15,6 +15,12 @@ from dq0.sdk.estimators.data_handler.csv import CSVDataHandler
 
 import logging # noqa
 
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
 FILEPATH = pathlib.Path(__file__).parent.absolute()
 DIR_PATH = os.path.dirname(os.path.realpath(__file__))
 PATH_TO_CM_CONFIG_CLASSIFICATION = os.path.join(DIR_PATH + '/mc_classification.yaml')
@@ -56,6 +62,103 @@ def test_CSVDataHandler_census():
     # assert X_train.loc[0, 'a'] == 1
 
 
+def _get_data_source(path, n_rows=2000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'id': np.arange(n_rows) * 7,
+        'a': rng.normal(size=n_rows),
+        'b': rng.integers(0, 10, n_rows),
+        'y': rng.choice([0, 1, 2], n_rows, p=[0.7, 0.2, 0.1])})
+    df.to_csv(path, index=False)
+    columns = {f"column_{i}": {'attributes': {'data': {'data_type_name': 'float' if name == 'a' else 'int', 'name': name},
+                                              'machine_learning': {'is_target' if name == 'y' else 'is_feature': True}}}
+               for i, name in enumerate(['a', 'b', 'y'])}
+    node, specification = Metadata.from_yaml_dict(yaml_dict={
+        'format': 'simple',
+        'node': {'dataset': {
+            'attributes': {'data': {'name': 'test'}, 'differential_privacy': {'privacy_level': 2}},
+            'child_nodes': {'database': {
+                'attributes': {'connector': {'type_name': 'csv', 'uri': path}, 'data': {'name': 'test db'}},
+                'child_nodes': {'schema': {
+                    'attributes': {'data': {'name': 'test schema'}},
+                    'child_nodes': {'table': {'attributes': {'data': {'name': 'test table'}}, 'child_nodes': columns}},
+                }},
+            }},
+        }},
+        'specification': 'dataset_v1',
+    })
+    m_interface = Interface(metadata=Metadata(nodes={'dataset': node}, specifications={'dataset': specification}))
+    return df, CSV(m_interface.dataset().database())
+
+
+@pytest.mark.parametrize('split_format', ['arrow', 'npy'])
+def test_CSVDataHandler_hash_split_001(tmp_path, split_format):
+    df, data_source = _get_data_source(str(tmp_path / 'test.csv'))
+    data_handler = CSVDataHandler()
+    X_train, X_test, y_train, y_test = data_handler.setup_data(data_source=data_source, split_mode='hash', split_dir=str(tmp_path / 'split'),
+                                                               split_format=split_format, batch_rows=300)
+    assert data_handler.data is None
+    assert len(X_train) + len(X_test) == len(df)
+    assert len(X_test) == pytest.approx(0.34 * len(df), rel=0.1)
+    assert X_train.shape[1] == 2 and len(y_train) == len(X_train)
+    if split_format == 'npy':
+        assert isinstance(X_train, np.memmap)
+    else:
+        assert list(X_train.columns) == ['a', 'b'] and y_train.name == 'y'
+    # the rows are kept and the split is deterministic
+    np.testing.assert_allclose(np.sort(np.concatenate([np.asarray(X_train)[:, 0], np.asarray(X_test)[:, 0]])), np.sort(df['a']))
+    _, X_test_2, _, _ = CSVDataHandler().setup_data(data_source=data_source, split_mode='hash', split_format=split_format, batch_rows=700)
+    np.testing.assert_array_equal(np.asarray(X_test), np.asarray(X_test_2))
+
+
+def test_CSVDataHandler_hash_split_002(tmp_path):
+    df, data_source = _get_data_source(str(tmp_path / 'test.csv'))
+    X_train, X_test, y_train, y_test = CSVDataHandler().setup_data(data_source=data_source, split_mode='hash', stratify=True, split_key='id',
+                                                                   seed=3, batch_rows=300)
+    # exact per-class quota of sklearn's stratified split
+    n_test = len(df) - int(np.floor(0.66 * len(df)))
+    assert len(X_test) == n_test
+    expected = df['y'].value_counts() * n_test / len(df)
+    assert (y_test.value_counts() - expected).abs().max() <= 1
+
+    with pytest.raises(ValueError):
+        CSVDataHandler().setup_data(data_source=data_source, split_mode='unknown')
+
+
+def test_CSVDataHandler_hash_split_003(tmp_path):
+    # temporary split directories are removed with the handler
+    df, data_source = _get_data_source(str(tmp_path / 'test.csv'))
+    with CSVDataHandler() as data_handler:
+        data_handler.setup_data(data_source=data_source, split_mode='hash', split_format='npy')
+        split_dir = data_handler.split_dir
+        assert os.path.isdir(split_dir)
+        data_handler.setup_data(data_source=data_source, split_mode='hash', split_format='npy')
+        assert not os.path.exists(split_dir)
+        split_dir = data_handler.split_dir
+    assert not os.path.exists(split_dir)
+
+    data_handler = CSVDataHandler()
+    data_handler.setup_data(data_source=data_source, split_mode='hash')
+    split_dir = data_handler.split_dir
+    del data_handler
+    assert not os.path.exists(split_dir)
+
+    # given split directories are kept
+    data_handler = CSVDataHandler()
+    data_handler.setup_data(data_source=data_source, split_mode='hash', split_dir=str(tmp_path / 'split'))
+    data_handler.close()
+    assert os.path.isdir(str(tmp_path / 'split'))
+
+
+def test_CSVDataHandler_missing_columns_001(tmp_path):
+    df, data_source = _get_data_source(str(tmp_path / 'test.csv'))
+    df.drop(columns=['b']).to_csv(data_source.path, index=False)
+    with pytest.raises(ValueError, match=r"\['b'\] not found"):
+        CSVDataHandler().setup_data(data_source=data_source)
+    with pytest.raises(ValueError, match=r"\['b'\] not found"):
+        CSVDataHandler().setup_data(data_source=data_source, split_mode='hash')
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
     test_CSVDataHandler_setup_data_001()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""NPY data handler unit tests.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+from dq0.sdk.data.binary import NPY, Parquet
+from dq0.sdk.estimators.data_handler.npy import NPYDataHandler
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+
+def _get_data(n_rows=1000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'a': rng.normal(size=n_rows), 'b': rng.normal(size=n_rows), 'y': rng.choice([0, 1, 2], n_rows, p=[0.6, 0.3, 0.1])})
+
+
+@pytest.mark.parametrize('split_mode', ['random', 'hash'])
+def test_NPYDataHandler_setup_data_001(tmp_path, split_mode):
+    df = _get_data()
+    df.to_parquet(str(tmp_path / 'test.parquet'))
+    data_source = NPY.convert(Parquet(str(tmp_path / 'test.parquet')), str(tmp_path / 'npy'), feature_cols=['a', 'b'], target_cols=['y'])
+    data_handler = NPYDataHandler()
+    X_train, X_test, y_train, y_test = data_handler.setup_data(data_source=data_source, split_mode=split_mode, stratify=True, seed=1)
+    assert X_train.shape == (len(y_train), 2)
+    assert len(X_train) + len(X_test) == len(df)
+    assert len(X_test) == len(df) - int(np.floor(0.66 * len(df)))
+    assert (y_test == 2).sum() == pytest.approx((df['y'] == 2).sum() * len(y_test) / len(df), abs=1)
+    assert data_handler.get_output_dim(y_train) == 3
+
+    # in-memory arrays give the same split
+    X_train_2, _, _, _ = data_handler.setup_data(data_source=(df[['a', 'b']].to_numpy(), df['y'].to_numpy()), split_mode=split_mode,
+                                                 stratify=True, seed=1)
+    np.testing.assert_array_equal(X_train, X_train_2)
+
+    with pytest.raises(ValueError):
+        data_handler.setup_data(data_source=(df[['a', 'b']].to_numpy(), None))
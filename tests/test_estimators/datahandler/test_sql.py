@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""SQL data handler unit tests based on SQLite.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+from dq0.sdk.data.sql import SQLite
+from dq0.sdk.estimators.data_handler.sql import SQLDataHandler
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+import sqlalchemy
+
+
+def _get_data_source(tmp_path, n_rows=500):
+    connection_string = f"sqlite:///{tmp_path / 'test.db'}"
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'id': np.arange(n_rows), 'a': rng.normal(size=n_rows), 'extra': ['x'] * n_rows, 'y': rng.choice([0, 1], n_rows)})
+    engine = sqlalchemy.create_engine(connection_string)
+    df.to_sql('test', engine, index=False)
+    engine.dispose()
+    data_source = SQLite(connection_string)
+    data_source.query = 'SELECT * FROM test'
+    data_source.feature_cols = ['a']
+    data_source.target_cols = ['y']
+    return df, data_source
+
+
+def test_SQLDataHandler_setup_data_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path)
+    data_handler = SQLDataHandler()
+    X_train, X_test, y_train, y_test = data_handler.setup_data(data_source=data_source, seed=1)
+    assert list(data_handler.data.columns) == ['a', 'y']
+    assert len(X_train) + len(X_test) == len(df)
+
+    # partitioned read
+    data_source.partition_column = 'id'
+    data_source.num_partitions = 4
+    data_handler.setup_data(data_source=data_source, seed=1)
+    assert list(data_handler.data.columns) == ['a', 'y', 'id']
+    assert len(data_handler.data) == len(df)
+
+    data_source.query = None
+    with pytest.raises(ValueError):
+        data_handler.setup_data(data_source=data_source)
+
+
+def test_SQLDataHandler_hash_split_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path)
+    X_train, X_test, y_train, y_test = SQLDataHandler().setup_data(data_source=data_source, split_mode='hash', split_key='id', split_format='npy',
+                                                                   batch_rows=64)
+    assert X_train.shape[1] == 1
+    assert len(X_train) + len(X_test) == len(df)
+    np.testing.assert_allclose(np.sort(np.concatenate([X_train[:, 0], X_test[:, 0]])), np.sort(df['a']))
@@ -75,6 +75,28 @@ def test_ElasticNet_001():
     logger.debug("ElasticNet.score(): {}".format(estimator.score(X, y)))
 
 
+def test_SGDClassifier_001():
+    X, y = get_data_int()
+    estimator = sklearn_lm.SGDClassifier(random_state=0)
+    estimator.fit(X, y)
+    logger.debug("SGDClassifier.predict(): {}".format(estimator.predict(X)))
+    logger.debug("SGDClassifier.score(): {}".format(estimator.score(X, y)))
+    assert estimator.predict(X).shape == (4,)
+    assert set(estimator.predict(X)) <= set(y)
+    assert 0 <= estimator.score(X, y) <= 1
+
+
+def test_SGDRegressor_001():
+    X, y = get_data_int()
+    estimator = sklearn_lm.SGDRegressor(random_state=0)
+    estimator.fit(X, y)
+    logger.debug("SGDRegressor.predict(): {}".format(estimator.predict(X)))
+    logger.debug("SGDRegressor.score(): {}".format(estimator.score(X, y)))
+    # the features are constant, the best prediction is the mean of the target
+    np.testing.assert_allclose(estimator.predict(X), y.mean(), atol=0.5)
+    assert estimator.score(X, y) <= 1
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
     test_LogisticRegression_001()
@@ -83,3 +105,5 @@ if __name__ == "__main__":
     test_Ridge_001()
     test_Lasso_001()
     test_ElasticNet_001()
+    test_SGDClassifier_001()
+    test_SGDRegressor_001()
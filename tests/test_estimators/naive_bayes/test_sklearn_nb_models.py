@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Naive Bayes estimators and incremental fit_stream unit tests.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import logging
+
+from dq0.sdk.data.binary import Parquet
+from dq0.sdk.estimators.linear_model import sklearn_lm
+from dq0.sdk.estimators.naive_bayes import sklearn_nb
+from dq0.sdk.pipeline.transformer import transformer
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+from sklearn.preprocessing import FunctionTransformer
+
+logger = logging.getLogger(__name__)
+
+
+def get_data_int():
+    X = np.ones((4, 3))
+    y_int = np.array([1, 2, 3, 4])
+
+    return X, y_int
+
+
+def _get_data_source(tmp_path, n_rows=1000):
+    rng = np.random.default_rng(0)
+    y = rng.choice([0, 1], n_rows)
+    df = pd.DataFrame({'a': rng.normal(size=n_rows) + 2 * y, 'b': rng.normal(size=n_rows), 'extra': ['x'] * n_rows, 'y': y})
+    path = str(tmp_path / 'test.parquet')
+    df.to_parquet(path, row_group_size=100)
+    data_source = Parquet(path)
+    data_source.feature_cols = ['a', 'b']
+    data_source.target_cols = ['y']
+    return df, data_source
+
+
+@pytest.mark.parametrize('estimator_class', [sklearn_nb.GaussianNB, sklearn_nb.MultinomialNB, sklearn_nb.BernoulliNB])
+def test_NB_001(estimator_class):
+    X, y = get_data_int()
+    estimator = estimator_class()
+    estimator.fit(X, y)
+    logger.debug("{}.predict(): {}".format(estimator_class.__name__, estimator.predict(X)))
+    logger.debug("{}.score(): {}".format(estimator_class.__name__, estimator.score(X, y)))
+
+
+def test_fit_stream_001():
+    X, y = get_data_int()
+    batches = [(X[:2], y[:2]), (X[2:], y[2:])]
+    estimator = sklearn_nb.GaussianNB()
+    estimator.fit_stream(batches, classes=np.unique(y), epochs=2)
+    np.testing.assert_array_equal(estimator.model.classes_, np.unique(y))
+
+    with pytest.raises(ValueError):
+        sklearn_nb.GaussianNB().fit_stream(batches)
+    with pytest.raises(ValueError):
+        sklearn_nb.GaussianNB().fit_stream(iter(batches), classes=np.unique(y), epochs=2)
+    # no partial_fit
+    with pytest.raises(ValueError):
+        sklearn_lm.LogisticRegression().fit_stream(batches)
+
+
+@pytest.mark.parametrize('estimator_class, params', [(sklearn_nb.GaussianNB, {}), (sklearn_lm.SGDClassifier, {'loss': 'log', 'random_state': 0})])
+def test_fit_stream_002(tmp_path, estimator_class, params):
+    df, data_source = _get_data_source(tmp_path)
+    estimator = estimator_class(data_source=data_source, **params)
+    estimator.fit_stream(data_handler_instance='Parquet', batch_rows=100, seed=1)
+    np.testing.assert_array_equal(estimator.model.classes_, [0, 1])
+
+    X_test, y_test = zip(*estimator.data_handler.iter_batches(data_source, batch_rows=100, split='test', seed=1))
+    X_test, y_test = pd.concat(X_test), pd.concat(y_test)
+    assert list(X_test.columns) == ['a', 'b']
+    assert 0.2 < len(X_test) / len(df) < 0.5
+    assert estimator.score(X_test, y_test) > 0.7
+
+    # the hash splits of fit_stream match the hash split of setup_data
+    _, X_test_2, _, _ = estimator.setup_data(data_handler_instance='Parquet', split_mode='hash', seed=1, batch_rows=100)
+    np.testing.assert_array_equal(X_test.to_numpy(), X_test_2.to_numpy())
+
+
+def test_fit_stream_pipeline_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path)
+    # the first batch has other statistics than the whole data
+    df.loc[:99, 'a'] += 10
+    df.to_parquet(data_source.path, row_group_size=100)
+    steps = [('scaler', transformer.StandardScaler(input_col=['a'])), ('target', FunctionTransformer(lambda df: df.assign(y=df['y'] + 5)))]
+    estimator = sklearn_nb.GaussianNB(data_source=data_source)
+    estimator.fit_stream(data_handler_instance='Parquet', pipeline_steps=steps, batch_rows=100, seed=1)
+
+    # the pipeline is fitted on all rows before streaming
+    scaler = estimator.data_handler.pipeline.pipeline.steps[0][1].transformer
+    assert scaler.mean_[0] == pytest.approx(df['a'].mean())
+    # the classes are taken from the transformed target
+    np.testing.assert_array_equal(estimator.model.classes_, [5, 6])
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Keras streaming data handler unit tests.
+
+Copyright 2021, Gradient Zero
+All rights reserved
+"""
+
+import os
+
+from dq0.sdk.data.binary import Parquet
+from dq0.sdk.estimators.data_handler.stream import BatchSequence, KerasStreamDataHandler, make_dataset
+from dq0.sdk.estimators.data_handler.tabular import DEFAULT_PIPELINE_FIT_ROWS
+from dq0.sdk.estimators.tf.keras_dense_classifier import Keras_Dense_Classifier_Integer
+from dq0.sdk.pipeline.transformer.transformer import StandardScaler
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+from sklearn.preprocessing import FunctionTransformer
+
+import tensorflow as tf
+
+
+def _get_data_source(tmp_path, n_rows=1000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.normal(size=n_rows), 'b': rng.normal(size=n_rows), 'extra': ['x'] * n_rows, 'y': rng.choice([0, 1, 2], n_rows)})
+    path = str(tmp_path / 'test.parquet')
+    df.to_parquet(path, row_group_size=100)
+    data_source = Parquet(path)
+    data_source.feature_cols = ['a', 'b']
+    data_source.target_cols = ['y']
+    return df, data_source
+
+
+def test_make_dataset_001():
+    X = np.arange(20, dtype=np.float32).reshape(10, 2)
+    y = np.arange(10)
+    batches = list(make_dataset(X, y, batch_size=4))
+    assert [len(y_batch) for _, y_batch in batches] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate([X_batch for X_batch, _ in batches]), X)
+
+    X_shuffled, y_shuffled = zip(*make_dataset(X, y, batch_size=4, shuffle=True, seed=1))
+    X_shuffled, y_shuffled = np.concatenate(X_shuffled), np.concatenate(y_shuffled)
+    np.testing.assert_array_equal(np.sort(y_shuffled), y)
+    np.testing.assert_array_equal(X_shuffled[:, 0], 2 * y_shuffled)
+
+
+def test_BatchSequence_001():
+    X = np.arange(20, dtype=np.float32).reshape(10, 2)
+    y = np.arange(10)
+    sequence = BatchSequence(X, y, batch_size=4, shuffle=True, seed=1)
+    assert len(sequence) == 3
+    y_shuffled = np.concatenate([sequence[i][1] for i in range(len(sequence))])
+    np.testing.assert_array_equal(np.sort(y_shuffled), y)
+    X_batch, y_batch = sequence[2]
+    np.testing.assert_array_equal(X_batch[:, 0], 2 * y_batch)
+    with pytest.raises(IndexError):
+        sequence[3]
+
+
+@pytest.mark.parametrize('output', ['dataset', 'sequence'])
+def test_KerasStreamDataHandler_001(tmp_path, output):
+    df, data_source = _get_data_source(tmp_path)
+    estimator = Keras_Dense_Classifier_Integer(data_source=data_source)
+    X_train, X_test, y_train, y_test = estimator.setup_data(data_handler_instance='KerasStream', stratify=True, seed=1, batch_rows=128,
+                                                            batch_size=50, output=output)
+    assert isinstance(X_train, tf.data.Dataset if output == 'dataset' else BatchSequence)
+    assert estimator.input_dim == 2
+    assert estimator.out_shape == 3
+    assert len(y_train) + len(y_test) == len(df)
+    assert len(y_test) == len(df) - int(np.floor(0.66 * len(df)))
+
+    estimator.setup_model(n_layers=[4])
+    estimator.fit(X_train, y_train, epochs=1)
+    assert len(estimator.predict(X_test)) == len(y_test)
+    assert 0. <= estimator.score(X_test, y_test) <= 1.
+
+    split_dir = estimator.data_handler.split_dir
+    estimator.data_handler.close()
+    assert not os.path.exists(split_dir)
+
+
+def test_KerasStreamDataHandler_pipeline_001(tmp_path, monkeypatch):
+    df, data_source = _get_data_source(tmp_path)
+    data_handler = KerasStreamDataHandler(pipeline_steps=[('abs', FunctionTransformer(lambda df: df.assign(a=df['a'].abs(), b=df['b'].abs())))])
+    X_train, X_test, y_train, y_test = data_handler.setup_data(data_source, batch_rows=128, pipeline_fit_rows=200, shuffle=False, output='sequence')
+    X = np.concatenate([X_train.X, X_test.X])
+    assert X.dtype == np.float32
+    assert (X >= 0).all()
+    np.testing.assert_allclose(np.sort(X[:, 0]), np.sort(np.abs(df['a'])).astype(np.float32))
+
+    with pytest.raises(ValueError):
+        data_handler.setup_data((X, np.concatenate([y_train, y_test])))
+
+    # the pipeline is fitted on all rows, not on the first batch
+    df.loc[:127, 'a'] += 10
+    df.to_parquet(data_source.path, row_group_size=100)
+    data_handler = KerasStreamDataHandler(pipeline_steps=[('StandardScaler', StandardScaler(input_col=['a']))])
+    X_train, X_test, y_train, y_test = data_handler.setup_data(data_source, batch_rows=128, shuffle=False, output='sequence')
+    X = np.concatenate([X_train.X, X_test.X])
+    assert X[:, 0].mean() == pytest.approx(0., abs=1e-5)
+
+    # by default the pipeline is fitted on a bounded random sample
+    fit_rows = []
+    fit_pipeline = data_handler.fit_pipeline
+
+    def _fit_pipeline(data_source, n_rows=None, **kwargs):
+        fit_rows.append(n_rows)
+        return fit_pipeline(data_source, n_rows=n_rows, **kwargs)
+
+    monkeypatch.setattr(data_handler, 'fit_pipeline', _fit_pipeline)
+    data_handler.setup_data(data_source, batch_rows=128, output='sequence')
+    assert fit_rows == [DEFAULT_PIPELINE_FIT_ROWS]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Import time regression tests.
+
+Every import runs in a fresh interpreter. The budgets are generous wall
+clock limits, the heavy modules must not be imported at all.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ['tensorflow', 'tensorflow_hub', 'sqlalchemy', 'sklearn']
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _import(module):
+    code = ('import json, sys, time\n'
+            'start = time.perf_counter()\n'
+            f'import {module}\n'
+            'seconds = time.perf_counter() - start\n'
+            f'print(json.dumps({{"seconds": seconds, "heavy": [m for m in {HEAVY_MODULES} if m in sys.modules]}}))\n')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True,
+                            env={**os.environ, 'PYTHONPATH': ROOT})
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('module,budget', [
+    ('dq0.sdk.data.metadata.structure.metadata', 2.),
+    ('dq0.sdk.data.data_source_factory', 1.),
+    ('dq0.sdk.cli', 3.),
+    ('dq0.sdk.models', 2.),
+    ('dq0.sdk.utils', 1.),
+])
+def test_import_time_001(module, budget):
+    result = _import(module)
+    assert result['heavy'] == []
+    assert result['seconds'] < budget
+
+
+def test_lazy_attributes_001():
+    from dq0.sdk import models, utils
+    from dq0.sdk.utils import managed_classes
+
+    assert 'YamlConfig' in dir(utils)
+    assert 'tf' in dir(models)
+    with pytest.raises(AttributeError):
+        models.unknown
+    with pytest.raises(AttributeError):
+        managed_classes.unknown
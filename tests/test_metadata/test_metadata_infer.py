@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Metadata inference tests.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import datetime
+
+from dq0.sdk.data.binary import Parquet
+from dq0.sdk.data.metadata.interface.interface import Interface
+from dq0.sdk.data.metadata.structure.metadata import Metadata
+from dq0.sdk.data.text.csv import CSV
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+
+def _get_data(n_rows=1000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'age': rng.integers(18, 90, n_rows),
+        'weight': rng.normal(70., 10., n_rows),
+        'sex': rng.choice(['f', 'm'], n_rows),
+        'id': [f"id_{i}" for i in range(n_rows)],
+        'flag': rng.random(n_rows) < 0.5,
+        'day': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 365, n_rows), 'D')})
+
+
+def _get_csv_source(path):
+    node, specification = Metadata.from_yaml_dict(yaml_dict={
+        'format': 'simple',
+        'node': {'dataset': {
+            'attributes': {'data': {'name': 'test'}, 'differential_privacy': {'privacy_level': 2}},
+            'child_nodes': {'database': {'attributes': {'connector': {'type_name': 'csv', 'uri': path}, 'data': {'name': 'test db'}}}},
+        }},
+        'specification': 'dataset_v1',
+    })
+    metadata = Metadata(nodes={'dataset': node}, specifications={'dataset': specification})
+    return CSV(meta_database=Interface(metadata=metadata).dataset().database())
+
+
+def _get_columns(metadata):
+    meta_table = Interface(metadata=metadata).dataset().database().schema().table()
+    return {column.data.name: column for column in meta_table}
+
+
+def test_infer_from_source_001(tmp_path):
+    df = _get_data()
+    path = str(tmp_path / 'test.csv')
+    df.to_csv(path, index=False)
+
+    metadata = Metadata.infer_from_source(_get_csv_source(path), target_cols=['sex'], privacy_column='id', max_allowed_values=10,
+                                          batch_rows=300, parse_dates=['day'])
+    m_interface = Interface(metadata=metadata)
+    assert m_interface.dataset().data.name == 'test'
+    assert m_interface.dataset().database().connector.uri == path
+    meta_table = m_interface.dataset().database().schema().table()
+    assert meta_table.data.rows == len(df)
+    assert meta_table.differential_privacy.privacy_column == 'id'
+
+    columns = _get_columns(metadata)
+    assert list(columns.keys()) == list(df.columns)
+    assert {name: column.data.data_type_name for name, column in columns.items()} == {
+        'age': 'int', 'weight': 'float', 'sex': 'string', 'id': 'string', 'flag': 'boolean', 'day': 'datetime'}
+    assert columns['age'].private_sql_and_synthesis.lower == df['age'].min()
+    assert columns['age'].private_sql_and_synthesis.upper == df['age'].max()
+    assert columns['weight'].private_sql_and_synthesis.upper == df['weight'].max()
+    assert columns['day'].private_sql_and_synthesis.lower == datetime.datetime(2020, 1, 1)
+    assert columns['sex'].private_sql.allowed_values == ['f', 'm']
+    assert columns['sex'].private_sql_and_synthesis.cardinality == 2
+    assert columns['sex'].machine_learning.is_target
+    assert columns['id'].private_sql.allowed_values is None
+    assert columns['id'].private_sql_and_synthesis.cardinality == pytest.approx(len(df), rel=0.05)
+
+    # the inferred metadata describes the source it was inferred from
+    data_source = CSV(meta_database=m_interface.dataset().database())
+    assert data_source.target_cols == ['sex']
+    pd.testing.assert_frame_equal(data_source.read()[['age', 'sex']], df[['age', 'sex']])
+
+
+def test_infer_from_source_002(tmp_path):
+    df = _get_data()
+    path = str(tmp_path / 'test.parquet')
+    df.to_parquet(path)
+
+    metadata = Metadata.infer_from_source(Parquet(path), name='inferred', feature_cols=['age', 'weight'], bounds_quantiles=(0.05, 0.95))
+    assert Interface(metadata=metadata).dataset().database().connector.type_name is None
+    columns = _get_columns(metadata)
+    assert columns['age'].machine_learning.is_feature
+    assert not columns['sex'].machine_learning.is_feature
+    # quantile bounds clip the extreme values
+    assert columns['weight'].private_sql_and_synthesis.lower == pytest.approx(df['weight'].quantile(0.05), rel=0.05)
+    assert columns['weight'].private_sql_and_synthesis.upper == pytest.approx(df['weight'].quantile(0.95), rel=0.05)
+
+    with pytest.raises(Exception):
+        Metadata.infer_from_source(Parquet(path), name='inferred', target_cols=['unknown'])
@@ -6,11 +6,16 @@ All rights reserved
 
 import logging
 
-from dq0.sdk.pipeline import pipeline # noqa
+from dq0.sdk.pipeline import dag, pipeline # noqa
 from dq0.sdk.pipeline.transformer import transformer # noqa
 import numpy as np # noqa
 import pandas as pd # noqa
 import os # noqa
+import sys # noqa
+
+import joblib
+
+import pytest
 
 logger = logging.getLogger(__name__)
 
@@ -117,3 +122,173 @@ if __name__ == '__main__':
     test_pipeline_004()
     test_pipeline_005()
     # test_pipeline_provoke_error()
+
+
+def test_pipeline_inplace_001():
+    print("\ntest_pipeline_inplace_001")
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(100, 3)), columns=['a', 'b', 'c'], index=np.arange(100) * 2)
+    X_orig = X.copy()
+    steps = [('StandardScaler', transformer.StandardScaler()), ('MinMaxScaler', transformer.MinMaxScaler()),
+             ('PowerTransformer', transformer.PowerTransformer())]
+    pipe = pipeline.Pipeline(steps=steps)
+
+    X_t = pipe.fit_transform(X)
+    pd.testing.assert_frame_equal(X, X_orig)
+    assert list(X_t.index) == list(X.index)
+    assert list(X_t.columns) == ['a', 'b', 'c']
+    np.testing.assert_allclose(X_t.mean(), 0., atol=1e-10)
+
+    # within one call all steps update the block allocated by the first step
+    scratch = transformer.ScratchBlocks()
+    step_1 = steps[0][1].transform(X, scratch=scratch)
+    step_2 = steps[1][1].transform(step_1, scratch=scratch)
+    step_3 = steps[2][1].transform(step_2, scratch=scratch)
+    assert not np.shares_memory(step_1.to_numpy(), X.to_numpy())
+    assert np.shares_memory(step_3.to_numpy(), step_1.to_numpy())
+    pd.testing.assert_frame_equal(step_3, X_t)
+    pd.testing.assert_frame_equal(pipe.transform(X), X_t)
+
+    # results returned to the caller are not modified by later transforms
+    X_1 = steps[0][1].transform(X)
+    X_1_orig = X_1.copy()
+    X_2 = steps[1][1].transform(X_1)
+    steps[0][1].transform(X_1)
+    pd.testing.assert_frame_equal(X_1, X_1_orig)
+    assert not np.shares_memory(X_1.to_numpy(), X_2.to_numpy())
+    X_t_orig = X_t.copy()
+    pipe.transform(X_t)
+    pd.testing.assert_frame_equal(X_t, X_t_orig)
+
+
+def test_pipeline_save_load_001(tmp_path):
+    print("\ntest_pipeline_save_load_001")
+    X, y = get_data_pandas()
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    pipe = pipeline.Pipeline(config_path=os.path.join(dir_path, 'pipeline_config.yaml'),
+                             transformers_root_dir='./dq0/sdk/pipeline/transformer/transformer.py')
+    path = str(tmp_path / 'pipeline.joblib')
+    with pytest.raises(ValueError):
+        pipe.save(path)
+
+    X_t = pipe.fit_transform(X.copy())
+    pipe.save(path)
+    loaded = pipeline.Pipeline.load(path)
+    assert loaded.steps_input_cols == pipe.steps_input_cols
+    # new batches are transformed without refitting
+    pd.testing.assert_frame_equal(loaded.transform(X.copy()), X_t)
+    pd.testing.assert_frame_equal(loaded.transform(X.iloc[2:].copy()), X_t.iloc[2:])
+
+    # saving over the memory-mapped file keeps the loaded pipeline intact
+    loaded.save(path)
+    pd.testing.assert_frame_equal(loaded.transform(X.copy()), X_t)
+
+    other_path = str(tmp_path / 'other.joblib')
+    joblib.dump({'format_version': pipeline.FORMAT_VERSION + 1, 'pipeline': pipe}, other_path)
+    with pytest.raises(ValueError):
+        pipeline.Pipeline.load(other_path)
+    joblib.dump(X, other_path)
+    with pytest.raises(ValueError):
+        pipeline.Pipeline.load(other_path)
+
+
+def test_pipeline_column_dag_001(tmp_path):
+    print("\ntest_pipeline_column_dag_001")
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.normal(size=50), 'b': rng.normal(size=50), 'c': rng.integers(3, size=50),
+                      'd': rng.integers(2, size=50)}, index=np.arange(50) * 3)
+    X_orig = X.copy()
+    config_path = tmp_path / 'pipeline_config.yaml'
+    config_path.write_text("""
+pipeline:
+  - scale_a:
+      class: 'StandardScaler'
+      input_col: ['a']
+  - encode_c:
+      class: 'OneHotEncoder'
+      input_col: ['c']
+  - scale_b:
+      class: 'MinMaxScaler'
+      input_col: ['b']
+  - encode_d:
+      class: 'OneHotEncoder'
+      input_col: ['d']
+  - bin_a:
+      class: 'Binarizer'
+      input_col: ['a']
+""")
+    pipe = pipeline.Pipeline(config_path=str(config_path), n_jobs=2)
+    # steps on disjoint columns are independent, bin_a waits for scale_a
+    assert dag.get_step_levels(pipe.pipeline.steps, X.columns) == [[0, 1, 2, 3], [4]]
+
+    X_t = pipe.fit_transform(X, None)
+    pd.testing.assert_frame_equal(X, X_orig)
+    assert list(X_t.index) == list(X.index)
+    assert list(X_t.columns) == ['a', 'b', 'c_0', 'c_1', 'c_2', 'd_0', 'd_1']
+    assert set(X_t['a']) == {0., 1.}
+    np.testing.assert_allclose(X_t['b'], (X['b'] - X['b'].min()) / (X['b'].max() - X['b'].min()))
+    np.testing.assert_array_equal(X_t['c_1'], X['c'] == 1)
+
+    # same result as the sequential steps
+    X_seq = X.copy()
+    for _, step in [('scale_a', transformer.StandardScaler(input_col=['a'])), ('encode_c', transformer.OneHotEncoder(input_col=['c'])),
+                    ('scale_b', transformer.MinMaxScaler(input_col=['b'])), ('encode_d', transformer.OneHotEncoder(input_col=['d'])),
+                    ('bin_a', transformer.Binarizer(input_col=['a']))]:
+        X_seq = step.fit_transform(X_seq)
+    pd.testing.assert_frame_equal(X_t, X_seq, check_dtype=False)
+    pd.testing.assert_frame_equal(pipe.transform(X), X_t)
+    pd.testing.assert_frame_equal(pipe.transform(X.iloc[:10]), X_t.iloc[:10])
+
+
+def test_pipeline_column_dag_002():
+    print("\ntest_pipeline_column_dag_002")
+    # appended columns of later levels keep the sequential column order
+    X = pd.DataFrame({'n': np.arange(6.), 'c1': ['a', 'b'] * 3, 'c2': ['x', 'x', 'y'] * 2})
+    steps = [('encode_c1', transformer.OneHotEncoder(input_col=['c1'])), ('encode_c1_a', transformer.OneHotEncoder(input_col=['c1_a'])),
+             ('encode_c2', transformer.OneHotEncoder(input_col=['c2']))]
+    assert dag.get_step_levels(steps, X.columns) == [[0, 2], [1]]
+
+    X_seq = X.copy()
+    for _, step in steps:
+        X_seq = step.fit_transform(X_seq)
+    assert list(X_seq.columns) == ['n', 'c1_b', 'c1_a_0.0', 'c1_a_1.0', 'c2_x', 'c2_y']
+
+    steps = [(name, transformer.OneHotEncoder(input_col=step.input_col)) for name, step in steps]
+    _, X_t = dag.run_steps(steps, X, fit=True, n_jobs=2)
+    pd.testing.assert_frame_equal(X_t, X_seq, check_dtype=False)
+
+
+def test_pipeline_save_load_002(tmp_path):
+    print("\ntest_pipeline_save_load_002")
+    # custom transformer files are stored with the pipeline
+    transformers_path = tmp_path / 'custom_transformers.py'
+    transformers_path.write_text("""
+from dq0.sdk.pipeline.transformer.transformer import Transformer
+
+
+class AddOne(Transformer):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return X + 1
+""")
+    config_path = tmp_path / 'pipeline_config.yaml'
+    config_path.write_text("""
+pipeline:
+  - add_one:
+      class: 'AddOne'
+""")
+    X, y = get_data_pandas()
+    pipe = pipeline.Pipeline(config_path=str(config_path), transformers_root_dir=str(transformers_path))
+    X_t = pipe.fit_transform(X)
+    path = str(tmp_path / 'pipeline.joblib')
+    pipe.save(path)
+
+    # loaded without the transformer file, e.g. on another machine
+    module_name = type(pipe.pipeline.steps[0][1]).__module__
+    os.remove(transformers_path)
+    del sys.modules[module_name]
+    loaded = pipeline.Pipeline.load(path)
+    pd.testing.assert_frame_equal(loaded.transform(X), X_t)
+    loaded.save(str(tmp_path / 'pipeline_2.joblib'))
@@ -12,6 +12,8 @@ from dq0.sdk.pipeline import pipeline # noqa
 import numpy as np # noqa
 import os # noqa
 
+import pytest
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +37,63 @@ def test_pipeline_config_read_001():
     assert X_t[0, 0] == 1
 
 
+def test_pipeline_config_builtin_001():
+    pp_config = PipelineConfig.__new__(PipelineConfig)
+    pp_config.config = pp_config.read_from_yaml("""
+pipeline:
+  - scaler:
+      class: 'StandardScaler'
+      with_mean: False
+  - selector:
+      class: 'ColumnSelector'
+      selected_columns: [0, 1]
+""")
+    # built-in transformers need no transformer file
+    steps = pp_config.get_steps_from_config(root_dir=None)
+    assert [name for name, _ in steps] == ['scaler', 'selector']
+    assert isinstance(steps[0][1], transformer.transformer.StandardScaler)
+    assert steps[1][1].selected_columns == [0, 1]
+
+
+def test_pipeline_config_module_cache_001(tmp_path):
+    path = tmp_path / 'custom.py'
+    path.write_text("""
+from dq0.sdk.pipeline.transformer.transformer import Transformer
+with open(__file__ + '.log', 'a') as f:
+    f.write('exec')
+
+
+class Identity(Transformer):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return X
+""")
+    pp_config = PipelineConfig.__new__(PipelineConfig)
+    pp_config.config = {'pipeline': [{f'step{i}': {'class': 'Identity' if i % 2 else 'StandardScaler'}} for i in range(10)]}
+    steps = pp_config.get_steps_from_config(root_dir=str(path))
+    steps_2 = pp_config.get_steps_from_config(root_dir=os.path.join(str(tmp_path), '.', 'custom.py'))
+    assert len(steps) == len(steps_2) == 10
+    assert type(steps[1][1]) is type(steps_2[1][1])
+    assert type(steps[0][1]) is transformer.transformer.StandardScaler
+    # the transformer file is executed once for all steps and both configs
+    assert (tmp_path / 'custom.py.log').read_text() == 'exec'
+
+
+def test_pipeline_config_errors_001():
+    pp_config = PipelineConfig.__new__(PipelineConfig)
+    pp_config.config = {'pipeline': [{'scaler': {'class': 'StandardScaler'}}, {'bad': {'class': 'NoSuchTransformer'}}]}
+    with pytest.raises(ValueError, match="'bad'.*NoSuchTransformer"):
+        pp_config.get_steps_from_config()
+    pp_config.config = {'pipeline': [{'selector': {'class': 'ColumnSelector', 'columns': [0]}}]}
+    with pytest.raises(ValueError, match="'selector'"):
+        pp_config.get_steps_from_config()
+    pp_config.config = {'pipeline': [{'scaler': {'with_mean': False}}]}
+    with pytest.raises(ValueError, match="'scaler' has no transformer class"):
+        pp_config.get_steps_from_config()
+
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.DEBUG)
     test_pipeline_config_read_001()
@@ -12,6 +12,8 @@ import numpy as np
 
 import pandas as pd
 
+import scipy
+
 logger = logging.getLogger(__name__)
 
 
@@ -205,6 +207,43 @@ def test_OneHotEncoder_002():
     assert X.iloc[0]['c'] == 3
 
 
+def test_OneHotEncoder_n_jobs():
+    print("\ntest_OneHotEncoder_n_jobs")
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.integers(0, 5, (50, 20)), columns=[f"c{i}" for i in range(20)], index=np.arange(50) * 2)
+    X_expected = transformer.OneHotEncoder(input_col=['c0', 'c1', 'c2']).fit_transform(X)
+    assert X_expected.notna().all().all()
+    for prefer in ['threads', 'processes']:
+        trans = transformer.OneHotEncoder(input_col=['c0', 'c1', 'c2'], n_jobs=2, prefer=prefer)
+        pd.testing.assert_frame_equal(trans.fit_transform(X), X_expected)
+    # mixed dense output dtypes
+    X_t = transformer.KBinsDiscretizer(n_bins=3, encode='ordinal', n_jobs=2).fit_transform(X)
+    assert X_t.shape == (50, 20)
+    assert list(X_t.index) == list(X.index)
+
+
+def test_OneHotEncoder_keep_sparse():
+    print("\ntest_OneHotEncoder_keep_sparse")
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.integers(0, 100, 200), 'b': rng.integers(0, 3, 200), 'c': rng.normal(size=200)})
+    X_dense = transformer.OneHotEncoder(input_col=['a', 'b']).fit_transform(X)
+    X_sparse = transformer.OneHotEncoder(input_col=['a', 'b'], keep_sparse=True).fit_transform(X)
+    assert list(X_sparse.columns) == list(X_dense.columns)
+    assert transformer.has_sparse_columns(X_sparse)
+    assert not isinstance(X_sparse['c'].dtype, pd.SparseDtype)
+    pd.testing.assert_frame_equal(X_sparse.astype(float), X_dense, check_dtype=False)
+    X_csr = transformer.to_sparse_matrix(X_sparse)
+    assert X_csr.format == 'csr'
+    np.testing.assert_array_equal(X_csr.toarray(), X_dense.to_numpy())
+
+    # sparse columns stay sparse in 1 to 1 transformers
+    X_scaled = transformer.MaxAbsScaler(input_col=list(X_sparse.columns[1:]), keep_sparse=True).fit_transform(X_sparse)
+    assert all(isinstance(dtype, pd.SparseDtype) for dtype in X_scaled.dtypes[1:])
+    # numpy inputs return scipy sparse matrices
+    X_t = transformer.OneHotEncoder(keep_sparse=True).fit_transform(X[['a', 'b']].to_numpy())
+    assert scipy.sparse.issparse(X_t)
+
+
 def test_PolynomialFeatures():
     print("\ntest_PolynomialFeatures")
     X, y = get_data_pandas()
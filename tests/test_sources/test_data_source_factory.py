@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Data source factory tests.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import os
+import subprocess
+import sys
+
+from dq0.sdk.data import data_source_factory
+from dq0.sdk.data.metadata.interface.interface import Interface
+from dq0.sdk.data.metadata.structure.metadata import Metadata
+from dq0.sdk.data.text.csv import CSV
+
+import pytest
+
+
+def _get_meta_database(type_name, uri):
+    node, specification = Metadata.from_yaml_dict(yaml_dict={
+        'format': 'simple',
+        'node': {'dataset': {
+            'attributes': {'data': {'name': 'test'}, 'differential_privacy': {'privacy_level': 2}},
+            'child_nodes': {'database': {'attributes': {'connector': {'type_name': type_name, 'uri': uri}, 'data': {'name': 'test db'}}}},
+        }},
+        'specification': 'dataset_v1',
+    })
+    metadata = Metadata(nodes={'dataset': node}, specifications={'dataset': specification})
+    return Interface(metadata=metadata).dataset().database()
+
+
+class _EntryPoint:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def load(self):
+        return data_source_factory._resolve(self.value)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(data_source_factory, 'data_source_classes', dict(data_source_factory.data_source_classes))
+    monkeypatch.setattr(data_source_factory, '_entry_points_loaded', False)
+    monkeypatch.setattr(data_source_factory, '_iter_entry_points', lambda: [_EntryPoint('My-CSV', 'dq0.sdk.data.text.csv:CSV'),
+                                                                            _EntryPoint('csv', 'dq0.sdk.data.text.json:JSON')])
+    return data_source_factory
+
+
+def test_create_from_meta_001(registry):
+    data_source = registry.create_from_meta(_get_meta_database('csv', 'test.csv'))
+    assert isinstance(data_source, CSV)
+    assert data_source.path == 'test.csv'
+    # the imported class replaces the dotted path
+    assert registry.data_source_classes['csv'] is CSV
+
+    with pytest.raises(ValueError):
+        registry.get_class('unknown')
+    # NPY sources are created from their path, not from metadata
+    with pytest.raises(ValueError):
+        registry.get_class('npy')
+
+
+def test_register_001(registry):
+    registry.register('Custom_Source', 'dq0.sdk.data.text.csv:CSV')
+    assert registry.get_class('custom source') is CSV
+    # entry points add types, but do not replace the built-in ones
+    assert 'mycsv' in registry.available_types()
+    assert registry.get_class('my_csv') is CSV
+    assert registry.get_class('csv') is CSV
+
+    registry.register('broken', 'dq0.sdk.data.text.csv:Unknown')
+    with pytest.raises(ImportError):
+        registry.get_class('broken')
+    with pytest.raises(ValueError):
+        registry.register('broken', 42)
+
+
+def test_lazy_import_001():
+    # creating a csv source must not import sqlalchemy or the database drivers
+    code = ('import sys\n'
+            'from dq0.sdk.data import data_source_factory\n'
+            'data_source_factory.get_class("csv")\n'
+            'print(sorted(m for m in ["sqlalchemy", "dq0.sdk.data.sql", "dq0.sdk.data.binary"] if m in sys.modules))\n')
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True,
+                            env={**os.environ, 'PYTHONPATH': root})
+    assert result.stdout.strip() == '[]'
+
+
+def test_iter_entry_points_py37(monkeypatch):
+    # python 3.7 has no importlib.metadata, the backport or pkg_resources are used instead
+    import importlib
+    monkeypatch.delattr(importlib, 'metadata', raising=False)
+    monkeypatch.setitem(sys.modules, 'importlib.metadata', None)
+    monkeypatch.setitem(sys.modules, 'importlib_metadata', None)
+    entry_points = list(data_source_factory._iter_entry_points())
+    assert all(hasattr(entry_point, 'name') and hasattr(entry_point, 'load') for entry_point in entry_points)
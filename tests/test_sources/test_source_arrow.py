@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Arrow dataset based data source tests.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+from dq0.sdk.data.binary import Feather, ORC, Parquet
+
+import numpy as np
+
+import pandas as pd
+
+import pyarrow as pa
+
+import pytest
+
+
+def _get_data():
+    return pd.DataFrame({
+        'a': np.arange(20, dtype=np.int64),
+        'b': np.arange(20) / 2.,
+        'c': ['x' if i % 2 == 0 else 'y' for i in range(20)]})
+
+
+def _write(df, path, source_class):
+    if source_class == Parquet:
+        df.to_parquet(path, row_group_size=5)
+    elif source_class == Feather:
+        df.to_feather(path)
+    else:
+        import pyarrow.orc as orc
+        orc.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+
+
+@pytest.mark.parametrize('source_class', [Parquet, Feather, ORC])
+def test_arrow_dataset_read_001(tmp_path, source_class):
+    df = _get_data()
+    path = str(tmp_path / 'test.data')
+    _write(df, path, source_class)
+    data_source = source_class(path)
+
+    pd.testing.assert_frame_equal(data_source.read(), df)
+
+    # column pruning and filter pushdown
+    df_read = data_source.read(columns=['a', 'c'], filters=[('a', '>=', 10), ('c', '==', 'x')])
+    assert list(df_read.columns) == ['a', 'c']
+    assert list(df_read['a']) == [10, 12, 14, 16, 18]
+
+    # disjunction of filters
+    df_read = data_source.read(columns=['a'], filters=[[('a', '<', 2)], [('a', 'in', [5, 19])]])
+    assert list(df_read['a']) == [0, 1, 5, 19]
+
+    table = data_source.read(output='arrow')
+    assert isinstance(table, pa.Table)
+    assert table.num_rows == 20
+
+    arrays = data_source.read(columns=['a', 'b'], output='numpy')
+    np.testing.assert_array_equal(arrays['a'], df['a'].values)
+    np.testing.assert_array_equal(arrays['b'], df['b'].values)
+
+
+@pytest.mark.parametrize('source_class', [Parquet, Feather, ORC])
+def test_arrow_dataset_iter_batches_001(tmp_path, source_class):
+    df = _get_data()
+    path = str(tmp_path / 'test.data')
+    _write(df, path, source_class)
+    data_source = source_class(path, columns=['a', 'b'])
+
+    batches = list(data_source.iter_batches(batch_rows=5))
+    assert all(len(batch) <= 5 for batch in batches)
+    df_batches = pd.concat(batches, ignore_index=True)
+    pd.testing.assert_frame_equal(df_batches, df[['a', 'b']])
+
+    batches = list(data_source.iter_batches(batch_rows=5, filters=[('a', '<', 3)], output='numpy'))
+    assert np.concatenate([batch['a'] for batch in batches]).tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize('source_class', [Parquet, Feather, ORC])
+def test_arrow_dataset_sample_001(tmp_path, source_class):
+    df = _get_data()
+    path = str(tmp_path / 'test.data')
+    _write(df, path, source_class)
+    data_source = source_class(path)
+
+    pd.testing.assert_frame_equal(data_source.sample(3), df.iloc[:3])
+    pd.testing.assert_frame_equal(data_source.sample(3, columns=['a'], filters=[('a', '>', 10)]),
+                                  pd.DataFrame({'a': np.array([11, 12, 13], dtype=np.int64)}))
+
+    df_sample = data_source.sample(8, method='reservoir', seed=1)
+    assert len(df_sample) == 8
+    assert df_sample['a'].is_unique
+    assert df_sample['a'].is_monotonic_increasing
+    pd.testing.assert_frame_equal(df_sample.reset_index(drop=True), df.loc[df_sample['a']].reset_index(drop=True))
+    pd.testing.assert_frame_equal(df_sample, data_source.sample(8, method='reservoir', seed=1))
+
+    df_sample = data_source.sample(6, method='stratified', seed=1, stratify_by='c', filters=[('a', '<', 12)])
+    assert list(df_sample['c'].value_counts()) == [3, 3]
+    assert df_sample['a'].max() < 12
+
+
+def test_arrow_dataset_errors_001(tmp_path):
+    df = _get_data()
+    path = str(tmp_path / 'test.parquet')
+    _write(df, path, Parquet)
+    data_source = Parquet(path)
+
+    with pytest.raises(ValueError):
+        data_source.read(output='list')
+    with pytest.raises(ValueError):
+        data_source.read(filters=[('a', 'like', 1)])
+    with pytest.raises(ValueError):
+        next(data_source.iter_batches(batch_rows=-1))
+
+
+@pytest.mark.parametrize('source_class', [Parquet, Feather, ORC])
+def test_arrow_dataset_read_pandas_args_001(tmp_path, source_class):
+    df = _get_data()
+    path = str(tmp_path / 'test.data')
+    _write(df, path, source_class)
+    data_source = source_class(path)
+
+    # arguments of the former pandas readers
+    pd.testing.assert_frame_equal(data_source.read(engine='pyarrow', columns=['a', 'c'], use_threads=False), df[['a', 'c']])
+    with pytest.raises(ValueError, match='fastparquet'):
+        data_source.read(engine='fastparquet')
+    with pytest.raises(ValueError, match='storage_options'):
+        data_source.read(storage_options={})
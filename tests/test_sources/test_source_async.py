@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous data source read tests.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import asyncio
+import time
+
+from dq0.sdk.data.binary import Parquet
+from dq0.sdk.data.source import Source, aread_all
+from dq0.sdk.projects import Project
+
+import numpy as np
+
+import pandas as pd
+
+
+class SlowSource(Source):
+    def __init__(self, value, delay=0.2):
+        super().__init__()
+        self.value = value
+        self.delay = delay
+
+    def read(self, **kwargs):
+        time.sleep(self.delay)
+        return self.value
+
+
+def test_aread_001(tmp_path):
+    path = str(tmp_path / 'test.parquet')
+    df = pd.DataFrame({'a': np.arange(10)})
+    df.to_parquet(path)
+
+    df_read = asyncio.run(Parquet(path).aread(columns=['a']))
+    pd.testing.assert_frame_equal(df_read, df)
+
+
+def test_aread_all_001():
+    sources = [SlowSource(i) for i in range(4)]
+    start = time.time()
+    results = asyncio.run(aread_all(sources))
+    assert results == [0, 1, 2, 3]
+    # reads overlap instead of running one after another
+    assert time.time() - start < 0.6
+
+
+def test_project_read_data_sources_001():
+    project = Project()
+    assert project.read_data_sources() == []
+    for i in range(3):
+        project.attach_data_source(SlowSource(i, delay=0.01))
+    assert project.read_data_sources() == [0, 1, 2]
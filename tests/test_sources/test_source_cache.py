@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Data source read cache tests.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import os
+import time
+
+from dq0.sdk.data.binary import Parquet
+from dq0.sdk.data.cache import ReadCache
+
+import numpy as np
+
+import pandas as pd
+
+
+def _write_data(path, n_rows=100, offset=0):
+    df = pd.DataFrame({'a': np.arange(n_rows) + offset, 'b': ['x'] * n_rows})
+    df.to_parquet(path)
+    return df
+
+
+def test_read_cache_001(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.parquet')
+    df = _write_data(path)
+    cache = ReadCache(cache_dir=str(tmp_path / 'cache'))
+    data_source = Parquet(path)
+    data_source.enable_cache(cache)
+
+    pd.testing.assert_frame_equal(data_source.read(), df)
+    assert len(os.listdir(cache.cache_dir)) == 1
+
+    # second read is served from the cache without touching the source
+    def fail(*args, **kwargs):
+        raise AssertionError('source read although cached')
+    with monkeypatch.context() as m:
+        m.setattr(Parquet, 'get_dataset', fail)
+        pd.testing.assert_frame_equal(data_source.read(), df)
+
+    # different read kwargs are cached separately
+    pd.testing.assert_frame_equal(data_source.read(columns=['a']), df[['a']])
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+    # changing the file invalidates the entries
+    time.sleep(0.01)
+    df = _write_data(path, n_rows=50, offset=7)
+    pd.testing.assert_frame_equal(data_source.read(), df)
+
+    data_source.invalidate_cache()
+    assert cache.size() == 0
+
+    data_source.disable_cache()
+    data_source.read()
+    assert cache.size() == 0
+
+
+def test_read_cache_eviction_001(tmp_path):
+    cache = ReadCache(cache_dir=str(tmp_path / 'cache'))
+    sources = []
+    for i in range(3):
+        path = str(tmp_path / f'test_{i}.parquet')
+        _write_data(path, n_rows=1000)
+        data_source = Parquet(path)
+        data_source.enable_cache(cache)
+        data_source.read()
+        sources.append(data_source)
+        time.sleep(0.01)
+    entry_size = cache.size() // 3
+
+    # touch the first entry, the second one is the least recently used now
+    sources[0].read()
+    cache.max_size_bytes = 2 * entry_size
+    cache.evict()
+    keys = [cache.get_key(source, {}) for source in sources]
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+    cache.clear()
+    assert cache.size() == 0
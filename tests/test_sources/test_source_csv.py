@@ -15,6 +15,8 @@ import numpy as np
 
 import pandas as pd
 
+import pytest
+
 
 def test_csv_001():
     # prepare yaml file
@@ -353,5 +355,223 @@ def test_csv_001():
     os.remove('test.csv')
 
 
+def _get_data_source(uri, column_attributes=''):
+    content = f'''meta_dataset:
+  format: simple
+  node:
+    dataset:
+      attributes:
+        'data':
+          'name': 'test_ds'
+        'differential_privacy':
+          'privacy_level': 2
+      child_nodes:
+        database:
+          attributes:
+            'connector':
+              'type_name': 'csv'
+              'uri': '{uri}'
+            'data':
+              'name': 'test_db'
+          child_nodes:
+            schema:
+              attributes:
+                'data':
+                  'name': 'test_sc'
+              child_nodes:
+                table:
+                  attributes:
+                    'data':
+                      'name': 'test_tb'
+                  child_nodes:
+                    column_0:
+                      attributes:
+                        'data':
+                          'data_type_name': 'int'
+                          'name': 'a'
+                        'machine_learning':
+                          'is_feature': true
+                        'private_sql_and_synthesis':
+                          'lower': 0
+                          'upper': 100
+                    column_1:
+                      attributes:
+                        'data':
+                          'data_type_name': 'float'
+                          'name': 'b'
+                        'machine_learning':
+                          'is_feature': true
+                    column_2:
+                      attributes:
+                        'data':
+                          'data_type_name': 'string'
+                          'name': 'c'
+                        'machine_learning':
+                          'is_target': true
+                        'private_sql_and_synthesis':
+                          'cardinality': 2
+{column_attributes}  specification: 'dataset_v1'
+'''
+    metadata = Metadata.from_yaml(yaml_content=content)
+    m_interface = Interface(metadata=metadata)
+    return CSV(meta_database=m_interface.dataset().database())
+
+
+def _write_test_csv(path, n_rows=25):
+    df = pd.DataFrame({
+        'a': np.arange(n_rows),
+        'b': np.arange(n_rows) / 2.,
+        'c': ['x' if i % 2 == 0 else 'y' for i in range(n_rows)]})
+    df.to_csv(path, index=False, sep=';')
+    return df
+
+
+def test_csv_iter_batches_001(tmp_path):
+    path = str(tmp_path / 'test.csv')
+    df = _write_test_csv(path)
+    data_source = _get_data_source(path)
+    data_source.sep = ';'
+
+    batches = list(data_source.iter_batches(batch_rows=10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    for batch in batches:
+        assert list(batch.columns) == ['a', 'b', 'c']
+
+    df_batches = pd.concat(batches, ignore_index=True)
+    pd.testing.assert_frame_equal(df_batches, df)
+    pd.testing.assert_frame_equal(df_batches, data_source.read())
+
+    # kwargs are prioritized over metadata like in read
+    batches = list(data_source.iter_batches(batch_rows=100, sep=','))
+    assert len(batches) == 1
+    assert batches[0].shape == (25, 1)
+
+
+def test_csv_iter_batches_002(tmp_path):
+    path = str(tmp_path / 'test.csv')
+    _write_test_csv(path)
+    data_source = _get_data_source(path)
+
+    with pytest.raises(ValueError):
+        next(data_source.iter_batches(batch_rows=0))
+
+
+def test_csv_meta_dtypes_001(tmp_path):
+    path = str(tmp_path / 'test.csv')
+    df = _write_test_csv(path)
+    df['d'] = pd.date_range('2020-01-01', periods=len(df)).astype(str)
+    df['unused'] = 1
+    df.to_csv(path, index=False)
+    column_attributes = '''                    column_3:
+                      attributes:
+                        'data':
+                          'data_type_name': 'datetime'
+                          'name': 'd'
+                        'machine_learning':
+                          'is_feature': true
+'''
+    data_source = _get_data_source(path, column_attributes=column_attributes)
+
+    # default reads all columns with inferred dtypes
+    df_read = data_source.read()
+    assert list(df_read.columns) == ['a', 'b', 'c', 'd', 'unused']
+    assert df_read['c'].dtype == 'object'
+
+    df_read = data_source.read(use_meta_dtypes=True)
+    assert list(df_read.columns) == ['a', 'b', 'c', 'd']
+    assert df_read['a'].dtype == 'Int8'
+    assert df_read['b'].dtype == 'float64'
+    assert df_read['c'].dtype == 'category'
+    assert df_read['d'].dtype == 'datetime64[ns]'
+    assert list(df_read['a']) == list(df['a'])
+
+    data_source.use_meta_dtypes = True
+    batches = list(data_source.iter_batches(batch_rows=10))
+    assert list(batches[0].columns) == ['a', 'b', 'c', 'd']
+    assert batches[0]['a'].dtype == 'Int8'
+
+
+def test_csv_meta_dtypes_002(tmp_path):
+    # values out of metadata bounds fall back to inferred dtypes
+    path = str(tmp_path / 'test.csv')
+    df = _write_test_csv(path)
+    df.loc[0, 'a'] = 1000
+    df.to_csv(path, index=False)
+    data_source = _get_data_source(path)
+    df_read = data_source.read(use_meta_dtypes=True)
+    assert df_read['a'].dtype == 'int64'
+    assert df_read.loc[0, 'a'] == 1000
+
+
+def test_csv_meta_dtypes_004(tmp_path, caplog):
+    # read errors caused by the caller's arguments are not retried
+    path = str(tmp_path / 'test.csv')
+    _write_test_csv(path)
+    data_source = _get_data_source(path)
+    data_source.sep = ';'
+    assert data_source.read(usecols=['a', 'zzz']) is None
+    assert 'Could not read CSV with metadata dtypes' not in caplog.text
+
+    # the metadata dtypes are removed for a single retry, the caller's usecols are kept
+    assert data_source.read(usecols=['a', 'zzz'], use_meta_dtypes=True) is None
+    assert caplog.text.count('Could not read CSV with metadata dtypes') == 1
+
+
+def test_csv_meta_dtypes_003(tmp_path):
+    # bounded floats keep float64 unless narrowing is requested
+    path = str(tmp_path / 'test.csv')
+    df = _write_test_csv(path)
+    df['e'] = 123456.789
+    df.loc[1, 'e'] = 0.1
+    df.to_csv(path, index=False)
+    column_attributes = '''                    column_3:
+                      attributes:
+                        'data':
+                          'data_type_name': 'float'
+                          'name': 'e'
+                        'machine_learning':
+                          'is_feature': true
+                        'private_sql_and_synthesis':
+                          'lower': 0.0
+                          'upper': 1000000.0
+'''
+    data_source = _get_data_source(path, column_attributes=column_attributes)
+
+    df_read = data_source.read(use_meta_dtypes=True)
+    assert df_read['e'].dtype == 'float64'
+    assert df_read.loc[0, 'e'] == 123456.789
+    assert df_read.loc[1, 'e'] == 0.1
+
+    df_read = data_source.read(use_meta_dtypes=True, narrow_floats=True)
+    assert df_read['e'].dtype == 'float32'
+
+
+def test_csv_sample_001(tmp_path):
+    path = str(tmp_path / 'test.csv')
+    df = _write_test_csv(path, n_rows=1000)
+    data_source = _get_data_source(path)
+    data_source.sep = ';'
+
+    pd.testing.assert_frame_equal(data_source.sample(10), df.iloc[:10])
+
+    df_sample = data_source.sample(50, method='reservoir', seed=1, batch_rows=64)
+    assert len(df_sample) == 50
+    assert df_sample['a'].is_unique
+    assert df_sample['a'].is_monotonic_increasing
+    pd.testing.assert_frame_equal(df_sample, df.loc[df_sample['a']])
+    pd.testing.assert_frame_equal(df_sample, data_source.sample(50, method='reservoir', seed=1, batch_rows=64))
+    assert not df_sample.equals(df.iloc[:50])
+
+    # stratified by the target column from the metadata
+    df_sample = data_source.sample(10, method='stratified', seed=1, batch_rows=64)
+    assert list(df_sample['c'].value_counts()) == [5, 5]
+    assert len(data_source.sample(2000, method='reservoir')) == 1000
+
+    with pytest.raises(ValueError):
+        data_source.sample(0)
+    with pytest.raises(ValueError):
+        data_source.sample(10, method='unknown')
+
+
 if __name__ == "__main__":
   test_csv_001()
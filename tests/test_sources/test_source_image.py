@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Image data source tests.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import os
+
+from PIL import Image as PILImage
+
+from dq0.sdk.data.image import Image
+
+import numpy as np
+
+import pytest
+
+
+def _write_test_images(folder, n_per_class=5, classes=('cat', 'dog')):
+    for label, class_name in enumerate(classes):
+        os.makedirs(os.path.join(folder, class_name))
+        for i in range(n_per_class):
+            data = np.full((8 + i, 10, 3), 50 * label + i, dtype=np.uint8)
+            PILImage.fromarray(data).save(os.path.join(folder, class_name, f'{i}.png'))
+    # files without image extension are ignored
+    with open(os.path.join(folder, classes[0], 'notes.txt'), 'w') as f:
+        f.write('not an image')
+
+
+def test_image_iter_batches_001(tmp_path):
+    _write_test_images(str(tmp_path))
+    data_source = Image(str(tmp_path), image_size=(4, 6))
+
+    assert data_source.read() == str(tmp_path)
+    assert len(data_source) == 10
+    assert data_source.class_names == ['cat', 'dog']
+
+    batches = list(data_source.iter_batches(batch_size=4, num_workers=2, prefetch=1))
+    assert [len(X) for X, _ in batches] == [4, 4, 2]
+    X = np.concatenate([X for X, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+    assert X.shape == (10, 6, 4, 3)
+    assert X.dtype == np.float32
+    assert X.max() <= 1.
+    np.testing.assert_array_equal(y, [0] * 5 + [1] * 5)
+    np.testing.assert_allclose(X[:, 0, 0, 0], np.array([0, 1, 2, 3, 4, 50, 51, 52, 53, 54]) / 255., rtol=1e-6)
+
+
+def test_image_iter_batches_002(tmp_path):
+    _write_test_images(str(tmp_path))
+    data_source = Image(str(tmp_path), image_size=(4, 6), color_mode='L')
+
+    batches = list(data_source.iter_batches(batch_size=3, shuffle=True, seed=1, normalize=False, drop_remainder=True))
+    assert len(batches) == 3
+    X = np.concatenate([X for X, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+    assert X.shape == (9, 6, 4)
+    assert X.dtype == np.uint8
+    # labels stay aligned with their images after shuffling
+    np.testing.assert_array_equal(X[:, 0, 0] >= 50, y == 1)
+
+    with pytest.raises(ValueError):
+        next(data_source.iter_batches(batch_size=0))
+
+
+def test_image_sample_001(tmp_path):
+    _write_test_images(str(tmp_path), n_per_class=6)
+    data_source = Image(str(tmp_path), image_size=(4, 6))
+
+    X, y = data_source.sample(3)
+    assert X.shape == (3, 6, 4, 3)
+    np.testing.assert_array_equal(y, [0, 0, 0])
+
+    X, y = data_source.sample(4, method='stratified', seed=1)
+    np.testing.assert_array_equal(np.bincount(y), [2, 2])
+    np.testing.assert_array_equal(X[:, 0, 0, 0] >= 50 / 255., y == 1)
+
+
+def test_image_compute_statistics_001(tmp_path):
+    _write_test_images(str(tmp_path))
+    with pytest.raises(ValueError, match='no tabular columns'):
+        Image(str(tmp_path)).compute_statistics()
+
+
+def test_image_to_tf_dataset_001(tmp_path):
+    tf = pytest.importorskip('tensorflow')
+    _write_test_images(str(tmp_path))
+    data_source = Image(str(tmp_path), image_size=(4, 6))
+
+    dataset = data_source.to_tf_dataset(batch_size=4)
+    assert isinstance(dataset, tf.data.Dataset)
+    batches = list(dataset.as_numpy_iterator())
+    assert [X.shape for X, _ in batches] == [(4, 6, 4, 3), (4, 6, 4, 3), (2, 6, 4, 3)]
+    assert sum(len(y) for _, y in batches) == 10
+
+
+@pytest.mark.parametrize('color_mode, shape, dtype', [('L', (6, 4), np.uint8), ('P', (6, 4), np.uint8), ('1', (6, 4), np.bool_),
+                                                      ('I', (6, 4), np.int32), ('RGBA', (6, 4, 4), np.uint8)])
+def test_image_to_tf_dataset_002(tmp_path, color_mode, shape, dtype):
+    pytest.importorskip('tensorflow')
+    _write_test_images(str(tmp_path))
+    data_source = Image(str(tmp_path), image_size=(4, 6), color_mode=color_mode)
+
+    # the element spec matches the decoded images of every color mode
+    X, _ = next(data_source.to_tf_dataset(batch_size=4, normalize=False).as_numpy_iterator())
+    assert X.shape == (4,) + shape
+    assert X.dtype == dtype
+    X, _ = next(data_source.to_tf_dataset(batch_size=4).as_numpy_iterator())
+    assert X.shape == (4,) + shape
+    assert X.dtype == np.float32
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Memory-mapped NumPy data source tests.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+import os
+
+from dq0.sdk.data.binary import NPY, Parquet
+from dq0.sdk.data.binary.npy import NPYWriter
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+
+def _get_data_source(path, n_rows=1000):
+    df = pd.DataFrame(np.random.rand(n_rows, 4), columns=['a', 'b', 'c', 'd'])
+    df['target'] = np.arange(n_rows) % 3
+    df['name'] = 'x'
+    df.to_parquet(path)
+    return df, Parquet(path)
+
+
+def test_npy_convert_001(tmp_path):
+    df, data_source = _get_data_source(str(tmp_path / 'test.parquet'))
+    npy_path = str(tmp_path / 'npy')
+
+    npy_source = NPY.convert(data_source, npy_path, feature_cols=['a', 'b', 'c', 'd'], target_cols=['target'], batch_rows=128)
+    assert sorted(os.listdir(npy_path)) == ['X.npy', 'columns.json', 'y.npy']
+
+    X, y = npy_source.read()
+    assert isinstance(X, np.memmap)
+    assert not X.flags.writeable
+    assert X.shape == (1000, 4)
+    np.testing.assert_array_equal(X, df[['a', 'b', 'c', 'd']].values)
+    np.testing.assert_array_equal(y, df['target'].values)
+
+    # feature and target columns are restored from the directory
+    npy_source = NPY(npy_path)
+    assert npy_source.feature_cols == ['a', 'b', 'c', 'd']
+    assert npy_source.target_cols == ['target']
+
+
+def test_npy_convert_002(tmp_path):
+    df, data_source = _get_data_source(str(tmp_path / 'test.parquet'))
+
+    npy_source = NPY.convert(data_source, str(tmp_path / 'npy'), feature_cols=['a', 'b'], dtype=np.float32)
+    X, y = npy_source.read(mmap_mode=None)
+    assert X.dtype == np.float32
+    assert y is None
+
+    with pytest.raises(ValueError):
+        NPY.convert(data_source, str(tmp_path / 'npy_2'), feature_cols=['a', 'name'])
+    with pytest.raises(ValueError):
+        NPY.convert(data_source, str(tmp_path / 'npy_3'))
+
+
+def test_npy_writer_target_dtype_001(tmp_path):
+    batches = [pd.DataFrame({'a': [1., 2.], 'y': [0, 1]}), pd.DataFrame({'a': [3., 4.], 'y': [np.nan, 1.5]})]
+
+    # the target dtype of the first batch cannot hold later float targets
+    writer = NPYWriter(str(tmp_path / 'npy'), feature_cols=['a'], target_cols=['y'])
+    writer.write(batches[0])
+    with pytest.raises(ValueError):
+        writer.write(batches[1])
+    writer.cleanup()
+
+    writer = NPYWriter(str(tmp_path / 'npy_2'), feature_cols=['a'], target_cols=['y'], target_dtype=np.float64)
+    for batch in batches:
+        writer.write(batch)
+    X, y = writer.close().read(mmap_mode=None)
+    np.testing.assert_array_equal(y, [0., 1., np.nan, 1.5])
+
+
+@pytest.mark.parametrize('n_rows', [0, 1, 999, 123456])
+def test_npy_writer_header_001(tmp_path, n_rows):
+    # the rows are written once behind a reserved header
+    path = str(tmp_path / 'npy')
+    writer = NPYWriter(path, feature_cols=['a', 'b'], target_cols=['y'])
+    writer.write(pd.DataFrame({'a': np.arange(n_rows, dtype=float), 'b': 1., 'y': np.arange(n_rows)}))
+    X, y = writer.close().read()
+    assert sorted(os.listdir(path)) == ['X.npy', 'columns.json', 'y.npy']
+    assert X.shape == (n_rows, 2) and y.shape == (n_rows,)
+    np.testing.assert_array_equal(X[:, 0], np.arange(n_rows))
+    np.testing.assert_array_equal(y, np.arange(n_rows))
+    with open(os.path.join(path, 'X.npy'), 'rb') as f:
+        np.lib.format.read_magic(f)
+        np.lib.format.read_array_header_1_0(f)
+        assert f.tell() % 64 == 0
+
+
+def test_npy_sample_001(tmp_path):
+    df, data_source = _get_data_source(str(tmp_path / 'test.parquet'))
+    npy_source = NPY.convert(data_source, str(tmp_path / 'npy'), feature_cols=['a', 'b', 'c', 'd'], target_cols=['target'])
+
+    X, y = npy_source.sample(10)
+    np.testing.assert_array_equal(X, df[['a', 'b', 'c', 'd']].values[:10])
+
+    X, y = npy_source.sample(30, method='stratified', seed=1)
+    assert not isinstance(X, np.memmap)
+    assert X.shape == (30, 4)
+    assert list(np.bincount(y)) == [10, 10, 10]
+    rows = np.searchsorted(df['a'].values, X[:, 0], sorter=np.argsort(df['a'].values))
+    np.testing.assert_array_equal(y, df['target'].values[np.argsort(df['a'].values)][rows])
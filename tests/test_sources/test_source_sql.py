@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""SQL data source tests based on SQLite.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+from dq0.sdk.data.sql import SQLite, engine_registry, sql
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+import sqlalchemy
+
+
+def _get_data_source(tmp_path, n_rows=25):
+    connection_string = f"sqlite:///{tmp_path / 'test.db'}"
+    df = pd.DataFrame({'a': np.arange(n_rows), 'b': np.arange(n_rows) / 2.,
+                       'd': pd.date_range('2020-01-01', periods=n_rows).astype(str)})
+    engine = sqlalchemy.create_engine(connection_string)
+    df.to_sql('test', engine, index=False)
+    engine.dispose()
+    return df, SQLite(connection_string)
+
+
+def test_sql_read_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path)
+    data_source.query = 'SELECT * FROM test'
+    pd.testing.assert_frame_equal(data_source.read(), df)
+
+
+def test_sql_iter_batches_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path)
+
+    batches = list(data_source.iter_batches(query='SELECT * FROM test ORDER BY a', batch_rows=10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), df)
+
+    data_source.query = 'SELECT a FROM test WHERE a < 3'
+    batches = list(data_source.iter_batches(batch_rows=10))
+    assert len(batches) == 1
+    assert list(batches[0]['a']) == [0, 1, 2]
+
+    with pytest.raises(ValueError):
+        next(data_source.iter_batches(batch_rows=0))
+
+
+def test_sql_engine_registry_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path)
+    data_source_2 = SQLite(data_source.connection_string)
+
+    # sources of the same database share one engine and pool
+    assert data_source.engine is data_source_2.engine
+    pool = data_source.engine.pool
+
+    data_source.query = 'SELECT * FROM test'
+    data_source_2.query = 'SELECT * FROM test'
+    for _ in range(3):
+        pd.testing.assert_frame_equal(data_source.read(), df)
+        pd.testing.assert_frame_equal(data_source_2.read(), df)
+        assert pool.checkedout() == 0
+    assert pool.checkedin() == 1
+
+    # streaming returns the connection after the last batch
+    list(data_source.iter_batches(batch_rows=10))
+    assert pool.checkedout() == 0
+
+    # pinned connection
+    data_source.get_connection()
+    assert pool.checkedout() == 1
+    data_source.close()
+    assert pool.checkedout() == 0
+
+    engine_registry.dispose(data_source.connection_string)
+    assert SQLite(data_source.connection_string).engine is not data_source.engine
+
+
+def test_sql_engine_registry_002(tmp_path):
+    connection_string = f"sqlite:///{tmp_path / 'test.db'}"
+    settings = engine_registry.get_pool_settings()
+    try:
+        engine_registry.configure(pool_size=2, max_overflow=0)
+        engine = engine_registry.get_engine(connection_string)
+        assert engine.pool.size() == 2
+        assert engine is engine_registry.get_engine(connection_string)
+        assert engine is not engine_registry.get_engine(connection_string, pool_size=3)
+        with pytest.raises(ValueError):
+            engine_registry.configure(pool_timeout=1)
+    finally:
+        engine_registry.configure(**settings)
+        engine_registry.dispose()
+
+
+def test_sql_partitioned_read_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path, n_rows=100)
+    data_source.query = 'SELECT * FROM test;'
+
+    # integer partition column with bounds queried from the database
+    df_read = data_source.read(partition_column='a', num_partitions=4)
+    pd.testing.assert_frame_equal(df_read.sort_values('a', ignore_index=True), df)
+
+    # partitions are yielded in order and cover rows outside the given bounds
+    partitions = list(data_source.iter_partitions('a', 4, lower_bound=10, upper_bound=50, max_workers=2))
+    assert len(partitions) == 4
+    assert partitions[0]['a'].max() < partitions[1]['a'].min()
+    assert partitions[-1]['a'].max() == 99
+    assert sum(len(p) for p in partitions) == 100
+
+    # float and datetime partition columns
+    data_source.partition_column = 'b'
+    data_source.num_partitions = 3
+    pd.testing.assert_frame_equal(data_source.read().sort_values('a', ignore_index=True), df)
+    df_read = data_source.read(partition_column='d', num_partitions=5)
+    pd.testing.assert_frame_equal(df_read.sort_values('a', ignore_index=True), df)
+
+    # bounds from the column metadata
+    data_source.col_properties = {'a': {'lower': 0, 'upper': 99}}
+    partitions = list(data_source.iter_partitions('a', 2))
+    assert [len(p) for p in partitions] == [50, 50]
+
+    with pytest.raises(ValueError):
+        data_source.read(partition_column='a', num_partitions=2, lower_bound=10, upper_bound=0)
+
+
+def test_sql_partitioned_read_002(tmp_path, monkeypatch):
+    # the default number of workers is capped by the pool capacity
+    settings = engine_registry.get_pool_settings()
+    workers = []
+
+    class _Executor(sql.ThreadPoolExecutor):
+        def __init__(self, max_workers):
+            super().__init__(max_workers=max_workers)
+            workers.append(max_workers)
+
+    monkeypatch.setattr(sql, 'ThreadPoolExecutor', _Executor)
+    try:
+        engine_registry.configure(pool_size=2, max_overflow=1)
+        df, data_source = _get_data_source(tmp_path, n_rows=100)
+        data_source.query = 'SELECT * FROM test'
+        assert sum(len(p) for p in data_source.iter_partitions('a', 10)) == 100
+        assert sum(len(p) for p in data_source.iter_partitions('a', 2)) == 100
+        assert sum(len(p) for p in data_source.iter_partitions('a', 10, max_workers=5)) == 100
+        assert workers == [3, 2, 5]
+    finally:
+        engine_registry.configure(**settings)
+        engine_registry.dispose()
+
+
+def test_sql_sample_001(tmp_path):
+    df, data_source = _get_data_source(tmp_path, n_rows=200)
+    data_source.query = 'SELECT * FROM test ORDER BY a'
+
+    pd.testing.assert_frame_equal(data_source.sample(5), df.iloc[:5])
+
+    # random order pushed down to the database
+    df_sample = data_source.sample(20, method='reservoir')
+    assert len(df_sample) == 20
+    assert df_sample['a'].is_unique
+
+    # seeded samples are drawn client-side and reproducible
+    df_sample = data_source.sample(20, method='reservoir', seed=3, batch_rows=16)
+    pd.testing.assert_frame_equal(df_sample, data_source.sample(20, method='reservoir', seed=3, batch_rows=16))
+    assert df_sample['a'].is_monotonic_increasing
+
+    df_sample = data_source.sample(20, method='stratified', seed=3, stratify_by='odd',
+                                   query='SELECT a, a % 4 = 0 AS odd FROM test')
+    assert df_sample['odd'].sum() == 5
+
+    with pytest.raises(ValueError):
+        data_source.sample(20, method='stratified')
+
+
+def test_sql_sample_002(tmp_path):
+    _, data_source = _get_data_source(tmp_path)
+    assert data_source._get_limit_query('SELECT * FROM t', 5) == 'SELECT * FROM (SELECT * FROM t) dq0_sample LIMIT 5'
+    assert data_source._get_limit_query('SELECT * FROM t', 5, order_by_random=True) == \
+        'SELECT * FROM (SELECT * FROM t) dq0_sample ORDER BY RANDOM() LIMIT 5'
+    data_source.engine = None
+    data_source.type = 'mssql'
+    assert data_source._get_limit_query('SELECT * FROM t', 5, order_by_random=True) == \
+        'SELECT TOP 5 * FROM (SELECT * FROM t) dq0_sample ORDER BY NEWID()'
+    data_source.type = 'postgresql'
+    assert data_source._get_tablesample_query('t', 1.5, 7) == 'SELECT * FROM t TABLESAMPLE BERNOULLI (1.5) REPEATABLE (7)'
+
+
+def test_sql_sample_003(tmp_path, monkeypatch):
+    # schema-qualified table names are quoted part by part and bound as parameter
+    _, data_source = _get_data_source(tmp_path)
+    assert data_source._quote_table('public.my table') == 'public."my table"'
+    assert data_source._get_tablesample_query('public.my table', 1.5, 7) == \
+        'SELECT * FROM public."my table" TABLESAMPLE BERNOULLI (1.5) REPEATABLE (7)'
+
+    queries = []
+
+    def execute(query, **kwargs):
+        queries.append((str(query), kwargs.get('params')))
+        return pd.DataFrame({'a': [100.] if len(queries) == 1 else np.arange(10)})
+
+    monkeypatch.setattr(data_source, 'execute', execute)
+    assert len(data_source._sample_table("public.it's", 5, seed=1)) == 5
+    assert queries[0] == ('SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)', {'table': 'public."it\'s"'})
+    assert queries[1][0].startswith('SELECT * FROM public."it\'s" TABLESAMPLE')
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Streaming statistics tests.
+
+Copyright 2020, Gradient Zero
+All rights reserved
+"""
+
+from dq0.sdk.data.binary import Parquet
+from dq0.sdk.data.statistics import DatasetStatistics, HyperLogLog, QuantileSketch, compute_statistics
+
+import numpy as np
+
+import pandas as pd
+
+import pytest
+
+
+def _get_data(n_rows=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'x': rng.normal(5., 2., n_rows),
+        'i': rng.integers(0, 1000, n_rows),
+        'c': rng.choice(['a', 'b', 'c'], n_rows, p=[0.6, 0.3, 0.1]),
+        'd': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 100, n_rows), 'D')})
+    df.loc[::10, 'x'] = np.nan
+    return df
+
+
+def _batches(df, batch_rows=3000):
+    return (df.iloc[start:start + batch_rows] for start in range(0, len(df), batch_rows))
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+def test_compute_statistics_001(max_workers):
+    df = _get_data()
+    stats = compute_statistics(_batches(df), max_workers=max_workers, seed=1).to_dict()
+    assert stats['rows'] == len(df)
+    assert list(stats['columns'].keys()) == ['x', 'i', 'c', 'd']
+
+    x = stats['columns']['x']
+    assert x['kind'] == 'numeric'
+    assert x['count'] == df['x'].count()
+    assert x['null_count'] == 2000
+    assert x['min'] == df['x'].min()
+    assert x['max'] == df['x'].max()
+    assert x['mean'] == pytest.approx(df['x'].mean())
+    assert x['variance'] == pytest.approx(df['x'].var())
+    for q, value in x['quantiles'].items():
+        # rank error of the quantile sketch
+        assert (df['x'] <= value).mean() / 0.9 == pytest.approx(q, abs=0.02)
+
+    i = stats['columns']['i']
+    assert i['distinct_count'] == pytest.approx(df['i'].nunique(), rel=0.05)
+
+    c = stats['columns']['c']
+    assert c['kind'] == 'other'
+    assert c['mean'] is None and c['quantiles'] == {}
+    assert c['distinct_count'] == 3
+    assert c['top_k'] == list(df['c'].value_counts().items())
+
+    d = stats['columns']['d']
+    assert d['kind'] == 'datetime'
+    assert d['min'] == df['d'].min()
+    assert d['max'] == df['d'].max()
+    assert abs(d['quantiles'][0.5] - df['d'].quantile(0.5)) <= pd.Timedelta(days=3)
+
+
+def test_statistics_merge_001():
+    df = _get_data()
+    part_1 = DatasetStatistics(seed=1)
+    part_1.update(df.iloc[:5000])
+    part_2 = DatasetStatistics(seed=1)
+    part_2.update(df.iloc[5000:])
+    part_1.merge(part_2)
+
+    stats = part_1.to_dict()
+    assert stats['rows'] == len(df)
+    assert stats['columns']['i']['count'] == len(df)
+    assert stats['columns']['i']['mean'] == pytest.approx(df['i'].mean())
+    assert stats['columns']['i']['variance'] == pytest.approx(df['i'].var())
+
+    with pytest.raises(ValueError):
+        # numeric and non-numeric values in the same column
+        part_1.update(pd.DataFrame({'i': ['text']}))
+
+
+def test_sketches_001():
+    sketch = QuantileSketch(k=128, seed=0)
+    values = np.random.default_rng(0).random(100000)
+    for batch in np.array_split(values, 7):
+        sketch.update(batch)
+    estimates = sketch.quantiles([0.1, 0.5, 0.9])
+    np.testing.assert_allclose(estimates, [0.1, 0.5, 0.9], atol=0.02)
+    assert sum(len(level) * 2 ** h for h, level in enumerate(sketch.levels)) == len(values)
+
+    hll = HyperLogLog(precision=12)
+    hll.update(pd.util.hash_pandas_object(pd.Series(np.arange(50000)), index=False).to_numpy())
+    assert hll.estimate() == pytest.approx(50000, rel=0.05)
+    hll_2 = HyperLogLog(precision=12)
+    hll_2.update(pd.util.hash_pandas_object(pd.Series(np.arange(25000, 75000)), index=False).to_numpy())
+    hll.merge(hll_2)
+    assert hll.estimate() == pytest.approx(75000, rel=0.05)
+
+
+def test_source_compute_statistics_001(tmp_path):
+    df = _get_data()
+    path = str(tmp_path / 'test.parquet')
+    df.to_parquet(path)
+    stats = Parquet(path).compute_statistics(columns=['i', 'c'], batch_rows=4096, max_workers=2).to_dict()
+    assert list(stats['columns'].keys()) == ['i', 'c']
+    assert stats['columns']['i']['max'] == df['i'].max()
+    assert stats['columns']['c']['count'] == len(df)